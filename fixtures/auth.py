@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import pytest
+from pages.facebook_login_page import FacebookLoginPage
+from config.browser_capabilities import get_browser_capabilities
+from utils.auth_state import AuthStateCache
+
+
+@pytest.fixture(scope="session")
+def auth_state_cache(request):
+    """Fixture to initialize the on-disk storage_state cache."""
+    project_root = Path(__file__).parent.parent
+    return AuthStateCache(
+        project_root / request.config.getoption("--auth-state-dir"),
+        ttl_seconds=request.config.getoption("--auth-state-ttl") * 60,
+        validate=lambda state: any(cookie["name"] in FacebookLoginPage.SESSION_COOKIES
+                                   for cookie in state.get("cookies", [])),
+    )
+
+
+@pytest.fixture(scope="session")
+def authenticated_state(browser, auth_state_cache, request):
+    """Fixture returning storage_state_path(username, password), logging in once per (env, user)."""
+    caps = get_browser_capabilities(request.config.getoption("--cloud"), request.node.name)
+
+    def _login(username, password, target: Path):
+        context = browser.new_context(viewport=caps["viewport"])
+        try:
+            page = context.new_page()
+            login_page = FacebookLoginPage(page)
+            login_page.navigate_to_facebook()
+            login_page.enter_credentials(username, password)
+            login_page.click_loginbutto()
+            page.wait_for_load_state("networkidle")
+            if not login_page.is_logged_in():
+                raise RuntimeError(f"Login of '{username}' failed (still on {page.url}); storage state not saved")
+            context.storage_state(path=str(target))
+        finally:
+            context.close()
+
+    def _storage_state(username: str, password: str) -> Path:
+        env = os.getenv("ENV", "dev")
+        return auth_state_cache.get(env, username, lambda target: _login(username, password, target))
+
+    return _storage_state
+
+
+@pytest.fixture
+def authenticated_page(context_pool, authenticated_state):
+    """Fixture returning open_page(username, password): a page that starts already logged in."""
+    contexts = []
+
+    def _open(username: str, password: str):
+        context = context_pool.acquire(storage_state=authenticated_state(username, password))
+        contexts.append(context)
+        return context.new_page()
+
+    yield _open
+    for context in contexts:
+        context_pool.release(context)
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from utils.db.db_factory import DBFactory
+from utils.db.seeding import Seeder
+
+
+@pytest.fixture(scope="session")
+def seed_data(request):
+    """Fixture returning seed(name), which loads testdata/seeds/<name>.json once per session.
+
+    Seeded rows are deleted again when the session ends.
+    """
+    dbuse = os.getenv("DBUSE")
+    if not dbuse:
+        pytest.skip("Seeding needs a database: no DBUSE configured")
+
+    seeder = Seeder(dbuse)
+    yield seeder.seed
+
+    deleted, errors = seeder.cleanup()
+    for table_name, failed in errors.items():
+        for condition, error in failed.items():
+            print(f" Seed cleanup of {table_name} where {condition} failed: {error}")
+
+
+@pytest.fixture(scope="session")
+def db_session():
+    """Fixture holding one connector (and its connection) for the whole session."""
+    dbuse = os.getenv("DBUSE")
+    if not dbuse:
+        pytest.skip("No DBUSE configured")
+
+    with DBFactory.get_db(dbuse) as connector:
+        yield connector
+
+
+@pytest.fixture
+def db(request, db_session):
+    """Fixture returning the session connector for the test's own queries.
+
+    With --db-isolation rollback on MySQL/PostgreSQL the test runs inside a savepoint, and everything
+    it wrote through this connector is rolled back at teardown instead of deleted.
+    """
+    if request.config.getoption("--db-isolation") == "rollback" and db_session.supports_savepoints:
+        with db_session.isolated():
+            yield db_session
+    else:
+        yield db_session
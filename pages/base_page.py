@@ -1,35 +1,165 @@
 from playwright.sync_api import Page, expect, Locator
-from typing import Optional, Union, List, Dict, Pattern, Any
-import json
+from typing import Optional, Union, List, Dict, Mapping, Pattern, Any, Callable
 from pathlib import Path
 import re
 from utils.logger import customLogger
+from .element_registry import element_registry
 
 log = customLogger()
 
+
+def _role_locator(page: Page, locator_info: Mapping[str, Any]) -> Locator:
+    role = locator_info.get("role")
+    name = locator_info.get("value")
+    if not role or not name:
+        error_msg = f"Both 'role' and 'name' must be provided for locator type 'role'"
+        log.error(error_msg)
+        raise ValueError(error_msg)
+    return page.get_by_role(role, name=name)
+
+
+def _selector_locator(page: Page, locator_info: Mapping[str, Any]) -> Locator:
+    return page.locator(locator_info["value"])
+
+
+# Locator type (the "type" field in elements/*.json) -> factory(page, locator_info)
+LOCATOR_FACTORIES: Dict[str, Callable[[Page, Mapping[str, Any]], Locator]] = {
+    "css": _selector_locator,
+    "xpath": _selector_locator,
+    "testid": lambda page, info: page.get_by_test_id(info["value"]),
+    "role": _role_locator,
+    "text": lambda page, info: page.get_by_text(info["value"]),
+    "label": lambda page, info: page.get_by_label(info["value"]),
+    "title": lambda page, info: page.get_by_title(info["value"]),
+    "alt": lambda page, info: page.get_by_alt_text(info["value"]),
+    "placeholder": lambda page, info: page.get_by_placeholder(info["value"]),
+}
+
+
+ACTIONABILITY_MODES = ("strict", "lean")
+
+# fill_form action name -> callable(locator, *args)
+FORM_ACTIONS: Dict[str, Callable[..., Any]] = {
+    "fill": lambda locator, value: locator.fill(value),
+    "type": lambda locator, value: locator.press_sequentially(value),
+    "select": lambda locator, value: locator.select_option(value),
+    "click": lambda locator: locator.click(),
+    "check": lambda locator: locator.check(),
+    "uncheck": lambda locator: locator.uncheck(),
+    "press": lambda locator, key: locator.press(key),
+    "upload": lambda locator, files: locator.set_input_files(files),
+}
+
+# Sets plain inputs/selects in one page.evaluate call, returns the keys it could not handle
+_FILL_FORM_SCRIPT = """
+(fields) => fields.filter((field) => {
+    try {
+        const el = field.xpath
+            ? document.evaluate(field.selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : document.querySelector(field.selector);
+        if (!el || el.disabled) return true;
+        if (field.action === "select") {
+            const values = Array.isArray(field.value) ? field.value : [field.value];
+            let matched = false;
+            for (const option of el.options || []) {
+                option.selected = values.includes(option.value) || values.includes(option.label);
+                matched = matched || option.selected;
+            }
+            if (!matched) return true;
+        } else {
+            // Use the native setter so framework-controlled inputs (React etc.) see the change
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, "value").set.call(el, field.value);
+        }
+        el.dispatchEvent(new Event("input", { bubbles: true }));
+        el.dispatchEvent(new Event("change", { bubbles: true }));
+        return false;
+    } catch (e) {
+        return true;
+    }
+}).map((field) => field.key)
+"""
+
+
+class FormFillError(Exception):
+    """Raised by BasePage.fill_form with the failure of every field, keyed by element key."""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        details = "; ".join(f"'{key}': {type(error).__name__}: {error}" for key, error in failures.items())
+        super().__init__(f"Form fill failed for {len(failures)} field(s): {details}")
+
+
 class BasePage:
+    locator_factories = LOCATOR_FACTORIES
+    # strict: explicit expect() visible/enabled checks before every action
+    # lean: rely on the actionability checks Playwright already runs inside the action itself
+    actionability_mode = "strict"
+    # Protocol round-trips (expect() checks and locator actions) issued since the last reset
+    round_trips = 0
+
     def __init__(self, page: Page):
         self.page = page
-        self.elements: Dict[str, Any] = {}
+        self.elements: Mapping[str, Any] = {}
+        self.element_file: Optional[Path] = None
+        self._locators: Dict[tuple, Locator] = {}
         self._load_elements()
 
+    @classmethod
+    def register_locator_type(cls, locator_type: str, factory: Callable[[Page, Mapping[str, Any]], Locator]):
+        """Register a factory(page, locator_info) for a new locator type, for this page class and its subclasses."""
+        if "locator_factories" not in cls.__dict__:
+            cls.locator_factories = dict(cls.locator_factories)
+        cls.locator_factories[locator_type] = factory
+
+    @staticmethod
+    def set_actionability_mode(mode: str):
+        """Switch every page object between 'strict' and 'lean' pre-action checks."""
+        if mode not in ACTIONABILITY_MODES:
+            raise ValueError(f"Unsupported actionability mode: {mode}")
+        BasePage.actionability_mode = mode
+
+    @staticmethod
+    def reset_round_trips() -> int:
+        """Return the round-trips counted so far and start counting from zero."""
+        count = BasePage.round_trips
+        BasePage.round_trips = 0
+        return count
+
+    @staticmethod
+    def _act(action: Callable, *args, **kwargs):
+        """Run one Playwright call, counting it as a protocol round-trip."""
+        BasePage.round_trips += 1
+        return action(*args, **kwargs)
+
+    @staticmethod
+    def _expect(target):
+        """Playwright expect(), counting the assertion as a protocol round-trip."""
+        BasePage.round_trips += 1
+        return expect(target)
+
+    def _await_actionable(self, element_key: str, enabled: bool = False):
+        """Explicit pre-action checks in strict mode; lean mode leaves them to the action's auto-wait."""
+        if BasePage.actionability_mode == "lean":
+            return
+        self.wait_for_element_visible(element_key)
+        if enabled:
+            self.wait_for_element_clickable(element_key)
+
 
     def _load_elements(self):
-        """Load elements from JSON file based on the page name."""
+        """Load elements from the shared element registry based on the page name."""
         page_name = self.__class__.__name__.lower().replace("page", "")
-        element_file = Path(__file__).parent.parent / "elements" / f"{page_name}_page.json"
-
-        if not element_file.exists():
-            error_msg = f"Element file not found: {element_file}"
-            log.error(error_msg)
-            raise FileNotFoundError(error_msg)
-
-        with open(element_file) as f:
-            self.elements = json.load(f)
-        log.info(f"Loaded elements from: {element_file}")
+        self.element_file = element_registry.file_for(page_name)
+        self.elements = element_registry.get(page_name)
 
     def _get_locator(self, element_key: str) -> Any:
-        """Get the locator based on the element key and its type."""
+        """Get the locator based on the element key and its type (memoized per page and element key)."""
+        cache_key = (self.page, element_key)
+        locator = self._locators.get(cache_key)
+        if locator is not None:
+            return locator
+
         if element_key not in self.elements:
             error_msg = f"Element '{element_key}' not found in page elements"
             log.error(error_msg)
@@ -37,70 +167,49 @@ class BasePage:
 
         locator_info = self.elements[element_key]
 
-        if isinstance(locator_info, dict):
-            # Handle locator with type and value
-            locator_type = locator_info.get("type", "css")
-
-            if locator_type == "testid":
-                return self.page.get_by_test_id(locator_info["value"])
-            elif locator_type == "role":
-                role = locator_info.get("role")
-                name = locator_info.get("value")
-                if not role or not name:
-                    error_msg = f"Both 'role' and 'name' must be provided for locator type 'role'"
-                    log.error(error_msg)
-                    raise ValueError(error_msg)
-                return self.page.get_by_role(role, name=name)
-            elif locator_type == "text":
-                return self.page.get_by_text(locator_info["value"])
-            elif locator_type == "label":
-                return self.page.get_by_label(locator_info["value"])
-            elif locator_type == "title":
-                return self.page.get_by_title(locator_info["value"])
-            elif locator_type == "alt":
-                return self.page.get_by_alt_text(locator_info["value"])
-            elif locator_type == "placeholder":
-                return self.page.get_by_placeholder(locator_info["value"])
-            else:
-                # Default to CSS/xpath selector
-                return self.page.locator(locator_info["value"])
+        if isinstance(locator_info, Mapping):
+            # Handle locator with type and value, unknown types default to CSS/xpath selector
+            factory = self.locator_factories.get(locator_info.get("type", "css"), _selector_locator)
+            locator = factory(self.page, locator_info)
         else:
             # Default to CSS selector for backward compatibility
-            return self.page.locator(locator_info)
+            locator = self.page.locator(locator_info)
+
+        self._locators[cache_key] = locator
+        return locator
 
     def wait_for_element_visible(self, element_key: str, timeout: int = 10000):
         """Wait for an element to be visible."""
         locator = self._get_locator(element_key)
-        log.info(f"Waiting for element '{element_key}' to be visible")
-        expect(locator).to_be_visible(timeout=timeout)
+        log.info("Waiting for element '%s' to be visible", element_key)
+        self._expect(locator).to_be_visible(timeout=timeout)
 
     def wait_for_element_clickable(self, element_key: str, timeout: int = 10000):
         """Wait for an element to be clickable."""
         locator = self._get_locator(element_key)
-        log.info(f"Waiting for element '{element_key}' to be clickable")
-        expect(locator).to_be_enabled(timeout=timeout)
+        log.info("Waiting for element '%s' to be clickable", element_key)
+        self._expect(locator).to_be_enabled(timeout=timeout)
 
     def click(self, element_key: str):
         """Click an element with built-in waits."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        self.wait_for_element_clickable(element_key)
-        log.info(f"Clicking on '{element_key}'")
-        locator.click()
+        self._await_actionable(element_key, enabled=True)
+        log.info("Clicking on '%s'", element_key)
+        self._act(locator.click)
 
     def enter_text(self, element_key: str, text: str):
         """Enter text into a field with validation."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Entering text '{text}' in '{element_key}'")
-        locator.fill(text)
+        self._await_actionable(element_key)
+        log.info("Entering text '%s' in '%s'", text, element_key)
+        self._act(locator.fill, text)
 
     def select_dropdown(self, element_key: str, value: str):
         """Select an option from a dropdown."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Selecting '{value}' from '{element_key}'")
-        locator.select_option(value)
+        self._await_actionable(element_key)
+        log.info("Selecting '%s' from '%s'", value, element_key)
+        self._act(locator.select_option, value)
 
     def wait_for_network_idle(self, timeout: int = 30000):
         """Wait for the network to be idle."""
@@ -111,243 +220,243 @@ class BasePage:
         """Take a screenshot and save it to the reports folder."""
         screenshot_path = Path(__file__).parent.parent / "reports" / f"{name}.png"
         self.page.screenshot(path=screenshot_path)
-        log.info(f"Screenshot saved: {screenshot_path}")
+        log.info("Screenshot saved: %s", screenshot_path)
 
 
     def check_checkbox(self, element_key: str):
         """Check a checkbox or radio button."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Checking checkbox/radio: '{element_key}'")
-        locator.check()
+        self._await_actionable(element_key)
+        log.info("Checking checkbox/radio: '%s'", element_key)
+        self._act(locator.check)
 
     def uncheck_checkbox(self, element_key: str):
         """Uncheck a checkbox."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Unchecking checkbox: '{element_key}'")
-        locator.uncheck()
+        self._await_actionable(element_key)
+        log.info("Unchecking checkbox: '%s'", element_key)
+        self._act(locator.uncheck)
 
     def select_option(self, element_key: str, values: Union[str, List[str]]):
         """Select option(s) in a dropdown."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Selecting option(s) '{values}' in '{element_key}'")
-        locator.select_option(values)
+        self._await_actionable(element_key)
+        log.info("Selecting option(s) '%s' in '%s'", values, element_key)
+        self._act(locator.select_option, values)
 
     def double_click(self, element_key: str):
         """Double click an element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Double clicking: '{element_key}'")
-        locator.dblclick()
+        self._await_actionable(element_key)
+        log.info("Double clicking: '%s'", element_key)
+        self._act(locator.dblclick)
 
     def right_click(self, element_key: str):
         """Right click an element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Right clicking: '{element_key}'")
-        locator.click(button="right")
+        self._await_actionable(element_key)
+        log.info("Right clicking: '%s'", element_key)
+        self._act(locator.click, button="right")
 
     def press_key(self, element_key: str, key: str):
         """Press specific keyboard key on element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Pressing key '{key}' on: '{element_key}'")
-        locator.press(key)
+        self._await_actionable(element_key)
+        log.info("Pressing key '%s' on: '%s'", key, element_key)
+        self._act(locator.press, key)
 
     def upload_file(self, element_key: str, files: Union[str, List[str]]):
         """Upload file(s) to file input."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Uploading files '{files}' to: '{element_key}'")
-        locator.set_input_files(files)
+        self._await_actionable(element_key)
+        log.info("Uploading files '%s' to: '%s'", files, element_key)
+        self._act(locator.set_input_files, files)
 
     def focus_element(self, element_key: str):
         """Focus on specified element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Focusing on: '{element_key}'")
-        locator.focus()
+        self._await_actionable(element_key)
+        log.info("Focusing on: '%s'", element_key)
+        self._act(locator.focus)
 
     def hover_element(self, element_key: str):
         """Hover mouse over element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Hovering over: '{element_key}'")
-        locator.hover()
+        self._await_actionable(element_key)
+        log.info("Hovering over: '%s'", element_key)
+        self._act(locator.hover)
 
     def drag_and_drop(self, source_key: str, target_key: str):
         """Drag element to target location."""
         source_locator = self._get_locator(source_key)
         target_locator = self._get_locator(target_key)
-        self.wait_for_element_visible(source_key)
-        self.wait_for_element_visible(target_key)
-        log.info(f"Dragging '{source_key}' to '{target_key}'")
-        source_locator.drag_to(target_locator)
+        self._await_actionable(source_key)
+        self._await_actionable(target_key)
+        log.info("Dragging '%s' to '%s'", source_key, target_key)
+        self._act(source_locator.drag_to, target_locator)
 
     def scroll_to_element(self, element_key: str):
         """Scroll element into view."""
         locator = self._get_locator(element_key)
-        log.info(f"Scrolling to: '{element_key}'")
-        locator.scroll_into_view_if_needed()
+        log.info("Scrolling to: '%s'", element_key)
+        self._act(locator.scroll_into_view_if_needed)
 
     def clear_input(self, element_key: str):
         """Clear input field content."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Clearing input: '{element_key}'")
-        locator.clear()
+        self._await_actionable(element_key)
+        log.info("Clearing input: '%s'", element_key)
+        self._act(locator.clear)
 
     def get_text_content(self, element_key: str) -> str:
         """Get text content of element."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Getting text from: '{element_key}'")
-        return locator.text_content()
+        self._await_actionable(element_key)
+        log.info("Getting text from: '%s'", element_key)
+        return self._act(locator.text_content)
 
     def force_click(self, element_key: str):
         """Force click element bypassing actionability checks."""
         locator = self._get_locator(element_key)
-        log.warning(f"Force clicking: '{element_key}'")
-        locator.click(force=True)
+        log.warning("Force clicking: '%s'", element_key)
+        self._act(locator.click, force=True)
 
     def type_text(self, element_key: str, text: str, delay: int = None):
         """Type text character by character with optional delay."""
         locator = self._get_locator(element_key)
-        self.wait_for_element_visible(element_key)
-        log.info(f"Typing text '{text}' in: '{element_key}'")
-        locator.press_sequentially(text, delay=delay)
+        self._await_actionable(element_key)
+        log.info("Typing text '%s' in: '%s'", text, element_key)
+        self._act(locator.press_sequentially, text, delay=delay)
 
     def verify_element_is_attached(self, element_key: str):
         """Verify element is attached to the DOM."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is attached")
-        expect(locator).to_be_attached()
+        log.info("Verifying element '%s' is attached", element_key)
+        self._expect(locator).to_be_attached()
 
     def verify_checkbox_is_checked(self, element_key: str):
         """Verify checkbox is checked."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying checkbox '{element_key}' is checked")
-        expect(locator).to_be_checked()
+        log.info("Verifying checkbox '%s' is checked", element_key)
+        self._expect(locator).to_be_checked()
 
     def verify_element_is_disabled(self, element_key: str):
         """Verify element is disabled."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is disabled")
-        expect(locator).to_be_disabled()
+        log.info("Verifying element '%s' is disabled", element_key)
+        self._expect(locator).to_be_disabled()
 
     def verify_element_is_editable(self, element_key: str):
         """Verify element is editable."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is editable")
-        expect(locator).to_be_editable()
+        log.info("Verifying element '%s' is editable", element_key)
+        self._expect(locator).to_be_editable()
 
     def verify_element_is_empty(self, element_key: str):
         """Verify element is empty."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is empty")
-        expect(locator).to_be_empty()
+        log.info("Verifying element '%s' is empty", element_key)
+        self._expect(locator).to_be_empty()
 
     def verify_element_is_enabled(self, element_key: str):
         """Verify element is enabled."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is enabled")
-        expect(locator).to_be_enabled()
+        log.info("Verifying element '%s' is enabled", element_key)
+        self._expect(locator).to_be_enabled()
 
     def verify_element_is_focused(self, element_key: str):
         """Verify element is focused."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is focused")
-        expect(locator).to_be_focused()
+        log.info("Verifying element '%s' is focused", element_key)
+        self._expect(locator).to_be_focused()
 
     def verify_element_is_hidden(self, element_key: str):
         """Verify element is hidden."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is hidden")
-        expect(locator).to_be_hidden()
+        log.info("Verifying element '%s' is hidden", element_key)
+        self._expect(locator).to_be_hidden()
 
     def verify_element_in_viewport(self, element_key: str):
         """Verify element is in viewport."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is in viewport")
-        expect(locator).to_be_in_viewport()
+        log.info("Verifying element '%s' is in viewport", element_key)
+        self._expect(locator).to_be_in_viewport()
 
     def verify_element_is_visible(self, element_key: str):
         """Verify element is visible."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' is visible")
-        expect(locator).to_be_visible()
+        log.info("Verifying element '%s' is visible", element_key)
+        self._expect(locator).to_be_visible()
 
     def verify_element_contains_text(self, element_key: str, text: Union[str, Pattern]):
         """Verify element contains text."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' contains text: {text}")
-        expect(locator).to_contain_text(text)
+        log.info("Verifying element '%s' contains text: %s", element_key, text)
+        self._expect(locator).to_contain_text(text)
 
     def verify_element_has_attribute(self, element_key: str, attribute: str, value: Optional[str] = None):
         """Verify element has attribute with optional value."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has attribute '{attribute}'")
-        expect(locator).to_have_attribute(attribute, value)
+        log.info("Verifying element '%s' has attribute '%s'", element_key, attribute)
+        self._expect(locator).to_have_attribute(attribute, value)
 
     def verify_element_has_class(self, element_key: str, class_name: Union[str, Pattern, List[Union[str, Pattern]]]):
         """Verify element has class name."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has class '{class_name}'")
-        expect(locator).to_have_class(class_name)
+        log.info("Verifying element '%s' has class '%s'", element_key, class_name)
+        self._expect(locator).to_have_class(class_name)
 
     def verify_element_count(self, element_key: str, count: int):
         """Verify element has exact count."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' count is {count}")
-        expect(locator).to_have_count(count)
+        log.info("Verifying element '%s' count is %s", element_key, count)
+        self._expect(locator).to_have_count(count)
 
     def verify_element_has_css(self, element_key: str, css: Dict[str, str]):
         """Verify element has CSS properties."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has CSS properties: {css}")
-        expect(locator).to_have_css(**css)
+        log.info("Verifying element '%s' has CSS properties: %s", element_key, css)
+        self._expect(locator).to_have_css(**css)
 
     def verify_element_has_id(self, element_key: str, element_id: str):
         """Verify element has ID."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has ID '{element_id}'")
-        expect(locator).to_have_id(element_id)
+        log.info("Verifying element '%s' has ID '%s'", element_key, element_id)
+        self._expect(locator).to_have_id(element_id)
 
     def verify_element_has_js_property(self, element_key: str, prop_name: str, value: Any):
         """Verify element has JavaScript property."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has JS property '{prop_name}'")
-        expect(locator).to_have_js_property(prop_name, value)
+        log.info("Verifying element '%s' has JS property '%s'", element_key, prop_name)
+        self._expect(locator).to_have_js_property(prop_name, value)
 
     def verify_element_has_text(self, element_key: str, text: Union[str, Pattern, List[Union[str, Pattern]]]):
         """Verify element matches text."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has text: {text}")
-        expect(locator).to_have_text(text)
+        log.info("Verifying element '%s' has text: %s", element_key, text)
+        self._expect(locator).to_have_text(text)
 
     def verify_element_has_value(self, element_key: str, value: str):
         """Verify input element has value."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has value: {value}")
-        expect(locator).to_have_value(value)
+        log.info("Verifying element '%s' has value: %s", element_key, value)
+        self._expect(locator).to_have_value(value)
 
     def verify_element_has_values(self, element_key: str, values: List[str]):
         """Verify select element has selected values."""
         locator = self._get_locator(element_key)
-        log.info(f"Verifying element '{element_key}' has selected values: {values}")
-        expect(locator).to_have_values(values)
+        log.info("Verifying element '%s' has selected values: %s", element_key, values)
+        self._expect(locator).to_have_values(values)
 
     def verify_page_title(self, title: Union[str, Pattern]):
         """Verify page has title."""
-        log.info(f"Verifying page title is: {title}")
-        expect(self.page).to_have_title(title)
+        log.info("Verifying page title is: %s", title)
+        self._expect(self.page).to_have_title(title)
 
     def verify_page_url(self, url: Union[str, Pattern]):
         """Verify page has URL."""
-        log.info(f"Verifying page URL is: {url}")
-        expect(self.page).to_have_url(url)
+        log.info("Verifying page URL is: %s", url)
+        self._expect(self.page).to_have_url(url)
 
     def filter_by_text(self, element_key: str, text: Union[str, re.Pattern], strict: bool = True) -> Locator:
         """Filter elements by text content."""
@@ -368,8 +477,8 @@ class BasePage:
     def get_list_items(self, list_key: str) -> List[Locator]:
         """Get all elements in a list."""
         locator = self._get_locator(list_key)
-        log.info(f"Getting all items in list: '{list_key}'")
-        return locator.all()
+        log.info("Getting all items in list: '%s'", list_key)
+        return self._act(locator.all)
 
     def click_list_item_by_text(self, list_key: str, text: str, button_key: Optional[str] = None):
         """Click specific item in a list based on text."""
@@ -377,38 +486,134 @@ class BasePage:
         target_item = locator.filter(has_text=text)
         if button_key:
             button_locator = self._get_locator(button_key)
-            log.info(f"Clicking button '{button_key}' in list item with text '{text}'")
-            target_item.locator(button_locator).click()
+            log.info("Clicking button '%s' in list item with text '%s'", button_key, text)
+            self._act(target_item.locator(button_locator).click)
         else:
-            log.info(f"Clicking list item with text '{text}'")
-            target_item.click()
+            log.info("Clicking list item with text '%s'", text)
+            self._act(target_item.click)
 
     def click_nth_element(self, element_key: str, index: int, strict: bool = True):
         """Click nth element in a list."""
         locator = self._get_locator(element_key).nth(index)
         self._handle_strictness(locator, f"{index}th element", strict)
-        log.info(f"Clicking {index}th element: '{element_key}'")
-        locator.click()
+        log.info("Clicking %sth element: '%s'", index, element_key)
+        self._act(locator.click)
 
 
     def get_element_count(self, element_key: str) -> int:
         """Get count of matching elements."""
         locator = self._get_locator(element_key)
-        log.info(f"Getting count of elements: '{element_key}'")
-        return locator.count()
+        log.info("Getting count of elements: '%s'", element_key)
+        return self._act(locator.count)
 
 
     def assert_list_contains_texts(self, list_key: str, expected_texts: List[str]):
         """Assert list contains exactly the specified texts."""
         locator = self._get_locator(list_key)
-        actual_texts = [item.text_content() for item in locator.all()]
-        log.info(f"Asserting list '{list_key}' contains texts: {expected_texts}")
+        actual_texts = [self._act(item.text_content) for item in self._act(locator.all)]
+        log.info("Asserting list '%s' contains texts: %s", list_key, expected_texts)
         assert sorted(actual_texts) == sorted(expected_texts), \
             f"Expected texts {expected_texts} not matching actual {actual_texts}"
 
+    def fill_form(self, fields: Mapping[str, Any], use_script: bool = False, stop_on_error: bool = False):
+        """Fill several fields as one batch.
+
+        fields maps element key -> value: a string fills the field, True/False checks/unchecks it,
+        None clicks it and a tuple names the action explicitly, e.g. ("select", "20") or ("press", "Enter").
+        With use_script=True, consecutive plain css/xpath inputs and selects are set in a single
+        in-page script. Raises FormFillError listing every failed element key.
+        """
+        unknown = [key for key in fields if key not in self.elements]
+        if unknown:
+            # Fail before touching the page, so a typo never leaves the form half filled
+            raise FormFillError({key: KeyError(f"Element '{key}' not found in page elements") for key in unknown})
+        steps = [(key, *self._form_step(key, spec)) for key, spec in fields.items()]
+        log.info("Filling form fields: %s", list(fields))
+
+        if BasePage.actionability_mode == "strict" and steps:
+            # One readiness check for the whole form, the actions themselves auto-wait per field
+            try:
+                self.wait_for_element_visible(steps[0][0])
+            except AssertionError as e:
+                # The form is not there: fail every field now instead of waiting out a timeout per field
+                raise FormFillError({key: e for key, _, _ in steps}) from e
+
+        failures: Dict[str, Exception] = {}
+        index = 0
+        while index < len(steps) and not (failures and stop_on_error):
+            key, action, args = steps[index]
+            if use_script and self._scriptable_selector(key, action):
+                batch = []
+                while index < len(steps) and self._scriptable_selector(steps[index][0], steps[index][1]):
+                    batch.append(steps[index])
+                    index += 1
+                fallback = set(self._fill_by_script(batch))
+                for step in batch:
+                    if step[0] in fallback:
+                        self._run_form_step(step, failures)
+                continue
+            self._run_form_step(steps[index], failures)
+            index += 1
+
+        if failures:
+            raise FormFillError(failures)
+
+    def _form_step(self, element_key: str, spec: Any) -> tuple:
+        """Normalize a fill_form value into (action, args)."""
+        if spec is None:
+            return "click", ()
+        if isinstance(spec, bool):
+            return ("check" if spec else "uncheck"), ()
+        if isinstance(spec, tuple):
+            action, args = spec[0], tuple(spec[1:])
+        else:
+            action, args = "fill", (str(spec),)
+        if action not in FORM_ACTIONS:
+            raise ValueError(f"Unsupported form action '{action}' for element '{element_key}'")
+        return action, args
+
+    def _run_form_step(self, step: tuple, failures: Dict[str, Exception]):
+        key, action, args = step
+        try:
+            locator = self._get_locator(key)
+            # After a failure, fields that are not on the page fail at once instead of after the action timeout
+            if failures and self._act(locator.count) == 0:
+                raise LookupError(f"Element '{key}' is not on the page")
+            self._act(FORM_ACTIONS[action], locator, *args)
+        except Exception as e:
+            log.error("Form field '%s' failed on '%s': %s", key, action, e)
+            failures[key] = e
+
+    def _scriptable_selector(self, element_key: str, action: str) -> Optional[str]:
+        """Return the raw css/xpath selector of a fill/select field, or None when it needs a Locator."""
+        if action not in ("fill", "select"):
+            return None
+        locator_info = self.elements.get(element_key)
+        if isinstance(locator_info, Mapping):
+            if locator_info.get("type", "css") not in ("css", "xpath"):
+                return None
+            locator_info = locator_info["value"]
+        return locator_info if isinstance(locator_info, str) else None
+
+    def _fill_by_script(self, batch: List[tuple]) -> List[str]:
+        """Set a batch of plain fields in one round-trip; returns the keys that need the regular path."""
+        payload = []
+        for key, action, args in batch:
+            selector = self._scriptable_selector(key, action)
+            is_xpath = selector.startswith(("//", "..", "xpath="))
+            payload.append({
+                "key": key,
+                "action": action,
+                "value": args[0],
+                "selector": selector[len("xpath="):] if selector.startswith("xpath=") else selector,
+                "xpath": is_xpath,
+            })
+        log.info("Setting %s field(s) in one script call", len(payload))
+        return self._act(self.page.evaluate, _FILL_FORM_SCRIPT, payload)
+
     def _handle_strictness(self, locator: Locator, context: str, strict: bool = True):
         """Handle strict mode checks."""
-        if strict and locator.count() > 1:
+        if strict and self._act(locator.count) > 1:
             error_msg = f"Strictness violation: Multiple elements found for {context}"
             log.error(error_msg)
             raise ValueError(error_msg)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+from utils.logger import customLogger
+
+log = customLogger()
+
+ELEMENTS_DIR = Path(__file__).parent.parent / "elements"
+
+
+class ElementRegistry:
+    """Process-wide cache of validated, read-only element definitions from elements/*_page.json."""
+
+    def __init__(self, elements_dir: Path = ELEMENTS_DIR):
+        self.elements_dir = Path(elements_dir)
+        self._cache: Dict[str, Tuple[float, Mapping[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def load_all(self):
+        """Load and validate every element file, failing fast on case-colliding file names."""
+        with self._lock:
+            files = sorted(self.elements_dir.glob("*.json"))
+            by_lower_name: Dict[str, list] = {}
+            for element_file in files:
+                by_lower_name.setdefault(element_file.name.lower(), []).append(element_file.name)
+            collisions = [names for names in by_lower_name.values() if len(names) > 1]
+            if collisions:
+                error_msg = f"Element files differ only by case (ambiguous on Windows/macOS): {collisions}"
+                log.error(error_msg)
+                raise ValueError(error_msg)
+
+            for element_file in files:
+                self._load(element_file)
+            self._loaded = True
+
+    def file_for(self, page_name: str) -> Path:
+        """Return the element file backing a page name."""
+        return self.elements_dir / f"{page_name}_page.json"
+
+    def get(self, page_name: str) -> Mapping[str, Any]:
+        """Return the shared read-only elements of a page, reloading the file when its mtime changed."""
+        if not self._loaded:
+            self.load_all()
+
+        element_file = self.file_for(page_name)
+        try:
+            mtime = element_file.stat().st_mtime
+        except FileNotFoundError:
+            error_msg = f"Element file not found: {element_file}"
+            log.error(error_msg)
+            raise FileNotFoundError(error_msg) from None
+
+        cached = self._cache.get(element_file.name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            return self._load(element_file)
+
+    def _load(self, element_file: Path) -> Mapping[str, Any]:
+        mtime = element_file.stat().st_mtime
+        try:
+            with open(element_file) as f:
+                raw = json.load(f)
+        except json.JSONDecodeError as e:
+            error_msg = f"Error decoding JSON from element file: {element_file}. Error: {e}"
+            log.error(error_msg)
+            raise ValueError(error_msg) from e
+
+        elements = MappingProxyType(self._validate(element_file, raw))
+        self._cache[element_file.name] = (mtime, elements)
+        log.info(f"Loaded elements from: {element_file}")
+        return elements
+
+    @staticmethod
+    def _validate(element_file: Path, raw: Any) -> Dict[str, Any]:
+        if not isinstance(raw, dict):
+            raise ValueError(f"Element file must contain a JSON object: {element_file}")
+
+        elements = {}
+        for key, locator_info in raw.items():
+            if isinstance(locator_info, str):
+                elements[key] = locator_info
+                continue
+            if not isinstance(locator_info, dict) or not locator_info.get("value"):
+                raise ValueError(f"Element '{key}' in {element_file} needs a selector string or a 'value'")
+            if locator_info.get("type") == "role" and not locator_info.get("role"):
+                raise ValueError(f"Element '{key}' in {element_file} has type 'role' but no 'role'")
+            elements[key] = MappingProxyType(dict(locator_info))
+        return elements
+
+
+element_registry = ElementRegistry()
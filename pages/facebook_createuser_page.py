@@ -1,5 +1,4 @@
 import os
-import time
 
 from playwright.sync_api import Page
 from .base_page import BasePage
@@ -18,14 +17,6 @@ class FacebookCreateUserPage(BasePage):
         """Click the createUser Button"""
 
         self.click("createUserbutton")
-        # time.sleep(5)
-        # self.click("firstname")
-        # time.sleep(4)
-        # self.click("female")
-        # time.sleep(4)
-        # self.enter_text("Newpassword","fdggffgfg")
-        # time.sleep(4)
-        # self.select_dropdown("day","30")
 
     def click_firstname(self):
         self.click("firstname")
@@ -68,15 +59,13 @@ class FacebookCreateUserPage(BasePage):
 
 
     def registerNewuser(self,first_name,last_name,day,month,year,mobile_number,new_password):
-        self.click_firstname()
-        self.enter_firstname(first_name)
-        self.click_lastname()
-        self.enter_lastname(last_name)
-        self.selectDay(day)
-        self.selectmonth(month)
-        self.selectyest(year)
-        self.selectgender()
-        self.click_mobile()
-        self.enter_mobile(mobile_number)
-        self.click_password()
-        self.enter_password(new_password)
\ No newline at end of file
+        self.fill_form({
+            "firstname": first_name,
+            "lastname": last_name,
+            "day": ("select", day),
+            "month": ("select", month),
+            "year": ("select", year),
+            "female": ("check",),
+            "mobile": mobile_number,
+            "Newpassword": new_password,
+        })
@@ -5,6 +5,9 @@ from .base_page import BasePage
 
 
 class FacebookLoginPage(BasePage):
+    # Cookies Facebook only sets for a logged-in session
+    SESSION_COOKIES = ("c_user",)
+
     def __init__(self, page: Page):
         super().__init__(page)
 
@@ -22,3 +25,10 @@ class FacebookLoginPage(BasePage):
         """Click the login button."""
         self.click("loginButton")
 
+    def wait_for_login_error(self, timeout: int = 10000):
+        """Wait for the error shown after a rejected login (the page may stay on the same URL)."""
+        self.wait_for_element_visible("loginError", timeout=timeout)
+
+    def is_logged_in(self) -> bool:
+        """Whether the browser holds a logged-in session (the session cookie is set)."""
+        return any(cookie["name"] in self.SESSION_COOKIES for cookie in self.page.context.cookies())
@@ -1,25 +1,69 @@
 import json
 import pathlib
-import base64
 import uuid
 import pytest
 import os
+import threading
+import time
 from playwright.sync_api import Playwright, Browser
 from pytest_metadata.plugin import metadata_key
 from dotenv import load_dotenv
 from pathlib import Path
-from utils.logger import customLogger
+from utils.logger import customLogger, configure_logging
 from config.browser_capabilities import get_browser_capabilities
 from utils.db.db_factory import DBFactory
+from utils.db.cleanup import CleanupEngine, CleanupWorker, CLEANUP_MODES
+from utils.db.base_db import ISOLATION_MODES
+from utils.parallel import get_worker_id, get_worker_count, worker_dir, get_run_id, is_xdist_controller, is_parallel_worker
+from utils.context_pool import ContextPool
+from pages.element_registry import element_registry
+from pages.base_page import BasePage, ACTIONABILITY_MODES
+from utils.waits import warn_on_fixed_sleep
+from utils.network_profiles import NetworkShaper, NETWORK_PROFILES
+from utils.har_store import HarStore, NETWORK_MODES, shared_record_keys
+from utils.screenshots import ScreenshotPipeline, SCREENSHOT_FORMATS, EMBED_MODES
+from utils.retry import RetryPolicy
+from utils.run_history import HistoryStore, HistoryRecorder, DEFAULT_DB_PATH, DEFAULT_FLAKY_RUNS
+from utils.sharding import parse_shard, load_or_build_plan
+from utils.incremental import IncrementalRun, inputs_of
+from utils.instrumentation import step_recorder, timeline_html, summarize
+from utils.artifacts import ArtifactRecorder, ARTIFACT_MODES
+from _pytest.runner import runtestprotocol
 from datetime import datetime
+from html import escape
 
 log = customLogger()
 
 # Import fixtures from the fixtures module
-pytest_plugins = ["fixtures.pages"]
-
-# Add a dictionary to track test retries
-test_retries = {}
+pytest_plugins = ["fixtures.pages", "fixtures.auth", "fixtures.data"]
+
+# Attempt number (1-based) of the test run in progress and the exception of its last failed phase
+attempt_key = pytest.StashKey[int]()
+excinfo_key = pytest.StashKey[pytest.ExceptionInfo]()
+network_shaper_key = pytest.StashKey[NetworkShaper]()
+screenshot_pipeline_key = pytest.StashKey[ScreenshotPipeline]()
+artifact_recorder_key = pytest.StashKey[ArtifactRecorder]()
+# Trace/video files kept for the test attempt that just finished, linked from its teardown report
+artifacts_key = pytest.StashKey[list]()
+# Reports of the phases the current attempt has finished, by phase ('setup', 'call', 'teardown')
+phase_reports_key = pytest.StashKey[dict]()
+# Background cleanup thread of --cleanup-mode background, and the cleanup errors of the whole run
+cleanup_worker_key = pytest.StashKey[CleanupWorker]()
+cleanup_errors = []
+# Network profile counters summed over all test reports (on the xdist controller when running in parallel)
+network_totals = {"blocked": 0, "stubbed": 0, "served": 0, "bytes_served": 0, "bytes_saved": 0}
+# Instrumented page object steps per test node id (on the xdist controller when running in parallel)
+step_log = {}
+# One history row per test run in this process, written to the history database at session end
+history_recorder = HistoryRecorder()
+run_started_key = pytest.StashKey[float]()
+shard_summary_key = pytest.StashKey[str]()
+incremental_key = pytest.StashKey[IncrementalRun]()
+# Why a test ran or was skipped in --incremental mode, and the inputs of its passing attempt
+incremental_reason_key = pytest.StashKey[str]()
+incremental_inputs_key = pytest.StashKey[list]()
+# Set in pytest_configure; the HTML column hooks get no config
+incremental_enabled = False
 
 
 # Define command-line options
@@ -38,6 +82,161 @@ def pytest_addoption(parser):
         choices=["chromium", "firefox", "webkit"],
         help="Browser engine: chromium|firefox|webkit"
     )
+    parser.addoption(
+        "--context-pool-size",
+        action="store",
+        default=4,
+        type=int,
+        help="Number of idle browser contexts kept for reuse between tests (0 = new context per test)"
+    )
+    parser.addoption(
+        "--context-warmup",
+        action="store",
+        default=1,
+        type=int,
+        help="Number of browser contexts created up front when the pool starts"
+    )
+    parser.addoption(
+        "--context-reset-verify",
+        action="store",
+        type=lambda x: str(x).lower() == 'true',
+        default=True,
+        help="Verify a recycled context has no cookies/storage left before reuse (default true): true|false"
+    )
+    parser.addoption(
+        "--actionability",
+        action="store",
+        default="strict",
+        choices=ACTIONABILITY_MODES,
+        help="Pre-action checks: strict (explicit expect() waits) | lean (Playwright auto-wait only)"
+    )
+    parser.addoption(
+        "--network-profile",
+        action="store",
+        default="full",
+        choices=list(NETWORK_PROFILES),
+        help="Resources to block/stub for every page: full (nothing) | lean (media, fonts, images, analytics) "
+             "| minimal (everything not needed to drive the UI)"
+    )
+    parser.addoption(
+        "--network-mode",
+        action="store",
+        default="live",
+        choices=NETWORK_MODES,
+        help="live: real network | record: save traffic to HAR files | replay: serve traffic from HAR files"
+    )
+    parser.addoption(
+        "--har-dir",
+        action="store",
+        default="hars",
+        help="Directory (relative to the project root) of the HAR store, one sub directory per env"
+    )
+    parser.addoption(
+        "--har-format",
+        action="store",
+        default="har",
+        choices=["har", "zip"],
+        help="har: bodies shared and deduplicated across the store | zip: one compressed archive per test"
+    )
+    parser.addoption(
+        "--har-not-found",
+        action="store",
+        default="abort",
+        choices=["abort", "fallback"],
+        help="Replay policy for requests missing from the HAR: abort them | fall back to the live network"
+    )
+    parser.addoption(
+        "--screenshot-format",
+        action="store",
+        default="jpeg",
+        choices=SCREENSHOT_FORMATS,
+        help="Failure screenshot format: png|jpeg|webp (webp needs Pillow)"
+    )
+    parser.addoption(
+        "--screenshot-quality",
+        action="store",
+        default=80,
+        type=int,
+        help="Failure screenshot quality for jpeg/webp (0-100)"
+    )
+    parser.addoption(
+        "--screenshot-full-page",
+        action="store",
+        type=lambda x: str(x).lower() == 'true',
+        default=False,
+        help="Capture the full scrollable page instead of the viewport: true|false"
+    )
+    parser.addoption(
+        "--screenshot-embed",
+        action="store",
+        default="thumbnail",
+        choices=EMBED_MODES,
+        help="How failure screenshots appear in the HTML report: inline|thumbnail|link"
+    )
+    # --trace, --tracing and --video already belong to pytest and pytest-playwright
+    parser.addoption(
+        "--trace-mode",
+        action="store",
+        default="off",
+        choices=ARTIFACT_MODES,
+        help="Playwright tracing per test attempt: off|on|retain-on-failure|on-first-retry"
+    )
+    parser.addoption(
+        "--video-mode",
+        action="store",
+        default="off",
+        choices=ARTIFACT_MODES,
+        help="Video recording per test attempt: off|on|retain-on-failure|on-first-retry"
+    )
+    parser.addoption(
+        "--artifacts-dir",
+        action="store",
+        default="artifacts",
+        help="Directory for kept traces and videos"
+    )
+    parser.addoption(
+        "--artifacts-max-mb",
+        action="store",
+        default=500,
+        type=float,
+        help="Total size in MB of traces and videos kept per run (split evenly across workers)"
+    )
+    parser.addoption(
+        "--cleanup-mode",
+        action="store",
+        default="immediate",
+        choices=CLEANUP_MODES,
+        help="Delete registered test data after each test (immediate), on a background thread while tests "
+             "keep running (background) or in one bulk pass at session end (deferred)"
+    )
+    parser.addoption(
+        "--db-isolation",
+        action="store",
+        default="delete",
+        choices=ISOLATION_MODES,
+        help="Undo writes made through the db fixture by rolling back a per-test savepoint (rollback, "
+             "MySQL/PostgreSQL only) instead of leaving them to cleanup deletes (delete)"
+    )
+    parser.addoption(
+        "--cleanup-queue-size",
+        action="store",
+        default=1000,
+        type=int,
+        help="Registrations the background cleanup worker may hold before tests wait for it"
+    )
+    parser.addoption(
+        "--auth-state-dir",
+        action="store",
+        default=".auth",
+        help="Directory (relative to the project root) where logged-in storage states are cached"
+    )
+    parser.addoption(
+        "--auth-state-ttl",
+        action="store",
+        default=30,
+        type=int,
+        help="Minutes a cached logged-in storage state stays valid (0 = always log in again)"
+    )
     parser.addoption(
         "--headless",
         action="store",
@@ -57,8 +256,138 @@ def pytest_addoption(parser):
         action="store",
         default=0,
         type=int,
-        help="Number of times to retry failed tests after session"
+        help="Number of times to retry a failed test immediately (overridden by @pytest.mark.flaky)"
+    )
+    parser.addoption(
+        "--history-db",
+        action="store",
+        default=str(DEFAULT_DB_PATH),
+        help="SQLite database that keeps the outcome and duration of every test run"
+    )
+    parser.addoption(
+        "--no-history",
+        action="store_true",
+        default=False,
+        help="Do not record this run in the history database"
+    )
+    parser.addoption(
+        "--auto-retry-flaky",
+        action="store",
+        default=0,
+        type=int,
+        help="Retries given to tests the history database shows as flaky (0 = off; @pytest.mark.flaky wins)"
+    )
+    parser.addoption(
+        "--flaky-threshold",
+        action="store",
+        default=0.1,
+        type=float,
+        help="Share of recent runs a test must have failed or needed a retry in to count as flaky"
+    )
+    parser.addoption(
+        "--flaky-window",
+        action="store",
+        default=DEFAULT_FLAKY_RUNS,
+        type=int,
+        help="Number of a test's most recent runs that decide whether it is flaky"
+    )
+    parser.addoption(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Skip tests that passed before with unchanged inputs (module, page objects, elements, testdata, env)"
+    )
+    parser.addoption(
+        "--target-build",
+        action="store",
+        default=os.getenv("TARGET_BUILD"),
+        help="Id of the build under test; passes recorded against another build are not reused"
+    )
+    parser.addoption(
+        "--incremental-max-age",
+        action="store",
+        default=24,
+        type=float,
+        help="Hours a previous pass may be reused in --incremental mode before the test runs again"
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        type=parse_shard,
+        help="Run only shard INDEX of COUNT (e.g. 2/4), split on historical test durations"
+    )
+    parser.addoption(
+        "--shard-plan",
+        action="store",
+        default=None,
+        help="JSON shard plan to reuse (created on first use), so every CI node agrees on the split"
     )
+    parser.addoption(
+        "--rebuild-shard-plan",
+        action="store_true",
+        default=False,
+        help="Replace a --shard-plan that was built for other tests instead of failing"
+    )
+    parser.addoption(
+        "--log-json",
+        action="store_true",
+        default=False,
+        help="Also write Logs/ as JSON lines with the test node id and worker id of every record"
+    )
+    parser.addoption(
+        "--log-max-mb",
+        action="store",
+        default=10,
+        type=float,
+        help="Size in MB at which a framework log file is rotated and gzipped"
+    )
+    parser.addoption(
+        "--log-backups",
+        action="store",
+        default=5,
+        type=int,
+        help="Rotated (gzipped) framework log files kept per run and worker"
+    )
+    parser.addoption(
+        "--log-retention-days",
+        action="store",
+        default=7,
+        type=float,
+        help="Delete framework log files older than this many days (0 = keep all)"
+    )
+    parser.addoption(
+        "--instrument-steps",
+        action="store_true",
+        default=False,
+        help="Time every page object action/verify/wait and add a step timeline to the report"
+    )
+    parser.addoption(
+        "--steps-json",
+        action="store",
+        default=None,
+        help="Write the instrumented steps of every test to this JSON file (implies --instrument-steps)"
+    )
+    parser.addoption(
+        "--workers",
+        action="store",
+        default=None,
+        help="Run tests in parallel worker processes: auto|<number> (requires pytest-xdist)"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    workers = config.getoption("--workers")
+    # xdist workers inherit the option, only the controller may spawn processes
+    if not workers or hasattr(config, "workerinput"):
+        return
+
+    if not config.pluginmanager.hasplugin("xdist"):
+        pytest.exit("--workers requires pytest-xdist: pip install pytest-xdist")
+
+    if not config.option.numprocesses:
+        config.option.numprocesses = workers if workers in ("auto", "logical") else int(workers)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -87,6 +416,7 @@ def browser(request, playwright: Playwright):
         test_name = request.node.name
         caps = get_browser_capabilities(cloud, test_name)
         browser = playwright[browser_name].launch(headless=headless)
+        log.info(f"Launched {browser_name} for worker {get_worker_id()}")
         yield browser
         browser.close()
     else:
@@ -104,22 +434,111 @@ def browser(request, playwright: Playwright):
         browser.close()
 
 
+# Context pool fixture, one per browser (and therefore one per worker)
+@pytest.fixture(scope="session")
+def context_pool(browser: Browser, request):
+    cloud = request.config.getoption("--cloud")
+    caps = get_browser_capabilities(cloud, request.node.name)
+    context_options = {"viewport": caps["viewport"]}
+    recorder = request.config.stash[artifact_recorder_key]
+    if recorder.pooled_video:
+        context_options.update(recorder.video_options())
+    pool = ContextPool(
+        browser,
+        context_options=context_options,
+        size=request.config.getoption("--context-pool-size"),
+        warmup=request.config.getoption("--context-warmup"),
+        verify_reset=request.config.getoption("--context-reset-verify"),
+    )
+    yield pool
+    pool.close()
+
+
+def _har_store(config) -> HarStore:
+    project_root = Path(__file__).parent.parent
+    return HarStore(
+        project_root / config.getoption("--har-dir") / config.getoption("--env"),
+        har_format=config.getoption("--har-format"),
+        not_found=config.getoption("--har-not-found"),
+    )
+
+
+# HAR store fixture for --network-mode record|replay
+@pytest.fixture(scope="session")
+def har_store(request):
+    return _har_store(request.config)
+
+
 # Page fixture
 @pytest.fixture(scope="function")
-def page(browser: Browser, request):
-    cloud = request.config.getoption("--cloud")
-    test_name = request.node.name
-    caps = get_browser_capabilities(cloud, test_name)
-    context = browser.new_context(viewport=caps["viewport"])
+def page(context_pool: ContextPool, har_store: HarStore, request):
+    # Tests marked 'isolated' never share a context with another test
+    strict = request.node.get_closest_marker("isolated") is not None
+    # Tests marked 'auth_user(username, password)' start from the cached logged-in storage state
+    auth_user = request.node.get_closest_marker("auth_user")
+    storage_state = None
+    if auth_user:
+        storage_state = request.getfixturevalue("authenticated_state")(*auth_user.args, **auth_user.kwargs)
+
+    # Tests marked 'har(name)' share one HAR, e.g. every test of the same page
+    network_mode = request.config.getoption("--network-mode")
+    har_marker = request.node.get_closest_marker("har")
+    har_key = har_marker.args[0] if har_marker else request.node.nodeid
+    recording = network_mode == "record"
+
+    # --video-mode on-first-retry records the retry in a fresh context; pooled contexts record no video
+    recorder = request.config.stash[artifact_recorder_key]
+    attempt = request.node.stash.get(attempt_key, 1)
+    video_options = {}
+    if recorder.video_mode == "on-first-retry" and recorder.records(recorder.video_mode, attempt):
+        video_options = recorder.video_options()
+
+    if recording:
+        # The HAR is written when the context closes, so recording never uses a pooled context
+        context = context_pool.acquire(storage_state=storage_state, **har_store.record_options(har_key),
+                                       **video_options)
+    else:
+        context = context_pool.acquire(strict=strict, storage_state=storage_state, **video_options)
+        # With --har-not-found fallback the test keeps this context and goes to the live network
+        if network_mode == "replay" and not har_store.replay(context, har_key) and har_store.not_found == "abort":
+            context_pool.release(context, discard=bool(video_options))
+            pytest.skip(f"No HAR recorded for '{har_key}', run with --network-mode record first")
+
+    # Per-test overrides: @pytest.mark.network_profile("full") and @pytest.mark.network_allow("*.fbcdn.net")
+    profile_marker = request.node.get_closest_marker("network_profile")
+    allow_marker = request.node.get_closest_marker("network_allow")
+    shaper = NetworkShaper(
+        profile_marker.args[0] if profile_marker else request.config.getoption("--network-profile"),
+        allowlist=allow_marker.args if allow_marker else (),
+    )
+    shaper.install(context)
+    request.node.stash[network_shaper_key] = shaper
+
+    tracing = recorder.start(context, request.node.nodeid, attempt)
     page = context.new_page()
-    yield page
-    context.close()
+    with warn_on_fixed_sleep():
+        yield page
+    # Skips and expected failures also leave an exception behind, only real failures keep their artifacts
+    failed = any(report.failed for report in request.node.stash.get(phase_reports_key, {}).values())
+    request.node.stash[artifacts_key] = recorder.finish(context, page, request.node.nodeid, attempt, failed, tracing)
+    shaper.uninstall()
+    context_pool.release(context, discard=strict or recording or bool(video_options))
+
+
+def pytest_sessionstart(session):
+    # Validate every element file once up front so a bad file fails the run before any test starts
+    try:
+        element_registry.load_all()
+    except (ValueError, OSError) as e:
+        pytest.exit(f"Invalid element files: {e}")
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_setup(item):
 
     log.info(f"Testcase.....{item.name}.....Start now ..........................................................")
+    BasePage.reset_round_trips()
+    step_recorder.reset()
 
 
 def pytest_runtest_teardown(item):
@@ -136,12 +555,218 @@ def pytest_metadata(metadata):
 
 
 def pytest_configure(config):
+    configure_logging(
+        json_lines=config.getoption("--log-json"),
+        max_bytes=int(config.getoption("--log-max-mb") * 1024 * 1024),
+        backup_count=config.getoption("--log-backups"),
+        retention_days=config.getoption("--log-retention-days"),
+    )
     pytest_html = config.pluginmanager.getplugin("html")
     config.stash[metadata_key]["Report ID"] = str(uuid.uuid4())[:8]
     config.stash[metadata_key]["Project Name"] = "Playwright Python Automation"
     config.stash[metadata_key]["Version"] = "1.0.0"
     config.stash[metadata_key]["Execution Time"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     config.stash[metadata_key]["Author"] = "Dipankar"
+    config.stash[metadata_key]["Actionability"] = config.getoption("--actionability")
+    config.stash[metadata_key]["Run ID"] = get_run_id()
+    config.stash[run_started_key] = time.time()
+    global incremental_enabled
+    incremental_enabled = config.getoption("--incremental")
+    BasePage.set_actionability_mode(config.getoption("--actionability"))
+    if config.getoption("--instrument-steps") or config.getoption("--steps-json"):
+        step_recorder.instrument(BasePage)
+
+    html_path = getattr(config.option, "htmlpath", None)
+    config.stash[artifact_recorder_key] = ArtifactRecorder(
+        worker_dir(pathlib.Path().resolve() / config.getoption("--artifacts-dir"), create=False),
+        trace_mode=config.getoption("--trace-mode"),
+        video_mode=config.getoption("--video-mode"),
+        max_bytes=int(config.getoption("--artifacts-max-mb") * 1024 * 1024 / get_worker_count()),
+        report_dir=pathlib.Path(html_path).resolve().parent if html_path else None,
+    )
+    config.stash[screenshot_pipeline_key] = ScreenshotPipeline(
+        worker_dir(pathlib.Path().resolve() / "screenshots"),
+        report_dir=pathlib.Path(html_path).resolve().parent if html_path else None,
+        image_format=config.getoption("--screenshot-format"),
+        quality=config.getoption("--screenshot-quality"),
+        full_page=config.getoption("--screenshot-full-page"),
+        embed=config.getoption("--screenshot-embed"),
+    )
+
+
+def pytest_unconfigure(config):
+    # Close every pooled database connection of this process
+    DBFactory.close_all()
+
+    # Flush screenshots still being encoded/written in the background
+    pipeline = config.stash.get(screenshot_pipeline_key, None)
+    if pipeline is not None:
+        pipeline.close()
+
+    # Compact the HAR store once, in the process that outlives every xdist worker
+    if config.getoption("--network-mode") == "record" and not hasattr(config, "workerinput"):
+        _har_store(config).compact()
+
+
+# trylast: shard what is left after -k/-m and other plugins deselected tests
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--network-mode") == "record":
+        shared = shared_record_keys((item.nodeid, item.get_closest_marker("har").args[0])
+                                    for item in items if item.get_closest_marker("har"))
+        if shared:
+            raise pytest.UsageError(f"Tests sharing a har marker would overwrite each other's HAR in record mode, "
+                                    f"record them one at a time or give them their own names: {shared}")
+
+    if config.getoption("--shard"):
+        _select_shard(config, items)
+
+    if config.getoption("--incremental"):
+        _select_incremental(config, items)
+
+    retries = config.getoption("--auto-retry-flaky")
+    history_db = Path(config.getoption("--history-db"))
+    if retries < 1 or not history_db.exists():
+        return
+
+    store = HistoryStore(history_db)
+    try:
+        flaky = {row["nodeid"]: row["flaky_rate"]
+                 for row in store.flaky_tests(threshold=config.getoption("--flaky-threshold"),
+                                             last_runs=config.getoption("--flaky-window"))}
+    finally:
+        store.close()
+
+    for item in items:
+        if item.nodeid in flaky and item.get_closest_marker("flaky") is None:
+            item.add_marker(pytest.mark.flaky(max_attempts=retries + 1))
+            log.info(f"Testcase.....{item.name}.....flaky in {flaky[item.nodeid]:.0%} of recent runs, "
+                     f"allowing {retries} retries")
+
+
+def _select_shard(config, items):
+    index, count = config.getoption("--shard")
+    durations = {}
+    history_db = Path(config.getoption("--history-db"))
+    if history_db.exists():
+        store = HistoryStore(history_db)
+        try:
+            durations = store.average_durations()
+        finally:
+            store.close()
+
+    plan_path = config.getoption("--shard-plan")
+    try:
+        plan = load_or_build_plan(Path(plan_path) if plan_path else None, [item.nodeid for item in items],
+                                  count, durations, rebuild=config.getoption("--rebuild-shard-plan"))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    selected, deselected = [], []
+    for item in items:
+        (selected if plan.shard_of(item.nodeid) == index - 1 else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+    summary = (f"shard {index}/{count}: {len(selected)} tests, estimated {plan.estimates[index - 1]:.0f}s "
+               f"(shards {', '.join(f'{estimate:.0f}s' for estimate in plan.estimates)}, "
+               f"imbalance {plan.imbalance():.1%})")
+    config.stash[shard_summary_key] = summary
+    log.info(summary)
+
+
+def _select_incremental(config, items):
+    env = config.getoption("--env")
+    previous = {}
+    history_db = Path(config.getoption("--history-db"))
+    if history_db.exists():
+        store = HistoryStore(history_db)
+        try:
+            previous = store.fingerprints(env)
+        finally:
+            store.close()
+
+    run = IncrementalRun(
+        env,
+        context={"env": env, "base_url": config.getoption("base_url", None)},
+        previous=previous,
+        build_id=config.getoption("--target-build"),
+        max_age_hours=config.getoption("--incremental-max-age"),
+        shared_files=[f"config/environments/.env.{env}"],
+    )
+    config.stash[incremental_key] = run
+
+    skipped = 0
+    for item in items:
+        skip, reason = run.decide(item.nodeid)
+        item.stash[incremental_reason_key] = reason
+        if skip:
+            item.add_marker(pytest.mark.skip(reason=f"incremental {reason}"))
+            skipped += 1
+    log.info(f"Incremental run: {skipped} of {len(items)} tests unchanged since their last pass")
+
+
+def _track_incremental(item, report):
+    run = item.config.stash.get(incremental_key, None)
+    if run is None:
+        return
+    report.incremental = item.stash.get(incremental_reason_key, "")
+
+    if report.failed:
+        run.forget(item.nodeid)
+        if incremental_inputs_key in item.stash:
+            del item.stash[incremental_inputs_key]
+    elif report.when == "call" and report.passed and not hasattr(report, "wasxfail"):
+        item.stash[incremental_inputs_key] = inputs_of(item)
+    elif report.when == "teardown" and incremental_inputs_key in item.stash:
+        run.remember(item.nodeid, item.stash[incremental_inputs_key])
+        del item.stash[incremental_inputs_key]
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    steps_json = config.getoption("--steps-json")
+    # The controller (or the only process when running serially) has every test's steps
+    if steps_json and not is_parallel_worker():
+        Path(steps_json).parent.mkdir(parents=True, exist_ok=True)
+        with open(steps_json, "w", encoding="utf-8") as f:
+            json.dump({"run_id": get_run_id(), "tests": step_log}, f, indent=2)
+
+    # Deferred cleanup: every process deletes the data its own tests registered
+    if _deferred_cleanup:
+        _clean_registrations(_deferred_cleanup)
+        _deferred_cleanup.clear()
+    worker = config.stash.get(cleanup_worker_key, None)
+    if worker is not None:
+        worker.close()
+        cleanup_errors.extend(worker.errors)
+        # xdist workers hand their errors to the controller, which prints the summary
+        if hasattr(config, "workeroutput"):
+            config.workeroutput["cleanup_errors"] = worker.errors
+
+    # Every xdist worker writes its own results; the controller ran no tests itself
+    if config.getoption("--no-history") or is_xdist_controller(config):
+        return
+
+    store = HistoryStore(config.getoption("--history-db"))
+    try:
+        store.record(
+            get_run_id(),
+            history_recorder.rows(),
+            env=config.getoption("--env"),
+            browser=config.getoption("--browser-engine"),
+            cloud=config.getoption("--cloud"),
+            worker=get_worker_id(),
+            started_at=config.stash.get(run_started_key, None),
+        )
+        incremental = config.stash.get(incremental_key, None)
+        if incremental is not None:
+            store.save_fingerprints(incremental.env, incremental.pending)
+    except Exception as e:
+        log.warning(f"Recording test history failed: {e}")
+    finally:
+        store.close()
 
 
 def pytest_html_report_title(report):
@@ -155,22 +780,37 @@ def pytest_runtest_makereport(item, call):
     report = outcome.get_result()
     extra = getattr(report, 'extra', [])
 
-    # Initialize retry count for the test if not exists
-    if item.nodeid not in test_retries:
-        test_retries[item.nodeid] = {
-            'retries': 0,
-            'status': []
-        }
+    attempt = item.stash.get(attempt_key, 1)
+    if report.when in ('setup', 'call') and call.excinfo is not None:
+        item.stash[excinfo_key] = call.excinfo
+    item.stash.setdefault(phase_reports_key, {})[report.when] = report
+
+    # Attach retry count to every phase so it shows in HTML and travels with xdist reports
+    report.retry_count = attempt - 1
+    _track_incremental(item, report)
 
     # Only track status for 'call' phase (actual test execution)
     if report.when == 'call':
-        # Track the status of each attempt
-        test_retries[item.nodeid]['status'].append(report.outcome)
-
-        # 🔹 Attach retry count to the report so it shows in HTML
-        report.retry_count = test_retries[item.nodeid]['retries']
-
-        print(f"Test {item.nodeid} - Attempt {test_retries[item.nodeid]['retries'] + 1}: {report.outcome}")
+        print(f"Test {item.nodeid} - Attempt {attempt}: {report.outcome}")
+
+        # Report how many protocol round-trips the page objects issued in this actionability mode
+        round_trips = BasePage.round_trips
+        report.user_properties.append(("round_trips", round_trips))
+        report.sections.append((
+            "Actionability",
+            f"mode={BasePage.actionability_mode} protocol round-trips={round_trips}"
+        ))
+        log.info(f"Testcase.....{item.name}.....{round_trips} round-trips in {BasePage.actionability_mode} mode")
+
+        steps = step_recorder.take()
+        if steps:
+            report.user_properties.append(("steps", steps))
+            extra.append(pytest_html.extras.html(timeline_html(steps)))
+
+        shaper = item.stash.get(network_shaper_key, None)
+        if shaper is not None and shaper.active:
+            report.user_properties.append(("network", dict(shaper.stats)))
+            report.sections.append(("Network", shaper.summary()))
 
     if report.when in ('call', 'setup'):
         xfail = hasattr(report, 'wasxfail')
@@ -178,81 +818,108 @@ def pytest_runtest_makereport(item, call):
             page = item.funcargs.get("page", None)
             if page:
                 try:
-                    project_root = pathlib.Path().resolve()
-                    screenshots_dir = project_root / "screenshots"
-                    screenshots_dir.mkdir(parents=True, exist_ok=True)
-
-                    file_name = f"{report.nodeid.replace('::', '_').replace('/', '_')}_attempt_{test_retries[item.nodeid]['retries'] + 1}.png"
-                    screenshot_path = screenshots_dir / file_name
-
-                    page.screenshot(path=str(screenshot_path), full_page=True)
-
-                    with open(screenshot_path, "rb") as f:
-                        encoded_image = base64.b64encode(f.read()).decode("utf-8")
-                        html = (
-                            f'<div><img src="data:image/png;base64,{encoded_image}" '
-                            f'style="width:400px;height:auto;" '
-                            f'onclick="window.open(this.src)" align="right"/></div>'
-                        )
-                        extra.append(pytest_html.extras.html(html))
+                    html = item.config.stash[screenshot_pipeline_key].capture(page)
+                    extra.append(pytest_html.extras.html(html))
                 except Exception as e:
                     print(f"Screenshot capture failed: {e}")
 
         report.extras = extra
 
+    if report.when == 'teardown' and artifacts_key in item.stash:
+        artifacts = item.stash[artifacts_key]
+        del item.stash[artifacts_key]
+        if artifacts:
+            extra.append(pytest_html.extras.html(item.config.stash[artifact_recorder_key].links_html(artifacts)))
+            report.extras = extra
 
-def pytest_sessionfinish(session, exitstatus):
-    retry_count = session.config.getoption("--retries")
-    if retry_count < 1:
-        return
 
-    # Collect failed tests
-    failed_tests = []
-    for item in session.items:
-        if item.nodeid in test_retries:
-            # Check if the test has any failed attempts and the last status is failed
-            if 'failed' in test_retries[item.nodeid]['status'] and test_retries[item.nodeid]['status'][-1] == 'failed':
-                failed_tests.append(item)
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Retry a failed test right away, keeping session fixtures such as the browser alive."""
+    policy = RetryPolicy.for_item(item, item.config.getoption("--retries"))
+    if policy.max_attempts <= 1:
+        return None
+
+    # Only tear down what the next test does not share; after the last test pytest tears down the rest
+    teardown_to = nextitem if nextitem is not None else item.parent
+
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for attempt in range(1, policy.max_attempts + 1):
+        item.stash[attempt_key] = attempt
+        if excinfo_key in item.stash:
+            del item.stash[excinfo_key]
+        item.stash[phase_reports_key] = {}
+        reports = runtestprotocol(item, nextitem=teardown_to, log=False)
+
+        failed = any(report.failed for report in reports if report.when in ('setup', 'call'))
+        retry = failed and policy.should_retry(attempt, item.stash.get(excinfo_key, None))
+        for report in reports:
+            if retry and report.failed and report.when in ('setup', 'call'):
+                report.outcome = "rerun"
+            item.ihook.pytest_runtest_logreport(report=report)
+
+        if not retry:
+            break
+        print(f"Retrying {item.nodeid} (attempt {attempt + 1} of {policy.max_attempts})")
+        _reset_failed_fixtures(item)
+
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+def _reset_failed_fixtures(item):
+    """Drop cached errors of higher-scoped fixtures so the retry sets them up again; healthy ones are reused."""
+    for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+        for fixturedef in fixturedefs:
+            cached_result = getattr(fixturedef, "cached_result", None)
+            if cached_result is not None and cached_result[2] is not None:
+                fixturedef.cached_result = None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    cleanup_errors.extend(tuple(entry) for entry in getattr(node, "workeroutput", {}).get("cleanup_errors", []))
 
-    if not failed_tests:
-        return
 
-    print(f"Retrying {len(failed_tests)} failed test(s) up to {retry_count} time(s)...")
+def pytest_runtest_logreport(report):
+    history_recorder.add(report)
+    for name, value in report.user_properties:
+        if name == "network":
+            for counter, amount in value.items():
+                network_totals[counter] += amount
+        elif name == "steps":
+            step_log.setdefault(report.nodeid, []).extend(value)
 
-    for item in failed_tests:
-        # keep retrying until pass or hit retry_count
-        while test_retries[item.nodeid]['retries'] < retry_count:
-            test_retries[item.nodeid]['retries'] += 1
-            attempt = test_retries[item.nodeid]['retries']
-            print(f"\nRetry #{attempt} for {item.nodeid}")
 
-            # Store the status count before retry to check for new results
-            status_count_before = len(test_retries[item.nodeid]['status'])
+def pytest_terminal_summary(terminalreporter, config):
+    shard_summary = config.stash.get(shard_summary_key, None)
+    if shard_summary:
+        terminalreporter.write_sep("-", "shard")
+        terminalreporter.write_line(shard_summary)
 
-            # Execute the test again
-            item.config.hook.pytest_runtest_protocol(item=item, nextitem=None)
+    if any(network_totals.values()):
+        terminalreporter.write_sep("-", "network profile")
+        terminalreporter.write_line(
+            f"blocked={network_totals['blocked']} stubbed={network_totals['stubbed']} "
+            f"served={network_totals['served']} bytes served={network_totals['bytes_served']} "
+            f"bytes saved (estimated)={network_totals['bytes_saved']}"
+        )
 
-            # Wait for the status to be updated and check if we have a new result
-            status_count_after = len(test_retries[item.nodeid]['status'])
+    if cleanup_errors:
+        terminalreporter.write_sep("-", "test data cleanup errors", red=True)
+        for nodeid, table_name, condition, error in cleanup_errors:
+            terminalreporter.write_line(f"{nodeid}: {table_name} WHERE {condition}: {error}")
 
-            # If we have a new status entry and it's passed, stop retrying
-            if status_count_after > status_count_before:
-                latest_status = test_retries[item.nodeid]['status'][-1]
-                print(f"Latest status for {item.nodeid}: {latest_status}")
+    step_summary = summarize(step_log)
+    if step_summary:
+        terminalreporter.write_sep("-", "page object steps")
+        for line in step_summary:
+            terminalreporter.write_line(line)
 
-                if latest_status == "passed":
-                    print(f"{item.nodeid} passed on retry #{attempt}")
-                    break
-                else:
-                    print(f" {item.nodeid} failed on retry #{attempt}")
-            else:
-                print(f" No status update detected for {item.nodeid} on retry #{attempt}")
 
-        # Final status check after all retries
-        if test_retries[item.nodeid]['retries'] >= retry_count:
-            final_status = test_retries[item.nodeid]['status'][-1] if test_retries[item.nodeid]['status'] else 'unknown'
-            if final_status != "passed":
-                print(f" {item.nodeid} failed after {retry_count} retries. Final status: {final_status}")
+def pytest_report_teststatus(report):
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
 
 
 @pytest.hookimpl(trylast=True)
@@ -264,86 +931,73 @@ def pytest_html_results_table_row(report, cells):
     else:
         cells.insert(2, '<td class="col-retries">0</td>')
 
+    if incremental_enabled:
+        cells.insert(3, f'<td class="col-incremental">{escape(getattr(report, "incremental", ""))}</td>')
+
 
 @pytest.hookimpl(trylast=True)
 def pytest_html_results_table_header(cells):
     cells.insert(2, '<th class="sortable col-retries" data-column-type="retries">Retries</th>')
+    if incremental_enabled:
+        cells.insert(3, '<th class="col-incremental">Incremental</th>')
 
 
-def pytest_sessionfinish(session, exitstatus):
-    retry_count = session.config.getoption("--retries")
-    if retry_count < 1:
-        return
+# Cleanup registrations keyed by test nodeid, so concurrent tests never drain each other's data
+_test_data_store = {}
+_test_data_lock = threading.Lock()
+_current_test = threading.local()
+# Registrations held back until session end by --cleanup-mode deferred
+_deferred_cleanup = []
 
-    # Collect failed tests
-    failed_tests = []
-    for item in session.items:
-        if item.nodeid in test_retries:
-            if 'failed' in test_retries[item.nodeid]['status']:
-                failed_tests.append(item)
 
-    if not failed_tests:
+def _clean_registrations(registrations):
+    dbuse = os.getenv("DBUSE")
+    if not dbuse:
+        print("Skipping DB cleanup: no DBUSE configured")
         return
 
-    print(f"\nRetrying {len(failed_tests)} failed test(s) up to {retry_count} time(s)...")
-
-    for item in failed_tests:
-        # keep retrying until pass or hit retry_count
-        while test_retries[item.nodeid]['retries'] < retry_count:
-            attempt = test_retries[item.nodeid]['retries'] + 1
-            print(f"\nRetry #{attempt} for {item.nodeid}")
-
-            # Execute the test again
-            item.config.hook.pytest_runtest_protocol(item=item, nextitem=None)
-
-            # Update retry counter
-            test_retries[item.nodeid]['retries'] += 1
-
-            # If test passed, stop retrying this one
-            if test_retries[item.nodeid]['status'][-1] == "passed":
-                print(f" {item.nodeid} passed on retry #{attempt}")
-                break
-
-
-
+    try:
+        deleted, errors = CleanupEngine(dbuse).run(registrations)
+        print(f"Deleted {sum(deleted.values())} records from {len(deleted)} table(s)")
+        for table_name, failed in errors.items():
+            for condition, error in failed.items():
+                print(f" DB cleanup of {table_name} where {condition} failed: {error}")
+    except Exception as e:
+        print(f" DB cleanup skipped due to error: {e}")
 
-_test_data_store = []
 
 @pytest.fixture(autouse=True)
 def track_and_clean_test_data(request):
-    """Tracks test data and cleans it up after each test."""
+    """Tracks test data and cleans it up after each test (or at session end in deferred mode)."""
+    _current_test.nodeid = request.node.nodeid
 
     yield  # Run the test first
 
+    _current_test.nodeid = None
+    with _test_data_lock:
+        registrations = _test_data_store.pop(request.node.nodeid, [])
+
     # Skip DB connection if no test data registered
-    if not _test_data_store:
+    if not registrations:
         return
 
-    dbuse = os.getenv("DBUSE")
-    if not dbuse:
-        print("Skipping DB cleanup: no DBUSE configured")
+    cleanup_mode = request.config.getoption("--cleanup-mode")
+    if cleanup_mode == "deferred":
+        _deferred_cleanup.extend(registrations)
         return
-
-    try:
-        cosmos_db = DBFactory.get_db(dbuse)
-        for container_name, condition in _test_data_store:
-            existing_data = cosmos_db.execute_query(
-                f"SELECT * FROM c WHERE {condition}",
-                container_name=container_name
-            )
-
-            if existing_data:
-                cosmos_db.clean_test_data(container_name, condition)
-                print(f"Deleted {len(existing_data)} records from {container_name}")
-            else:
-                print(f"No data matching '{condition}' in {container_name}")
-    except Exception as e:
-        print(f" DB cleanup skipped due to error: {e}")
-
-    _test_data_store.clear()
-
+    if cleanup_mode == "background" and os.getenv("DBUSE"):
+        worker = request.config.stash.get(cleanup_worker_key, None)
+        if worker is None:
+            worker = CleanupWorker(CleanupEngine(os.getenv("DBUSE")),
+                                   max_queue=request.config.getoption("--cleanup-queue-size"))
+            request.config.stash[cleanup_worker_key] = worker
+        worker.submit(request.node.nodeid, registrations)
+        return
+    _clean_registrations(registrations)
 
 
 # Helper function to register data for cleanup
 def add_for_cleanup(table_name: str, condition: str):
-    _test_data_store.append((table_name, condition))
\ No newline at end of file
+    nodeid = getattr(_current_test, "nodeid", None) or os.getenv("PYTEST_CURRENT_TEST", "").split(" ")[0]
+    with _test_data_lock:
+        _test_data_store.setdefault(nodeid, []).append((table_name, condition))
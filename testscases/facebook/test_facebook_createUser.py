@@ -23,7 +23,6 @@
 #
 
 import os
-import time
 import pytest
 from faker import Faker
 
@@ -49,7 +48,6 @@ def test_invalid_createUser(facebook_createUser_page,case):
     case["mobileNumber"]=fake.phone_number()
 
     facebook_createUser_page.registerNewuser(first_name=case["firstname"],last_name=case["lastname"],day=case["day"],month=case["month"],year=case["year"],mobile_number=case["mobileNumber"],new_password=case["newPassword"])
-    time.sleep(5)
     facebook_createUser_page.clickSignupButton()
 
 
@@ -1,5 +1,4 @@
 import os
-import time
 import random
 
 import pytest
@@ -7,6 +6,7 @@ from faker import Faker
 
 from testscases.conftest import add_for_cleanup
 from utils.file_reader import read_file
+from utils.waits import WaitStrategies
 
 testcasedata = read_file("facebook",'facebook_login_data.json')
 fake = Faker()
@@ -17,8 +17,7 @@ fake = Faker()
 def test_valid_login(facebook_login_page,case):
     facebook_login_page.navigate_to_facebook()
     facebook_login_page.enter_credentials(case["usename"], case["password"])
-    facebook_login_page.click_loginbutto()
-    time.sleep(5)
+    WaitStrategies.for_navigation(facebook_login_page.page, facebook_login_page.click_loginbutto)
 
     print(os.getenv("COSMOS_DB_CUSTOMER_CONTAINER"))
     print(os.getenv("COSMOS_DB_VENDOR_CONTAINER"))
@@ -44,5 +43,4 @@ def test_Invalid_login(facebook_login_page,case):
     facebook_login_page.navigate_to_facebook()
     facebook_login_page.enter_credentials(case["usename"], case["password"] )
     facebook_login_page.click_loginbutto()
-    time.sleep(5)
-
+    facebook_login_page.wait_for_login_error()
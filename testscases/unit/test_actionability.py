@@ -0,0 +1,77 @@
+import pytest
+
+import pages.base_page as base_page
+from pages.base_page import BasePage
+
+
+class FakeLocator:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def click(self, **kwargs):
+        self.calls.append("click")
+
+    def fill(self, text):
+        self.calls.append("fill")
+
+
+class FakeAssertions:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def to_be_visible(self, timeout=None):
+        self.calls.append("expect visible")
+
+    def to_be_enabled(self, timeout=None):
+        self.calls.append("expect enabled")
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    def locator(self, selector):
+        return FakeLocator(self.calls)
+
+
+class LoginPage(BasePage):
+    def _load_elements(self):
+        self.elements = {"email": "#email", "login": "button[name=login]"}
+
+
+@pytest.fixture
+def page(monkeypatch):
+    page = FakePage()
+    monkeypatch.setattr(base_page, "expect", lambda locator: FakeAssertions(page.calls))
+    BasePage.reset_round_trips()
+    yield page
+    BasePage.set_actionability_mode("strict")
+    BasePage.reset_round_trips()
+
+
+def test_strict_mode_checks_before_acting(page):
+    BasePage.set_actionability_mode("strict")
+    login_page = LoginPage(page)
+
+    login_page.enter_text("email", "admin")
+    login_page.click("login")
+
+    assert page.calls == ["expect visible", "fill", "expect visible", "expect enabled", "click"]
+    assert BasePage.reset_round_trips() == 5
+
+
+def test_lean_mode_leaves_checks_to_the_action(page):
+    BasePage.set_actionability_mode("lean")
+    login_page = LoginPage(page)
+
+    login_page.enter_text("email", "admin")
+    login_page.click("login")
+
+    assert page.calls == ["fill", "click"]
+    assert BasePage.reset_round_trips() == 2
+    assert BasePage.round_trips == 0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        BasePage.set_actionability_mode("fast")
@@ -0,0 +1,106 @@
+import pytest
+
+from utils.artifacts import ArtifactRecorder
+
+
+class FakeTracing:
+    def __init__(self):
+        self.calls = []
+
+    def start(self, **kwargs):
+        self.calls.append("start")
+
+    def start_chunk(self, **kwargs):
+        self.calls.append("start_chunk")
+
+    def stop_chunk(self, path=None):
+        self.calls.append(("stop_chunk", path))
+        if path:
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+
+
+class FakeVideo:
+    def __init__(self):
+        self.saved_to = None
+        self.deleted = False
+
+    def save_as(self, path):
+        self.saved_to = path
+        with open(path, "wb") as f:
+            f.write(b"v" * 100)
+
+    def delete(self):
+        self.deleted = True
+
+
+class FakePage:
+    def __init__(self, video=None):
+        self.video = video
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("mode, attempt, failed, recorded, kept", [
+    ("off", 1, True, False, False),
+    ("on", 1, False, True, True),
+    ("retain-on-failure", 1, False, True, False),
+    ("retain-on-failure", 1, True, True, True),
+    ("on-first-retry", 1, True, False, True),
+    ("on-first-retry", 2, False, True, True),
+])
+def test_modes(mode, attempt, failed, recorded, kept):
+    assert ArtifactRecorder.records(mode, attempt) == recorded
+    assert ArtifactRecorder.keeps(mode, failed) == kept
+
+
+def test_pooled_context_opens_one_chunk_per_test(tmp_path):
+    recorder = ArtifactRecorder(tmp_path, trace_mode="retain-on-failure")
+    context = FakeContext()
+
+    assert recorder.start(context, "test_login.py::test_a", 1)
+    recorder.finish(context, FakePage(), "test_login.py::test_a", 1, failed=False, tracing=True)
+    assert recorder.start(context, "test_login.py::test_b", 1)
+    kept = recorder.finish(context, FakePage(), "test_login.py::test_b", 1, failed=True, tracing=True)
+
+    assert context.tracing.calls[0] == "start" and context.tracing.calls[2] == "start_chunk"
+    assert context.tracing.calls[1] == ("stop_chunk", None)
+    assert [path.name for path in kept] == ["test_login.py_test_b-attempt1-trace.zip"]
+    assert recorder.stats == {"kept": 1, "discarded": 1, "dropped": 0, "bytes": 100}
+
+
+def test_video_of_passed_attempt_is_discarded(tmp_path):
+    recorder = ArtifactRecorder(tmp_path, video_mode="retain-on-failure")
+    video = FakeVideo()
+    page = FakePage(video)
+
+    assert recorder.finish(FakeContext(), page, "test_login.py::test_a", 1, failed=False, tracing=False) == []
+
+    assert page.closed and video.deleted and video.saved_to is None
+    assert recorder.stats["discarded"] == 1
+
+
+def test_files_over_the_budget_are_dropped(tmp_path):
+    recorder = ArtifactRecorder(tmp_path, video_mode="on", max_bytes=150)
+
+    first = recorder.finish(FakeContext(), FakePage(FakeVideo()), "test_a", 1, failed=False, tracing=False)
+    second = recorder.finish(FakeContext(), FakePage(FakeVideo()), "test_b", 1, failed=False, tracing=False)
+
+    assert len(first) == 1 and second == []
+    assert not (tmp_path / "test_b-attempt1-video.webm").exists()
+    assert recorder.stats["dropped"] == 1 and recorder.stats["bytes"] == 100
+
+
+def test_links_are_relative_to_the_report(tmp_path):
+    recorder = ArtifactRecorder(tmp_path / "artifacts", report_dir=tmp_path / "reports")
+
+    html = recorder.links_html([tmp_path / "artifacts" / "a-trace.zip", tmp_path / "artifacts" / "a-video.webm"])
+
+    assert 'href="../artifacts/a-trace.zip"' in html and ">Video</a>" in html
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+
+import pytest
+
+from utils.auth_state import AuthStateCache
+from utils.file_lock import FileLock
+
+SESSION = {"cookies": [{"name": "c_user", "value": "1", "expires": -1}], "origins": []}
+
+
+def _has_session_cookie(state):
+    return any(cookie["name"] == "c_user" for cookie in state["cookies"])
+
+
+def _login_writing(state, logins):
+    def login(path):
+        logins.append(path)
+        path.write_text(json.dumps(state))
+    return login
+
+
+def test_fresh_snapshot_is_reused(tmp_path):
+    cache = AuthStateCache(tmp_path, ttl_seconds=60, validate=_has_session_cookie)
+    logins = []
+
+    first = cache.get("dev", "admin", _login_writing(SESSION, logins))
+    second = cache.get("dev", "admin", _login_writing(SESSION, logins))
+
+    assert first == second == tmp_path / "dev" / "admin.json"
+    assert len(logins) == 1
+
+
+def test_ttl_zero_logs_in_every_time(tmp_path):
+    cache = AuthStateCache(tmp_path, ttl_seconds=0, validate=_has_session_cookie)
+    logins = []
+
+    path = cache.get("dev", "admin", _login_writing(SESSION, logins))
+    cache.get("dev", "admin", _login_writing(SESSION, logins))
+
+    assert len(logins) == 2
+    assert json.loads(path.read_text()) == SESSION
+
+
+def test_expired_snapshot_is_refreshed(tmp_path):
+    cache = AuthStateCache(tmp_path, ttl_seconds=60)
+    logins = []
+    path = cache.get("dev", "admin", _login_writing(SESSION, logins))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    cache.get("dev", "admin", _login_writing(SESSION, logins))
+
+    assert len(logins) == 2
+
+
+def test_failed_login_is_never_cached(tmp_path):
+    cache = AuthStateCache(tmp_path, ttl_seconds=60, validate=_has_session_cookie)
+    logged_out = {"cookies": [{"name": "datr", "value": "x", "expires": -1}], "origins": []}
+
+    with pytest.raises(RuntimeError, match="did not produce a logged-in session"):
+        cache.get("dev", "admin", _login_writing(logged_out, []))
+
+    assert list((tmp_path / "dev").glob("admin.*")) == []
+
+
+def test_lock_staleness_must_be_shorter_than_timeout(tmp_path):
+    with pytest.raises(ValueError):
+        FileLock(tmp_path / "state.lock", timeout=10, stale_after=10)
+
+
+def test_lock_is_exclusive_and_breaks_stale_locks(tmp_path):
+    lock_path = tmp_path / "state.lock"
+    with FileLock(lock_path, timeout=1, stale_after=0.5, poll_interval=0.05):
+        with pytest.raises(TimeoutError):
+            # The holder's heartbeat keeps the lock fresh, so the waiter never breaks it
+            FileLock(lock_path, timeout=0.8, stale_after=0.5, poll_interval=0.05).acquire()
+    assert not lock_path.exists()
+
+    # A lock file nobody touches any more is left by a crashed process
+    lock_path.write_text("12345")
+    old = time.time() - 60
+    os.utime(lock_path, (old, old))
+    with FileLock(lock_path, timeout=1, stale_after=0.5, poll_interval=0.05):
+        assert lock_path.read_text() == str(os.getpid())
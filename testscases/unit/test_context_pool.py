@@ -0,0 +1,127 @@
+from utils.context_pool import ContextPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.video = None
+        self.url = "about:blank"
+
+    def route(self, pattern, handler):
+        pass
+
+    def goto(self, url):
+        self.url = url
+
+    def evaluate(self, script):
+        self.context.cleared.append(self.url)
+        self.context.local_storage.pop(self.url.rstrip("/"), None)
+        return True
+
+    def close(self):
+        self.context.pages.remove(self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.cookies = []
+        self.local_storage = {}
+        self.cleared = []
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def storage_state(self):
+        return {
+            "cookies": list(self.cookies),
+            "origins": [{"origin": origin, "localStorage": items} for origin, items in self.local_storage.items()],
+        }
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def clear_cookies(self):
+        self.cookies.clear()
+
+    def clear_permissions(self):
+        pass
+
+    def set_extra_http_headers(self, headers):
+        pass
+
+    def set_offline(self, offline):
+        pass
+
+    def unroute_all(self, behavior=None):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def new_context(self, **options):
+        context = FakeContext()
+        context.options = options
+        self.contexts.append(context)
+        return context
+
+
+def test_released_context_is_reset_and_reused():
+    pool = ContextPool(FakeBrowser(), {}, size=1, warmup=1)
+    context = pool.acquire()
+    context.new_page()
+    context.add_cookies([{"name": "c_user", "value": "1"}])
+    context.local_storage["https://www.facebook.com"] = [{"name": "k", "value": "v"}]
+
+    pool.release(context)
+
+    assert pool.acquire() is context
+    assert context.cookies == [] and context.pages == [] and context.local_storage == {}
+    assert context.cleared == ["https://www.facebook.com/"]
+    assert pool.stats == {"created": 1, "reused": 2, "discarded": 0}
+
+
+def test_strict_and_custom_options_always_get_a_fresh_context():
+    pool = ContextPool(FakeBrowser(), {"viewport": None}, size=2, warmup=1)
+
+    strict = pool.acquire(strict=True)
+    custom = pool.acquire(locale="de-DE")
+
+    assert strict.options == {"viewport": None}
+    assert custom.options == {"viewport": None, "locale": "de-DE"}
+    assert pool.stats["created"] == 3 and pool.stats["reused"] == 0
+
+
+def test_context_that_stays_dirty_is_discarded():
+    pool = ContextPool(FakeBrowser(), {}, size=1, warmup=0)
+    context = pool.acquire()
+    # Storage the reset cannot clear fails verification
+    context.clear_cookies = lambda: None
+    context.add_cookies([{"name": "c_user", "value": "1"}])
+
+    pool.release(context)
+
+    assert context.closed
+    assert pool.stats["discarded"] == 1
+    assert pool.acquire() is not context
+
+
+def test_cookie_only_storage_state_is_applied_to_a_recycled_context():
+    pool = ContextPool(FakeBrowser(), {}, size=1, warmup=1)
+    state = {"cookies": [{"name": "c_user", "value": "1"}], "origins": []}
+
+    context = pool.acquire(storage_state=state)
+
+    assert pool.stats["reused"] == 1
+    assert context.cookies == state["cookies"]
@@ -0,0 +1,121 @@
+import pytest
+from azure.cosmos.partition_key import NonePartitionKeyValue
+
+from utils.db import cosmos_db
+from utils.db.cosmos_db import CosmosDB
+
+
+class FakePages:
+    def __init__(self, pages, hook):
+        self.pages = iter(pages)
+        self.hook = hook
+        self.continuation_token = None
+
+    def __next__(self):
+        page = next(self.pages)
+        self.hook({"x-ms-request-charge": "2.5"}, {})
+        self.continuation_token = f"token-after-{page[-1]['id']}" if page else None
+        return iter(page)
+
+
+class FakeQuery:
+    def __init__(self, pages, hook):
+        self.pages = pages
+        self.hook = hook
+
+    def by_page(self, continuation_token=None):
+        return FakePages(self.pages, self.hook)
+
+
+class FakeContainer:
+    def __init__(self, key_path="/tenantId", items=()):
+        self.key_path = key_path
+        self.items = list(items)
+        self.queries = []
+        self.batches = []
+
+    def read(self):
+        return {"partitionKey": {"paths": [self.key_path]}}
+
+    def query_items(self, query, parameters=None, response_hook=None, **options):
+        self.queries.append((query, parameters, options))
+        return FakeQuery([self.items[:2], self.items[2:]] if len(self.items) > 2 else [self.items], response_hook)
+
+    def execute_item_batch(self, operations, partition_key, response_hook=None):
+        self.batches.append((partition_key, [item_id for _, (item_id,) in operations]))
+        response_hook({"x-ms-request-charge": "10"}, {})
+
+
+class FakeClient:
+    def __init__(self, container):
+        self.container = container
+
+    def get_database_client(self, name):
+        return self
+
+    def get_container_client(self, name):
+        return self.container
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self.connection
+
+
+@pytest.fixture
+def cosmos(monkeypatch):
+    monkeypatch.setattr(CosmosDB, "_partition_key_paths", {})
+
+    def connect(container):
+        return CosmosDB(pool=FakePool(FakeClient(container)))
+
+    return connect
+
+
+def test_items_without_the_key_property_are_deleted_in_the_none_partition(cosmos):
+    container = FakeContainer(items=[{"id": "a", "pk": "t1"}, {"id": "b"}, {"id": "c", "pk": None},
+                                     {"id": "d", "pk": "t1"}])
+    db = cosmos(container)
+
+    assert db.delete_where("orders", ["c.id = 'a'", "c.id = 'b'", "c.id = 'c'", "c.id = 'd'"]) == 4
+
+    assert container.queries[0][0] == 'SELECT c.id, c["tenantId"] AS pk FROM c WHERE c.id IN (\'a\', \'b\', \'c\', \'d\')'
+    assert sorted(container.batches, key=repr) == sorted([
+        ("t1", ["a", "d"]), (NonePartitionKeyValue, ["b"]), (cosmos_db.NULL_PARTITION_KEY, ["c"])], key=repr)
+    assert db.last_metrics["operation"] == "delete" and db.last_metrics["request_charge"] == 30
+
+
+def test_batches_hold_at_most_one_hundred_deletes(cosmos):
+    container = FakeContainer(key_path="/id", items=[{"id": f"{n:03}", "pk": "same"} for n in range(150)])
+    db = cosmos(container)
+
+    db.delete_where("orders", ["c.kind = 'test'"])
+
+    assert [len(ids) for _, ids in container.batches] == [100, 50]
+
+
+def test_query_filtering_on_the_partition_key_is_routed_to_it(cosmos):
+    container = FakeContainer()
+    db = cosmos(container)
+
+    db.execute_query("SELECT * FROM c WHERE c.tenantId = @tenant AND c.total > 10", {"tenant": "t1"},
+                     container_name="orders")
+    db.execute_query("SELECT * FROM c WHERE c.tenantId = 't1' OR c.tenantId = 't2'", container_name="orders")
+
+    assert container.queries[0][2] == {"partition_key": "t1"}
+    assert container.queries[1][2] == {"enable_cross_partition_query": True}
+
+
+def test_request_units_of_every_page_are_summed(cosmos):
+    container = FakeContainer(items=[{"id": "a"}, {"id": "b"}, {"id": "c"}])
+    db = cosmos(container)
+
+    items = list(db.stream_query("SELECT * FROM c WHERE c.total > 10", page_size=2, container_name="orders"))
+
+    assert [item["id"] for item in items] == ["a", "b", "c"]
+    assert container.queries[0][2]["max_item_count"] == 2
+    assert db.continuation_token == "token-after-c"
+    assert db.last_metrics["request_charge"] == 5.0 and db.metrics["calls"] == 1
@@ -0,0 +1,112 @@
+import threading
+
+from utils.db.cleanup import CleanupEngine, CleanupWorker, batch_predicates, coalesce
+
+
+class FakeEngine(CleanupEngine):
+    """Deletes one row per condition; tables named in fail_on fail while their condition is in the batch."""
+
+    def __init__(self, fail_on=None, **kwargs):
+        super().__init__("postgresql", **kwargs)
+        self.fail_on = fail_on or {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _clean_table(self, table_name, conditions):
+        with self._lock:
+            self.calls.append((table_name, list(conditions)))
+        if self.fail_on.get(table_name) in conditions:
+            raise RuntimeError(f"foreign key violation on {table_name}")
+        return len(conditions)
+
+
+def test_coalesce_groups_per_table_and_drops_duplicates():
+    registrations = [("users", "id = 1"), ("orders", "user_id = 1"), ("users", " id = 1 "), ("users", "id = 2"),
+                     ("", "id = 3"), ("users", "")]
+
+    assert coalesce(registrations) == {"users": ["id = 1", "id = 2"], "orders": ["user_id = 1"]}
+
+
+def test_equalities_fold_into_in_lists():
+    conditions = ["id = 1", "email = 'o''brien@example.com'", "id = 2", "created_at < now()", "id = -3.5"]
+
+    assert batch_predicates(conditions) == ["id IN (1, 2, -3.5)", "email IN ('o''brien@example.com')",
+                                            "(created_at < now())"]
+
+
+def test_predicates_respect_batch_size():
+    assert batch_predicates(["id = 1", "id = 2", "id = 3", "a > 1", "b > 1", "c > 1"], batch_size=2) == [
+        "id IN (1, 2)", "id IN (3)", "(a > 1) OR (b > 1)", "(c > 1)"]
+
+
+def test_tables_are_cleaned_once_each():
+    engine = FakeEngine()
+
+    deleted, failed = engine.run([("users", "id = 1"), ("orders", "id = 7"), ("users", "id = 2")])
+
+    assert deleted == {"users": 2, "orders": 1} and failed == {}
+    assert sorted(engine.calls) == [("orders", ["id = 7"]), ("users", ["id = 1", "id = 2"])]
+
+
+def test_failed_table_is_retried_condition_by_condition():
+    engine = FakeEngine(fail_on={"users": "id = 2"})
+
+    deleted, failed = engine.run([("users", "id = 1"), ("users", "id = 2"), ("orders", "id = 7")])
+
+    assert deleted == {"users": 1, "orders": 1}
+    assert list(failed) == ["users"] and list(failed["users"]) == ["id = 2"]
+    assert ("users", ["id = 1"]) in engine.calls
+
+
+def test_ordered_run_keeps_registration_order():
+    engine = FakeEngine(max_workers=8)
+
+    engine.run([("order_items", "order_id = 1"), ("orders", "id = 1"), ("users", "id = 1")], ordered=True)
+
+    assert [table for table, _ in engine.calls] == ["order_items", "orders", "users"]
+
+
+def test_worker_reports_errors_per_test():
+    worker = CleanupWorker(FakeEngine(fail_on={"users": "id = 2"}))
+
+    worker.submit("test_a", [("users", "id = 1")])
+    worker.submit("test_b", [("users", "id = 2"), ("orders", "id = 7")])
+
+    assert worker.close(timeout=5)
+    assert worker.stats["queued"] == 3 and worker.stats["deleted"] == 2
+    assert [(nodeid, table, condition) for nodeid, table, condition, _ in worker.errors] == [
+        ("test_b", "users", "id = 2")]
+
+
+def test_full_queue_blocks_until_the_worker_catches_up():
+    release = threading.Event()
+
+    class SlowEngine(FakeEngine):
+        def run(self, registrations, ordered=False):
+            release.wait(5)
+            return super().run(registrations, ordered)
+
+    worker = CleanupWorker(SlowEngine(), max_queue=1, max_batch=1)
+    threading.Timer(0.1, release.set).start()
+
+    worker.submit("test_a", [("users", "id = 1"), ("users", "id = 2"), ("users", "id = 3")])
+
+    assert worker.close(timeout=5)
+    assert worker.stats["blocked"] >= 1 and worker.stats["deleted"] == 3
+
+
+def test_crashed_engine_marks_every_entry_failed():
+    class BrokenEngine(FakeEngine):
+        def run(self, registrations, ordered=False):
+            list(registrations)
+            raise ConnectionError("database unreachable")
+
+    worker = CleanupWorker(BrokenEngine())
+    worker.submit("test_a", [("users", "id = 1"), ("orders", "id = 7")])
+
+    assert worker.close(timeout=5)
+    assert [error for *_, error in worker.errors] == ["database unreachable"] * 2
+
+
+def test_close_without_submissions_returns_at_once():
+    assert CleanupWorker(FakeEngine()).close()
@@ -0,0 +1,125 @@
+import psycopg2.extensions
+import pytest
+
+from utils.db.base_db import BaseDB, UnsupportedOperationError
+from utils.db.mysql_db import MySQLDB
+from utils.db.postgresql_db import PostgreSQLDB
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self.connection
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = [("id",)]
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self.connection.log.append(query)
+        if "missing_table" in query:
+            raise RuntimeError(f"relation does not exist: {query}")
+        self.connection.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeInfo:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @property
+    def transaction_status(self):
+        return self.connection.status
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.log = []
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.info = FakeInfo(self)
+
+    @property
+    def in_transaction(self):
+        return self.status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def is_connected(self):
+        return True
+
+
+@pytest.fixture(params=[PostgreSQLDB, MySQLDB])
+def connector(request):
+    return request.param(pool=FakePool(FakeConnection()))
+
+
+def test_failed_statement_keeps_earlier_writes_of_the_test(connector):
+    log = connector.connection.log
+    with connector.isolated():
+        connector.execute_non_query("INSERT INTO users VALUES (1)")
+        with pytest.raises(RuntimeError):
+            connector.execute_non_query("INSERT INTO missing_table VALUES (1)")
+        connector.execute_non_query("INSERT INTO users VALUES (2)")
+
+    assert log == [
+        "ROLLBACK", "SAVEPOINT test_isolation",
+        "SAVEPOINT db_statement", "INSERT INTO users VALUES (1)", "RELEASE SAVEPOINT db_statement",
+        "SAVEPOINT db_statement", "INSERT INTO missing_table VALUES (1)",
+        "ROLLBACK TO SAVEPOINT db_statement", "RELEASE SAVEPOINT db_statement",
+        "SAVEPOINT db_statement", "INSERT INTO users VALUES (2)", "RELEASE SAVEPOINT db_statement",
+        "ROLLBACK",
+    ]
+
+
+def test_failed_select_outside_isolation_keeps_the_open_transaction(connector):
+    connector.execute_query("SELECT id FROM users")
+    with pytest.raises(RuntimeError):
+        connector.execute_query("SELECT id FROM missing_table")
+
+    assert "ROLLBACK" not in connector.connection.log
+    assert connector.connection.log[-2:] == ["ROLLBACK TO SAVEPOINT db_statement", "RELEASE SAVEPOINT db_statement"]
+    assert connector.connection.in_transaction
+
+
+def test_failed_statement_without_a_transaction_rolls_back(connector):
+    with pytest.raises(RuntimeError):
+        connector.execute_non_query("DELETE FROM missing_table")
+
+    assert connector.connection.log == ["DELETE FROM missing_table", "ROLLBACK"]
+
+
+def test_writes_outside_isolation_are_committed(connector):
+    connector.execute_non_query("INSERT INTO users VALUES (1)")
+
+    assert connector.connection.log == ["INSERT INTO users VALUES (1)", "COMMIT"]
+
+
+def test_backend_without_savepoints_refuses_isolation():
+    class DocumentDB(BaseDB):
+        connect = staticmethod(lambda: object())
+        execute_query = execute_non_query = clean_test_data = lambda self, *args: None
+
+    with pytest.raises(UnsupportedOperationError, match="DocumentDB: isolated\\(\\) needs savepoints"):
+        with DocumentDB().isolated():
+            pass
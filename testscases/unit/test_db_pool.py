@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from utils.db.pool import ConnectionPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+    def connect(self):
+        connection = f"conn{len(self.opened) + 1}"
+        self.opened.append(connection)
+        return connection
+
+    def disconnect(self, connection):
+        self.closed.append(connection)
+
+
+def test_released_connection_is_reused():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, disconnect=driver.disconnect)
+
+    first = pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() == first
+    assert pool.stats["created"] == 1 and pool.stats["reused"] == 1
+
+
+def test_expired_connection_is_closed_instead_of_reused():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, idle_timeout=0, disconnect=driver.disconnect)
+    pool.release(pool.acquire())
+    time.sleep(0.01)
+
+    assert pool.acquire() == "conn2"
+    assert driver.closed == ["conn1"] and pool.stats["evicted"] == 1
+
+
+def test_broken_connection_fails_health_check():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, check_after=0, health_check=lambda connection: False,
+                          disconnect=driver.disconnect)
+    pool.release(pool.acquire())
+    time.sleep(0.01)
+
+    assert pool.acquire() == "conn2"
+    assert pool.stats["unhealthy"] == 1
+
+
+def test_failed_reset_discards_the_connection():
+    driver = FakeDriver()
+
+    def reset(connection):
+        raise ConnectionError("server closed the connection")
+
+    pool = ConnectionPool(driver.connect, reset=reset, disconnect=driver.disconnect)
+    pool.release(pool.acquire())
+
+    assert driver.closed == ["conn1"]
+
+
+def test_full_pool_waits_for_a_release():
+    pool = ConnectionPool(FakeDriver().connect, max_size=1)
+    held = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+
+    assert pool.acquire(timeout=5) == held
+
+
+def test_failed_connect_frees_its_slot():
+    def connect():
+        raise ConnectionRefusedError("db down")
+
+    pool = ConnectionPool(connect, max_size=1)
+    with pytest.raises(ConnectionRefusedError):
+        pool.acquire()
+
+    pool.connect = FakeDriver().connect
+    assert pool.acquire(timeout=0.01) == "conn1"
+
+
+def test_drain_closes_idle_and_later_released_connections():
+    driver = FakeDriver()
+    pool = ConnectionPool(driver.connect, disconnect=driver.disconnect)
+    idle, busy = pool.acquire(), pool.acquire()
+    pool.release(idle)
+
+    pool.drain()
+    pool.release(busy)
+
+    assert driver.closed == [idle, busy]
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,92 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+
+from utils.db import seeding
+from utils.db.base_db import BaseDB, UnsupportedOperationError
+from utils.db.seeding import Seeder, load_seed_set
+
+
+class FakeDB:
+    def __init__(self):
+        self.inserted = []
+
+    def bulk_insert(self, table_name, rows):
+        self.inserted.append((table_name, [row["id"] if "id" in row else row["order_id"] for row in rows]))
+        return len(rows)
+
+
+class FakeEngine:
+    runs = []
+
+    def __init__(self, db_type):
+        self.db_type = db_type
+
+    def run(self, registrations, ordered=False):
+        FakeEngine.runs.append((self.db_type, list(registrations), ordered))
+        return {}, {}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB()
+
+    @contextmanager
+    def get_db(db_type):
+        yield db
+
+    monkeypatch.setattr(seeding.DBFactory, "get_db", get_db)
+    monkeypatch.setattr(seeding, "CleanupEngine", FakeEngine)
+    monkeypatch.setattr(seeding, "get_worker_id", lambda: "gw1")
+    FakeEngine.runs = []
+    return db
+
+
+def test_orders_example_gets_worker_keys():
+    tables = load_seed_set("orders", tokens={"worker": "gw3"})
+
+    assert list(tables) == ["customers", "orders"]
+    assert tables["customers"]["rows"][0] == {"id": "c-gw3-1", "name": "Ann", "email": "ann.gw3@example.com"}
+    assert tables["orders"]["rows"][2]["total"] == 99.99
+
+
+def test_rows_without_their_key_are_rejected(tmp_path):
+    (tmp_path / "broken.json").write_text(json.dumps({"users": {"key": "id", "rows": [{"name": "Ann"}]}}))
+
+    with pytest.raises(ValueError, match="1 row\\(s\\) of 'users' have no 'id'"):
+        load_seed_set("broken", tmp_path)
+
+
+def test_seed_set_is_loaded_once_and_cleaned_in_reverse(fake_db):
+    seeder = Seeder("postgresql")
+
+    rows = seeder.seed("orders")
+    seeder.seed("orders")
+    seeder.cleanup()
+
+    assert rows["customers"][1]["id"] == "c-gw1-2"
+    assert fake_db.inserted == [("customers", ["c-gw1-1", "c-gw1-2"]), ("orders", ["o-gw1-1", "o-gw1-2", "o-gw1-3"])]
+    ((db_type, registrations, ordered),) = FakeEngine.runs
+    assert db_type == "postgresql" and ordered
+    assert registrations[0] == ("orders", "order_id = 'o-gw1-3'")
+    assert registrations[-1] == ("customers", "id = 'c-gw1-1'")
+
+
+def test_cosmos_conditions_escape_quotes_with_backslashes(tmp_path, fake_db):
+    (tmp_path / "names.json").write_text(json.dumps({"users": {"key": "id", "rows": [{"id": "o'brien\\1"}]}}))
+    seeder = Seeder("Cosmos", tmp_path)
+
+    seeder.seed("names")
+    seeder.cleanup()
+
+    assert FakeEngine.runs[0][1] == [("users", "c.id = 'o\\'brien\\\\1'")]
+
+
+def test_backend_without_bulk_insert_names_itself():
+    class LegacyDB(BaseDB):
+        connect = staticmethod(lambda: object())
+        execute_query = execute_non_query = clean_test_data = lambda self, *args: None
+
+    with pytest.raises(UnsupportedOperationError, match="LegacyDB: bulk_insert into users"):
+        LegacyDB().bulk_insert("users", [{"id": 1}])
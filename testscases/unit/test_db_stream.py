@@ -0,0 +1,103 @@
+import psycopg2.extensions
+
+from utils.db.mysql_db import MySQLDB
+from utils.db.postgresql_db import PostgreSQLDB
+
+ROWS = [(1, "alice"), (2, "bob"), (3, "carol")]
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self.connection
+
+
+class FakeCursor:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.description = None
+        self.fetches = []
+        self.closed = False
+
+    def execute(self, query, params=None):
+        self.description = [("id",), ("name",)]
+
+    def fetchmany(self, size):
+        page, self.rows = self.rows[:size], self.rows[size:]
+        self.fetches.append(len(page))
+        return page
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakePgInfo:
+    def __init__(self, transaction_status):
+        self.transaction_status = transaction_status
+
+
+class FakePgConnection:
+    def __init__(self, transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE):
+        self.info = FakePgInfo(transaction_status)
+        self.closed = False
+        self.rollbacks = 0
+        self.named_cursor = FakeCursor(ROWS)
+
+    def cursor(self, name=None):
+        return self.named_cursor if name else FakeCursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_postgresql_streams_pages_from_a_named_cursor():
+    connection = FakePgConnection()
+    db = PostgreSQLDB(pool=FakePool(connection))
+
+    rows = list(db.stream_query("SELECT id, name FROM users", page_size=2))
+
+    assert rows == [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}, {"id": 3, "name": "carol"}]
+    assert connection.named_cursor.fetches == [2, 1, 0]
+    assert connection.named_cursor.closed and connection.rollbacks == 1
+
+
+def test_postgresql_stream_keeps_the_callers_transaction():
+    connection = FakePgConnection(psycopg2.extensions.TRANSACTION_STATUS_INTRANS)
+    db = PostgreSQLDB(pool=FakePool(connection))
+
+    stream = db.stream_query("SELECT id, name FROM users", page_size=2)
+    assert next(stream) == {"id": 1, "name": "alice"}
+    stream.close()
+
+    assert connection.named_cursor.closed and connection.rollbacks == 0
+
+
+class FakeMySQLConnection:
+    def __init__(self):
+        self.unbuffered = FakeCursor([{"id": 1}, {"id": 2}, {"id": 3}])
+        self.unread_result = True
+
+    def cursor(self, dictionary=False, buffered=True):
+        return self.unbuffered if not buffered else FakeCursor()
+
+    def is_connected(self):
+        return True
+
+
+def test_mysql_stream_drains_an_abandoned_result():
+    connection = FakeMySQLConnection()
+    db = MySQLDB(pool=FakePool(connection))
+
+    stream = db.stream_query("SELECT id FROM users", page_size=1)
+    assert next(stream) == {"id": 1}
+    stream.close()
+
+    assert connection.unbuffered.rows == [] and connection.unbuffered.closed
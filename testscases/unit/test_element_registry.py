@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from pages.element_registry import ElementRegistry, ELEMENTS_DIR
+
+
+def _write(path, elements, mtime=None):
+    path.write_text(json.dumps(elements))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_page_elements_are_loaded_once_and_read_only(tmp_path):
+    _write(tmp_path / "login_page.json", {"email": "#email", "submit": {"type": "role", "role": "button", "value": "Log in"}})
+    registry = ElementRegistry(tmp_path)
+
+    elements = registry.get("login")
+
+    assert registry.get("login") is elements
+    assert elements["email"] == "#email"
+    with pytest.raises(TypeError):
+        elements["email"] = "#other"
+    with pytest.raises(TypeError):
+        elements["submit"]["value"] = "Sign in"
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    element_file = tmp_path / "login_page.json"
+    _write(element_file, {"email": "#email"}, mtime=1_000_000)
+    registry = ElementRegistry(tmp_path)
+    registry.get("login")
+
+    _write(element_file, {"email": "#login-email"}, mtime=2_000_000)
+
+    assert registry.get("login")["email"] == "#login-email"
+
+
+@pytest.mark.parametrize("elements, message", [
+    ({"submit": {"type": "css"}}, "needs a selector string"),
+    ({"submit": {"type": "role", "value": "Log in"}}, "has type 'role' but no 'role'"),
+    (["#email"], "must contain a JSON object"),
+])
+def test_invalid_definitions_fail_fast(tmp_path, elements, message):
+    _write(tmp_path / "login_page.json", elements)
+
+    with pytest.raises(ValueError, match=message):
+        ElementRegistry(tmp_path).load_all()
+
+
+def test_case_colliding_files_are_rejected(tmp_path):
+    _write(tmp_path / "login_page.json", {})
+    _write(tmp_path / "Login_page.json", {})
+    if len(list(tmp_path.iterdir())) < 2:
+        pytest.skip("case-insensitive file system")
+
+    with pytest.raises(ValueError, match="differ only by case"):
+        ElementRegistry(tmp_path).load_all()
+
+
+def test_missing_page_names_its_file(tmp_path):
+    with pytest.raises(FileNotFoundError, match="checkout_page.json"):
+        ElementRegistry(tmp_path).get("checkout")
+
+
+def test_shipped_element_files_are_valid():
+    ElementRegistry(ELEMENTS_DIR).load_all()
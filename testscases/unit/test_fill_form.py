@@ -0,0 +1,131 @@
+import pytest
+
+import pages.base_page as base_page
+from pages.base_page import BasePage, FormFillError
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    def _do(self, action, *args):
+        if self.selector in self.page.broken:
+            raise TimeoutError(f"{action} timed out on {self.selector}")
+        self.page.calls.append((action, self.selector, *args))
+
+    def fill(self, value):
+        self._do("fill", value)
+
+    def check(self):
+        self._do("check")
+
+    def click(self):
+        self._do("click")
+
+    def select_option(self, value):
+        self._do("select", value)
+
+    def count(self):
+        return 0 if self.selector in self.page.missing else 1
+
+
+class FakeAssertions:
+    def __init__(self, page, locator):
+        self.page = page
+        self.locator = locator
+
+    def to_be_visible(self, timeout=None):
+        if self.locator.selector in self.page.missing:
+            raise AssertionError(f"{self.locator.selector} is not visible")
+
+
+class FakePage:
+    def __init__(self, broken=(), missing=()):
+        self.calls = []
+        self.broken = set(broken) | set(missing)
+        self.missing = set(missing)
+        self.scripts = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def evaluate(self, script, fields):
+        self.scripts.append([field["key"] for field in fields])
+        return []
+
+
+class SignupPage(BasePage):
+    def _load_elements(self):
+        self.elements = {
+            "firstName": "#first",
+            "lastName": "#last",
+            "day": {"type": "css", "value": "#day"},
+            "terms": "#terms",
+            "submit": "#submit",
+        }
+
+
+@pytest.fixture(autouse=True)
+def fake_expect(monkeypatch):
+    monkeypatch.setattr(base_page, "expect", lambda locator: FakeAssertions(locator.page, locator))
+    BasePage.set_actionability_mode("strict")
+
+
+def test_every_field_is_filled_with_its_action():
+    page = FakePage()
+
+    SignupPage(page).fill_form({"firstName": "Ann", "day": ("select", "20"), "terms": True, "submit": None})
+
+    assert page.calls == [("fill", "#first", "Ann"), ("select", "#day", "20"), ("check", "#terms"),
+                          ("click", "#submit")]
+
+
+def test_script_mode_sets_plain_fields_in_one_call():
+    page = FakePage()
+
+    SignupPage(page).fill_form({"firstName": "Ann", "lastName": "Lee", "day": ("select", "20"), "terms": True},
+                               use_script=True)
+
+    assert page.scripts == [["firstName", "lastName", "day"]]
+    assert page.calls == [("check", "#terms")]
+
+
+def test_unknown_keys_fail_before_anything_is_filled():
+    page = FakePage()
+
+    with pytest.raises(FormFillError) as error:
+        SignupPage(page).fill_form({"firstname": "Ann", "lastName": "Lee", "nickname": "A"})
+
+    assert list(error.value.failures) == ["firstname", "nickname"]
+    assert all(isinstance(e, KeyError) for e in error.value.failures.values())
+    assert page.calls == []
+
+
+def test_failures_are_collected_per_field():
+    page = FakePage(broken=["#last"])
+
+    with pytest.raises(FormFillError) as error:
+        SignupPage(page).fill_form({"firstName": "Ann", "lastName": "Lee", "terms": True})
+
+    assert list(error.value.failures) == ["lastName"]
+    assert ("check", "#terms") in page.calls
+
+
+def test_stop_on_error_skips_the_remaining_fields():
+    page = FakePage(broken=["#last"])
+
+    with pytest.raises(FormFillError):
+        SignupPage(page).fill_form({"firstName": "Ann", "lastName": "Lee", "terms": True}, stop_on_error=True)
+
+    assert page.calls == [("fill", "#first", "Ann")]
+
+
+def test_missing_form_fails_every_field_at_once():
+    page = FakePage(missing=["#first"])
+
+    with pytest.raises(FormFillError) as error:
+        SignupPage(page).fill_form({"firstName": "Ann", "lastName": "Lee"})
+
+    assert list(error.value.failures) == ["firstName", "lastName"]
+    assert page.calls == []
@@ -0,0 +1,64 @@
+import json
+
+from utils.har_store import HarStore, shared_record_keys
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+SHA_ORPHAN = "c" * 40
+
+
+def _entry(url, body_file, method="GET", post=None):
+    request = {"method": method, "url": url}
+    if post is not None:
+        request["postData"] = {"text": post}
+    return {"request": request, "response": {"status": 200, "content": {"_file": body_file}}}
+
+
+class FakeContext:
+    def __init__(self):
+        self.routed = []
+
+    def route_from_har(self, path, not_found):
+        self.routed.append((path, not_found))
+
+
+def test_har_path_is_a_safe_file_name(tmp_path):
+    store = HarStore(tmp_path, har_format="zip")
+
+    assert store.har_path("testscases/facebook/test_login.py::test_valid[case0]") == \
+        tmp_path / "testscases_facebook_test_login.py_test_valid_case0.zip"
+
+
+def test_replay_reports_a_missing_har(tmp_path):
+    store = HarStore(tmp_path, not_found="fallback")
+    context = FakeContext()
+
+    assert not store.replay(context, "login_page")
+    store.har_path("login_page").write_text("{}")
+    assert store.replay(context, "login_page")
+    assert context.routed == [(str(tmp_path / "login_page.har"), "fallback")]
+
+
+def test_compact_keeps_the_first_of_repeated_requests_and_removes_orphans(tmp_path):
+    store = HarStore(tmp_path)
+    har = {"log": {"entries": [
+        _entry("https://www.facebook.com/api", f"{SHA_A}.json"),
+        _entry("https://www.facebook.com/api", f"{SHA_B}.json"),
+        _entry("https://www.facebook.com/api", f"{SHA_B}.json", method="POST", post="q=1"),
+    ]}}
+    store.har_path("login_page").write_text(json.dumps(har, indent=2))
+    for name in (SHA_A, SHA_B, SHA_ORPHAN):
+        (tmp_path / f"{name}.json").write_text("{}")
+
+    store.compact()
+
+    entries = json.loads(store.har_path("login_page").read_text())["log"]["entries"]
+    assert [(e["request"]["method"], e["response"]["content"]["_file"]) for e in entries] == \
+        [("GET", f"{SHA_A}.json"), ("POST", f"{SHA_B}.json")]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{SHA_A}.json", f"{SHA_B}.json", "login_page.har"]
+
+
+def test_shared_record_keys():
+    keys = [("test_a.py::test_1", "login_page"), ("test_a.py::test_2", "login_page"), ("test_b.py::test_3", "signup")]
+
+    assert shared_record_keys(keys) == {"login_page": ["test_a.py::test_1", "test_a.py::test_2"]}
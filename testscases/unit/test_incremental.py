@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import utils.incremental as incremental
+from utils.incremental import IncrementalRun
+
+CONTEXT = {"env": "dev", "base_url": "https://www.facebook.com"}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental, "PROJECT_ROOT", tmp_path)
+    (tmp_path / "test_login.py").write_text("def test_login(): pass")
+    (tmp_path / "login_page.json").write_text('{"email": "#email"}')
+    (tmp_path / ".env.dev").write_text("BASE_URL=https://www.facebook.com")
+    return tmp_path
+
+
+def _passed_run(build_id="2024.06.1", files=("test_login.py", "login_page.json")):
+    run = IncrementalRun("dev", CONTEXT, {}, build_id=build_id, shared_files=[".env.dev"])
+    run.remember("test_login.py::test_login", files)
+    fingerprint, inputs, build, recorded_at = run.pending["test_login.py::test_login"]
+    return {"test_login.py::test_login": {"fingerprint": fingerprint, "inputs": inputs, "build_id": build,
+                                          "recorded_at": recorded_at}}
+
+
+def _decide(previous, build_id="2024.06.1", context=CONTEXT, max_age_hours=24):
+    run = IncrementalRun("dev", context, previous, build_id=build_id, max_age_hours=max_age_hours,
+                         shared_files=[".env.dev"])
+    return run.decide("test_login.py::test_login")
+
+
+def test_unchanged_pass_is_skipped(project):
+    skip, reason = _decide(_passed_run())
+
+    assert skip
+    assert reason.startswith("skipped: 3 inputs unchanged")
+
+
+def test_changed_input_file_runs_again(project):
+    previous = _passed_run()
+    (project / "login_page.json").write_text('{"email": "#login-email"}')
+
+    assert _decide(previous) == (False, "run: login_page.json changed")
+
+
+def test_changed_shared_file_runs_again(project):
+    previous = _passed_run()
+    (project / ".env.dev").write_text("BASE_URL=https://m.facebook.com")
+
+    assert _decide(previous) == (False, "run: .env.dev changed")
+
+
+def test_new_build_context_or_old_pass_runs_again(project):
+    previous = _passed_run()
+
+    assert not _decide(previous, build_id="2024.06.2")[0]
+    assert _decide(previous, context=dict(CONTEXT, base_url="https://qa.facebook.com")) == (False, "run: base_url changed")
+    previous["test_login.py::test_login"]["recorded_at"] = time.time() - 48 * 3600
+    assert _decide(previous)[1] == "run: last pass 48h old (max 24h)"
+
+
+def test_unknown_test_runs(project):
+    assert _decide({}) == (False, "run: no previous pass")
+
+
+def test_failed_test_is_forgotten(project):
+    run = IncrementalRun("dev", CONTEXT, {})
+
+    run.forget("test_login.py::test_login")
+
+    assert run.pending == {"test_login.py::test_login": None}
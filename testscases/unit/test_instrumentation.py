@@ -0,0 +1,98 @@
+import pytest
+
+from utils.instrumentation import StepRecorder, summarize, timeline_html
+
+
+class LoginPage:
+    def click_element(self, element_key):
+        self._await_actionable(element_key)
+
+    def verify_title(self, title):
+        raise AssertionError(title)
+
+    def _await_actionable(self, element_key):
+        pass
+
+    def _load_elements(self):
+        pass
+
+    @staticmethod
+    def set_actionability_mode(mode):
+        pass
+
+
+@pytest.fixture
+def recorder():
+    recorder = StepRecorder()
+    recorder.instrument(LoginPage)
+    yield recorder
+    recorder.uninstrument()
+
+
+def test_nested_wait_is_folded_into_the_enclosing_step(recorder):
+    LoginPage().click_element("login_button")
+
+    (step,) = recorder.take()
+    assert (step["page"], step["action"], step["element_key"], step["outcome"]) == \
+           ("LoginPage", "click_element", "login_button", "passed")
+    assert 0 <= step["wait"] <= step["duration"]
+    assert recorder.take() == []
+
+
+def test_failed_step_is_recorded_and_reraised(recorder):
+    with pytest.raises(AssertionError):
+        LoginPage().verify_title("Facebook")
+
+    (step,) = recorder.steps
+    assert (step["outcome"], step["error"], step["element_key"]) == ("failed", "AssertionError", "Facebook")
+
+
+def test_private_and_static_methods_are_not_steps(recorder):
+    LoginPage()._load_elements()
+    LoginPage.set_actionability_mode("strict")
+
+    assert recorder.steps == []
+
+
+def test_uninstrument_restores_the_methods():
+    original = LoginPage.click_element
+    recorder = StepRecorder()
+    recorder.instrument(LoginPage)
+    assert LoginPage.click_element is not original
+
+    recorder.uninstrument()
+
+    assert LoginPage.click_element is original
+
+
+STEPS = {
+    "test_login": [
+        {"page": "LoginPage", "action": "click_element", "element_key": "login_button", "start": 0.0,
+         "duration": 2.0, "wait": 1.5, "outcome": "passed", "error": None},
+        {"page": "LoginPage", "action": "verify_title", "element_key": "<b>", "start": 2.0,
+         "duration": 0.5, "wait": 0.0, "outcome": "failed", "error": "AssertionError"},
+    ],
+    "test_logout": [
+        {"page": "LoginPage", "action": "click_element", "element_key": "login_button", "start": 0.0,
+         "duration": 1.0, "wait": 0.2, "outcome": "passed", "error": None},
+    ],
+}
+
+
+def test_timeline_escapes_and_colours_failures():
+    html = timeline_html(STEPS["test_login"])
+
+    assert html.count("<tr>") == 3
+    assert "&lt;b&gt;" in html and "#d9534f" in html
+    assert timeline_html([]) == ""
+
+
+def test_summary_ranks_steps_and_totals_element_keys():
+    lines = summarize(STEPS, limit=2)
+
+    assert lines[0] == "slowest steps:"
+    assert "2.000s" in lines[1] and lines[1].endswith("test_login")
+    assert "1.000s" in lines[2]
+    assert lines[3] == "slowest element keys (total time):"
+    assert "3.000s over 2 steps (wait 1.700s)  LoginPage:login_button" in lines[4]
+    assert summarize({}) == []
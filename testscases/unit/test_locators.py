@@ -0,0 +1,84 @@
+import pytest
+
+from pages.base_page import BasePage, LOCATOR_FACTORIES
+
+
+class FakeLocator:
+    def __init__(self, how, *args, **kwargs):
+        self.how = how
+        self.args = args
+        self.kwargs = kwargs
+
+
+class FakePage:
+    def locator(self, selector):
+        return FakeLocator("locator", selector)
+
+    def get_by_role(self, role, name=None):
+        return FakeLocator("role", role, name=name)
+
+    def get_by_test_id(self, test_id):
+        return FakeLocator("testid", test_id)
+
+    def get_by_placeholder(self, text):
+        return FakeLocator("placeholder", text)
+
+
+ELEMENTS = {
+    "email": "#email",
+    "password": {"type": "xpath", "value": "//input[@name='pass']"},
+    "login": {"type": "role", "role": "button", "value": "Log in"},
+    "search": {"type": "placeholder", "value": "Search"},
+    "avatar": {"type": "testid", "value": "avatar"},
+    "legacy": {"type": "unknown", "value": ".legacy"},
+}
+
+
+class LoginPage(BasePage):
+    def _load_elements(self):
+        self.elements = ELEMENTS
+
+
+@pytest.mark.parametrize("key, how, args", [
+    ("email", "locator", ("#email",)),
+    ("password", "locator", ("//input[@name='pass']",)),
+    ("login", "role", ("button",)),
+    ("search", "placeholder", ("Search",)),
+    ("avatar", "testid", ("avatar",)),
+    ("legacy", "locator", (".legacy",)),
+])
+def test_locator_type_dispatch(key, how, args):
+    locator = LoginPage(FakePage())._get_locator(key)
+
+    assert (locator.how, locator.args) == (how, args)
+
+
+def test_locators_are_memoized_per_page():
+    page_object = LoginPage(FakePage())
+
+    assert page_object._get_locator("email") is page_object._get_locator("email")
+
+
+def test_new_page_gets_new_locators():
+    page_object = LoginPage(FakePage())
+    first = page_object._get_locator("email")
+
+    page_object.page = FakePage()
+
+    assert page_object._get_locator("email") is not first
+
+
+def test_unknown_element_key():
+    with pytest.raises(KeyError, match="'missing' not found"):
+        LoginPage(FakePage())._get_locator("missing")
+
+
+def test_registered_locator_type_stays_on_its_class():
+    class SearchPage(LoginPage):
+        pass
+
+    SearchPage.register_locator_type("unknown", lambda page, info: FakeLocator("custom", info["value"]))
+
+    assert SearchPage(FakePage())._get_locator("legacy").how == "custom"
+    assert LoginPage(FakePage())._get_locator("legacy").how == "locator"
+    assert "unknown" not in LOCATOR_FACTORIES
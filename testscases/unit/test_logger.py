@@ -0,0 +1,55 @@
+import logging
+import os
+import time
+
+import pytest
+
+from utils import logger
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    yield
+    logger.shutdown_logging()
+
+
+def _age(path, days):
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+def test_prune_deletes_only_old_run_files(tmp_path):
+    kept = {"Log_20_08_2025_01_12_20PM.log": 30, "run_new.log": 0, "notes.txt": 30}
+    deleted = {"run_old.log": 30, "run_old.log.1.gz": 30, "gw0/run_old.jsonl": 30}
+    for name, days in {**kept, **deleted}.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("record")
+        _age(path, days)
+
+    logger._prune(tmp_path, retention_days=7)
+
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_file()) == sorted(kept)
+
+
+def test_reconfiguring_closes_the_previous_files(tmp_path):
+    logger.configure_logging(tmp_path / "first", json_lines=True)
+    logger.customLogger().info("first run")
+    old_handlers = list(logger._listener.handlers)
+
+    logger.configure_logging(tmp_path / "second")
+
+    assert all(handler.stream is None for handler in old_handlers)
+    assert "first run" in next((tmp_path / "first").rglob("run_*.log")).read_text(encoding="UTF-8")
+
+
+def test_records_carry_the_current_test(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTEST_CURRENT_TEST", "testscases/test_login.py::test_login (call)")
+    logger.configure_logging(tmp_path, json_lines=True)
+
+    logging.getLogger(f"{logger.FRAMEWORK_LOGGER}.pages").info("Clicking on '%s'", "login")
+    logger.shutdown_logging()
+
+    line = next(tmp_path.rglob("run_*.jsonl")).read_text(encoding="UTF-8")
+    assert '"nodeid": "testscases/test_login.py::test_login"' in line
+    assert "Clicking on 'login'" in line
@@ -0,0 +1,91 @@
+import pytest
+
+from utils.network_profiles import NetworkShaper, TYPICAL_SIZES
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    def fulfill(self, status, content_type, body):
+        self.outcome = ("stubbed", content_type)
+
+    def abort(self, error_code):
+        self.outcome = ("aborted", error_code)
+
+    def fallback(self):
+        self.outcome = ("fallback",)
+
+
+class FakeResponse:
+    def __init__(self, request, size):
+        self.request = request
+        self.url = request.url
+        self.headers = {"content-length": str(size)}
+
+
+@pytest.fixture(autouse=True)
+def fresh_sizes(monkeypatch):
+    monkeypatch.setattr(NetworkShaper, "known_sizes", {})
+    monkeypatch.setattr(NetworkShaper, "type_sizes", {})
+
+
+def _handle(shaper, url, resource_type):
+    route = FakeRoute(url, resource_type)
+    shaper._handle(route)
+    return route.outcome
+
+
+def test_lean_profile_blocks_media_and_stubs_images_and_analytics():
+    shaper = NetworkShaper("lean")
+
+    assert _handle(shaper, "https://cdn.example.com/intro.mp4", "media") == ("aborted", "blockedbyclient")
+    assert _handle(shaper, "https://cdn.example.com/logo.png", "image") == ("stubbed", "image/gif")
+    assert _handle(shaper, "https://www.google-analytics.com/collect", "script") == \
+        ("stubbed", "application/javascript")
+    assert _handle(shaper, "https://www.facebook.com/", "document") == ("fallback",)
+    assert shaper.stats["blocked"] == 1 and shaper.stats["stubbed"] == 2
+
+
+def test_allowlist_wins_over_the_profile():
+    shaper = NetworkShaper("minimal", allowlist=["*.fbcdn.net"])
+
+    assert _handle(shaper, "https://static.fbcdn.net/logo.png", "image") == ("fallback",)
+    assert _handle(shaper, "https://cdn.example.com/logo.png", "image") == ("aborted", "blockedbyclient")
+
+
+def test_full_profile_installs_nothing():
+    assert not NetworkShaper("full").active
+    with pytest.raises(ValueError):
+        NetworkShaper("tiny")
+
+
+def test_bytes_saved_uses_sizes_seen_in_the_run():
+    served = NetworkShaper("full")
+    served._on_response(FakeResponse(FakeRequest("https://cdn.example.com/a.png", "image"), 3000))
+    served._on_response(FakeResponse(FakeRequest("https://cdn.example.com/b.png", "image"), 1000))
+    shaper = NetworkShaper("minimal")
+
+    _handle(shaper, "https://cdn.example.com/a.png", "image")    # served before: its own size
+    _handle(shaper, "https://cdn.example.com/c.png", "image")    # same type: the type average
+    _handle(shaper, "https://cdn.example.com/f.woff2", "font")   # never served: the typical size
+
+    assert shaper.stats["bytes_saved"] == 3000 + 2000 + TYPICAL_SIZES["font"]
+
+
+def test_stubbed_responses_are_not_counted_as_served():
+    shaper = NetworkShaper("lean")
+    route = FakeRoute("https://cdn.example.com/logo.png", "image")
+    shaper._handle(route)
+
+    shaper._on_response(FakeResponse(route.request, 43))
+
+    assert shaper.stats["served"] == 0
+    assert NetworkShaper.known_sizes == {}
@@ -0,0 +1,33 @@
+from utils.parallel import get_worker_id, get_worker_count, is_parallel_worker, get_run_id, worker_dir
+
+
+def test_serial_run_is_master(monkeypatch, tmp_path):
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+
+    assert get_worker_id() == "master"
+    assert get_worker_count() == 1
+    assert not is_parallel_worker()
+    assert worker_dir(tmp_path / "Logs") == tmp_path / "Logs"
+
+
+def test_worker_gets_its_own_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+
+    path = worker_dir(tmp_path / "screenshots")
+
+    assert get_worker_id() == "gw1"
+    assert get_worker_count() == 4
+    assert path == tmp_path / "screenshots" / "gw1"
+    assert path.is_dir()
+
+
+def test_run_id_is_shared_through_the_environment(monkeypatch):
+    monkeypatch.delenv("FRAMEWORK_RUN_ID", raising=False)
+    run_id = get_run_id()
+
+    assert get_run_id() == run_id
+
+    monkeypatch.setenv("FRAMEWORK_RUN_ID", "controller-id")
+    assert get_run_id() == "controller-id"
@@ -0,0 +1,66 @@
+import pytest
+
+from utils.retry import RetryPolicy
+
+
+class FakeItem:
+    def __init__(self, marker=None):
+        self.marker = marker
+
+    def get_closest_marker(self, name):
+        return self.marker if name == "flaky" else None
+
+
+def _excinfo(error):
+    try:
+        raise error
+    except Exception:
+        return pytest.ExceptionInfo.from_current()
+
+
+def test_default_retries_come_from_the_command_line():
+    assert RetryPolicy.for_item(FakeItem(), default_retries=0).max_attempts == 1
+    assert RetryPolicy.for_item(FakeItem(), default_retries=2).max_attempts == 3
+
+
+def test_flaky_marker_overrides_the_default():
+    marker = pytest.mark.flaky(max_attempts=4, only_on=["TimeoutError"]).mark
+    policy = RetryPolicy.for_item(FakeItem(marker), default_retries=1)
+
+    assert policy.max_attempts == 4
+    assert policy.only_on == ("TimeoutError",)
+
+
+def test_bare_flaky_marker_retries_at_least_once():
+    assert RetryPolicy.for_item(FakeItem(pytest.mark.flaky.mark), default_retries=0).max_attempts == 2
+
+
+def test_attempts_are_capped():
+    policy = RetryPolicy(max_attempts=2)
+    error = _excinfo(RuntimeError("boom"))
+
+    assert policy.should_retry(1, error)
+    assert not policy.should_retry(2, error)
+
+
+@pytest.mark.parametrize("error, retried", [
+    (TimeoutError("slow"), True),
+    (ConnectionResetError("reset"), False),
+    (AssertionError("wrong title"), False),
+])
+def test_exception_filters_accept_classes_and_names(error, retried):
+    policy = RetryPolicy(max_attempts=3, only_on=["TimeoutError", AssertionError], except_on=[AssertionError])
+
+    assert policy.should_retry(1, _excinfo(error)) is retried
+
+
+def test_subclasses_match_a_filter_by_name():
+    class NavigationTimeout(TimeoutError):
+        pass
+
+    assert RetryPolicy(max_attempts=2, only_on=["TimeoutError"]).should_retry(1, _excinfo(NavigationTimeout()))
+
+
+def test_failure_without_exception_is_retried_only_without_only_on():
+    assert RetryPolicy(max_attempts=2).should_retry(1, None)
+    assert not RetryPolicy(max_attempts=2, only_on=[TimeoutError]).should_retry(1, None)
@@ -0,0 +1,107 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.run_history import HistoryRecorder, HistoryStore
+
+
+def _report(nodeid, when, outcome, duration=1.0, retry_count=0, **extra):
+    return SimpleNamespace(nodeid=nodeid, when=when, outcome=outcome, duration=duration, retry_count=retry_count,
+                           passed=outcome == "passed", failed=outcome == "failed", skipped=outcome == "skipped",
+                           **extra)
+
+
+def _result(nodeid, outcome, attempts=1, total=1.0, finished_at=None):
+    return {"nodeid": nodeid, "outcome": outcome, "attempts": attempts, "setup": 0.1, "call": total - 0.2,
+            "teardown": 0.1, "total": total, "finished_at": finished_at or time.time()}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.db")
+    yield store
+    store.close()
+
+
+def _record_runs(store, outcomes_per_test, start=None):
+    """One run per position; outcomes_per_test maps nodeid -> [(outcome, attempts), ...] oldest first."""
+    start = start or time.time() - 3600
+    runs = max(len(outcomes) for outcomes in outcomes_per_test.values())
+    for index in range(runs):
+        results = [_result(nodeid, *outcomes[index], finished_at=start + index)
+                   for nodeid, outcomes in outcomes_per_test.items() if index < len(outcomes)]
+        store.record(f"run-{index}", results, env="dev", browser="chromium", started_at=start + index)
+
+
+def test_recorder_folds_phases_and_attempts():
+    recorder = HistoryRecorder()
+    recorder.add(_report("t::a", "setup", "passed", 0.5))
+    recorder.add(_report("t::a", "call", "rerun", 2.0))
+    recorder.add(_report("t::a", "teardown", "passed", 0.5))
+    recorder.add(_report("t::a", "setup", "passed", 0.5, retry_count=1))
+    recorder.add(_report("t::a", "call", "passed", 1.0, retry_count=1))
+    recorder.add(_report("t::a", "teardown", "failed", 0.5, retry_count=1))
+
+    row, = recorder.rows()
+
+    assert row["attempts"] == 2
+    assert row["call"] == 1.0
+    assert row["total"] == 5.0
+    assert row["outcome"] == "error"
+
+
+def test_teardown_error_does_not_hide_a_failure():
+    recorder = HistoryRecorder()
+    recorder.add(_report("t::a", "setup", "passed"))
+    recorder.add(_report("t::a", "call", "failed"))
+    recorder.add(_report("t::a", "teardown", "failed"))
+
+    assert recorder.rows()[0]["outcome"] == "failed"
+
+
+def test_flaky_tests_need_a_pass_and_enough_instability(store):
+    _record_runs(store, {
+        "t::flaky": [("passed", 1), ("passed", 2), ("failed", 1), ("passed", 1)],
+        "t::stable": [("passed", 1)] * 4,
+        "t::broken": [("failed", 1)] * 4,
+    })
+
+    rows = store.flaky_tests(threshold=0.3)
+
+    assert [(row["nodeid"], row["runs"], row["unstable"]) for row in rows] == [("t::flaky", 4, 2)]
+
+
+def test_flakiness_is_judged_on_the_most_recent_runs(store):
+    _record_runs(store, {"t::fixed": [("failed", 1), ("passed", 2)] + [("passed", 1)] * 5})
+
+    assert store.flaky_tests(threshold=0.1, last_runs=10)
+    assert store.flaky_tests(threshold=0.1, last_runs=5) == []
+
+
+def test_average_durations_and_window(store):
+    now = time.time()
+    store.record("old", [_result("t::a", "passed", total=100.0, finished_at=now - 40 * 86400)], started_at=now - 40 * 86400)
+    store.record("new", [_result("t::a", "passed", total=2.0), _result("t::b", "skipped", total=9.0)])
+
+    assert store.average_durations(days=30) == {"t::a": 2.0}
+
+
+def test_prune_removes_old_results_and_empty_runs(store):
+    now = time.time()
+    store.record("old", [_result("t::a", "passed", finished_at=now - 100 * 86400)], started_at=now - 100 * 86400)
+    store.record("new", [_result("t::a", "passed")])
+
+    assert store.prune(days=90) == 1
+    assert [row["run_id"] for row in store.connection.execute("SELECT run_id FROM runs")] == ["new"]
+
+
+def test_fingerprints_round_trip(store):
+    store.save_fingerprints("dev", {"t::a": ("abc", "[]", "build-1", 1.0), "t::b": ("def", "[]", None, 2.0)})
+    store.save_fingerprints("dev", {"t::b": None})
+
+    fingerprints = store.fingerprints("dev")
+
+    assert list(fingerprints) == ["t::a"]
+    assert fingerprints["t::a"]["fingerprint"] == "abc"
+    assert store.fingerprints("qa") == {}
@@ -0,0 +1,65 @@
+import base64
+import io
+import re
+
+import pytest
+
+from utils.screenshots import ScreenshotPipeline
+
+
+class FakePage:
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def screenshot(self, type, quality, full_page):
+        self.calls.append((type, quality, full_page))
+        return self.data
+
+
+def _png(color="red"):
+    image_module = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    image_module.new("RGB", (1200, 800), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_link_mode_writes_each_screenshot_once(tmp_path):
+    pipeline = ScreenshotPipeline(tmp_path / "screenshots", report_dir=tmp_path / "reports",
+                                  image_format="png", embed="link")
+    page = FakePage(b"\x89PNG fake")
+
+    first = pipeline.capture(page)
+    second = pipeline.capture(page)
+    pipeline.close()
+
+    assert first == second
+    assert re.search(r'href="\.\./screenshots/[0-9a-f]{40}\.png"', first)
+    assert len(list((tmp_path / "screenshots").iterdir())) == 1
+    assert page.calls == [("png", None, False), ("png", None, False)]
+
+
+def test_inline_mode_embeds_the_image(tmp_path):
+    pipeline = ScreenshotPipeline(tmp_path, image_format="jpeg", quality=70, embed="inline")
+    page = FakePage(b"fake jpeg")
+
+    html = pipeline.capture(page)
+    pipeline.close()
+
+    assert base64.b64encode(b"fake jpeg").decode() in html
+    assert page.calls == [("jpeg", 70, False)]
+
+
+def test_thumbnail_is_inlined_and_links_to_the_full_image(tmp_path):
+    data = _png()
+    pipeline = ScreenshotPipeline(tmp_path / "screenshots", report_dir=tmp_path / "reports",
+                                  image_format="png", embed="thumbnail", thumbnail_width=200)
+
+    html = pipeline.capture(FakePage(data))
+    pipeline.close()
+
+    from PIL import Image
+    encoded = re.search(r'src="data:image/jpeg;base64,([^"]+)"', html).group(1)
+    assert Image.open(io.BytesIO(base64.b64decode(encoded))).size == (200, 133)
+    assert re.search(r'href="\.\./screenshots/[0-9a-f]{40}\.png"', html)
+    assert [p.suffix for p in (tmp_path / "screenshots").iterdir()] == [".png"]
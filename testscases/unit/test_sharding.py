@@ -0,0 +1,66 @@
+import argparse
+import json
+
+import pytest
+
+from utils.sharding import ShardPlan, hash_shard, load_or_build_plan, parse_shard
+
+NODEIDS = [f"testscases/test_{index}.py::test_case" for index in range(8)]
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "two/4", "1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_plan_balances_on_durations():
+    durations = {"a": 8.0, "b": 7.0, "c": 6.0, "d": 5.0}
+
+    plan = ShardPlan.build(list(durations), 2, durations)
+
+    assert sorted(plan.estimates) == [13.0, 13.0]
+    assert plan.imbalance() == 0.0
+    assert sorted(sum(plan.shards, [])) == sorted(durations)
+
+
+def test_tests_without_history_are_hashed():
+    plan = ShardPlan.build(NODEIDS, 3, {})
+
+    assert all(plan.shard_of(nodeid) == hash_shard(nodeid, 3) for nodeid in NODEIDS)
+    assert plan.shard_of("testscases/test_new.py::test_case") == hash_shard("testscases/test_new.py::test_case", 3)
+
+
+def test_every_node_reuses_the_first_plan_whatever_its_history(tmp_path):
+    plan_path = tmp_path / "shard-plan.json"
+    first = load_or_build_plan(plan_path, NODEIDS, 2, {nodeid: 1.0 for nodeid in NODEIDS})
+
+    # Another node has different local durations (or none) and must still get the same split
+    second = load_or_build_plan(plan_path, list(reversed(NODEIDS)), 2, {NODEIDS[0]: 60.0})
+
+    assert second.shards == first.shards
+    assert sorted(second.shards[0] + second.shards[1]) == sorted(NODEIDS)
+
+
+def test_plan_for_other_tests_is_never_rewritten_silently(tmp_path):
+    plan_path = tmp_path / "shard-plan.json"
+    load_or_build_plan(plan_path, NODEIDS, 2, {})
+    saved = plan_path.read_text()
+
+    with pytest.raises(ValueError, match="built for other tests"):
+        load_or_build_plan(plan_path, NODEIDS + ["testscases/test_new.py::test_case"], 2, {})
+    with pytest.raises(ValueError, match="not 3"):
+        load_or_build_plan(plan_path, NODEIDS, 3, {})
+    assert plan_path.read_text() == saved
+
+
+def test_rebuild_replaces_the_plan(tmp_path):
+    plan_path = tmp_path / "shard-plan.json"
+    load_or_build_plan(plan_path, NODEIDS, 2, {})
+    nodeids = NODEIDS + ["testscases/test_new.py::test_case"]
+
+    plan = load_or_build_plan(plan_path, nodeids, 2, {}, rebuild=True)
+
+    assert json.loads(plan_path.read_text())["shards"] == plan.shards
+    assert load_or_build_plan(plan_path, nodeids, 2, {}).shards == plan.shards
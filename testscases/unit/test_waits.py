@@ -0,0 +1,84 @@
+import re
+import threading
+import time
+import warnings
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils.waits import WaitStrategies, FixedSleepWarning, warn_on_fixed_sleep, _url_matches
+
+
+def _not_ready(remaining_ms):
+    raise PlaywrightTimeoutError(f"not ready after {remaining_ms}ms")
+
+
+def test_for_all_shares_one_deadline():
+    budgets = []
+
+    def condition(remaining_ms):
+        budgets.append(remaining_ms)
+        time.sleep(0.05)
+        return len(budgets)
+
+    assert WaitStrategies.for_all(condition, condition, timeout=1000) == [1, 2]
+    assert budgets[0] <= 1000 and budgets[1] <= budgets[0] - 40
+
+
+def test_for_all_times_out_once_the_deadline_passed():
+    def slow(remaining_ms):
+        time.sleep(0.06)
+
+    with pytest.raises(PlaywrightTimeoutError):
+        WaitStrategies.for_all(slow, slow, timeout=50)
+
+
+def test_for_any_returns_the_first_satisfied_condition():
+    calls = []
+
+    def ready_on_second_round(remaining_ms):
+        calls.append(remaining_ms)
+        if len(calls) < 2:
+            raise AssertionError("not yet")
+        return "done"
+
+    assert WaitStrategies.for_any(_not_ready, ready_on_second_round, timeout=1000, slice_ms=100) == (1, "done")
+    assert all(budget <= 100 for budget in calls)
+
+
+def test_for_any_times_out():
+    with pytest.raises(PlaywrightTimeoutError):
+        WaitStrategies.for_any(_not_ready, timeout=50, slice_ms=10)
+
+
+@pytest.mark.parametrize("matcher, matches", [
+    ("/login", True),
+    ("/logout", False),
+    (re.compile(r"login\.php\?next="), True),
+    (lambda url: url.endswith("dashboard"), False),
+])
+def test_url_matchers(matcher, matches):
+    assert _url_matches(matcher, "https://www.facebook.com/login.php?next=home") is matches
+
+
+def test_fixed_sleep_in_a_test_module_warns():
+    with warn_on_fixed_sleep(), pytest.warns(FixedSleepWarning):
+        time.sleep(0)
+
+
+def test_framework_sleeps_do_not_warn():
+    with warn_on_fixed_sleep(), warnings.catch_warnings():
+        warnings.simplefilter("error")
+        # A sleep written in framework code (here: a module named like one)
+        exec(compile("time.sleep(0)", "file_lock.py", "exec"), {"time": time})
+        # Sleeps on other threads (lock heartbeats, background workers) are never flagged
+        thread = threading.Thread(target=time.sleep, args=(0,))
+        thread.start()
+        thread.join()
+
+
+def test_sleep_is_restored_after_the_block():
+    original_sleep = time.sleep
+    with warn_on_fixed_sleep():
+        assert time.sleep is not original_sleep
+    assert time.sleep is original_sleep
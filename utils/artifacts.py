@@ -0,0 +1,116 @@
+import os
+import re
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import BrowserContext, Page
+from utils.logger import customLogger
+
+log = customLogger()
+
+ARTIFACT_MODES = ("off", "on", "retain-on-failure", "on-first-retry")
+
+
+class ArtifactRecorder:
+    """Records Playwright traces and videos per test attempt and keeps them according to their mode.
+
+    Traces use one tracing chunk per test, so pooled contexts keep tracing across tests and each
+    test only pays for its own chunk. on-first-retry records only the second attempt. Kept files
+    count against max_bytes; files that would exceed it are deleted instead of kept.
+    """
+
+    def __init__(self, output_dir, trace_mode: str = "off", video_mode: str = "off",
+                 max_bytes: Optional[int] = None, report_dir=None):
+        self.output_dir = Path(output_dir)
+        self.trace_mode = trace_mode
+        self.video_mode = video_mode
+        self.max_bytes = max_bytes
+        self.report_dir = Path(report_dir) if report_dir else None
+        self.stats = {"kept": 0, "discarded": 0, "dropped": 0, "bytes": 0}
+        self._tracing_contexts = weakref.WeakSet()
+
+    @staticmethod
+    def records(mode: str, attempt: int) -> bool:
+        return mode in ("on", "retain-on-failure") or (mode == "on-first-retry" and attempt == 2)
+
+    @staticmethod
+    def keeps(mode: str, failed: bool) -> bool:
+        return mode in ("on", "on-first-retry") or (mode == "retain-on-failure" and failed)
+
+    @property
+    def pooled_video(self) -> bool:
+        """Whether every pooled context records video (on-first-retry uses a fresh context instead)."""
+        return self.video_mode in ("on", "retain-on-failure")
+
+    def video_options(self) -> Dict[str, Any]:
+        """new_context() options that record a video of every page into a temporary directory."""
+        return {"record_video_dir": str(self.output_dir / ".videos")}
+
+    def start(self, context: BrowserContext, nodeid: str, attempt: int) -> bool:
+        """Start a trace chunk for this attempt; False when the trace mode does not record it."""
+        if not self.records(self.trace_mode, attempt):
+            return False
+        if context in self._tracing_contexts:
+            context.tracing.start_chunk(title=nodeid)
+        else:
+            # start() opens the first chunk; later tests on this pooled context open their own
+            context.tracing.start(title=nodeid, screenshots=True, snapshots=True, sources=False)
+            self._tracing_contexts.add(context)
+        return True
+
+    def finish(self, context: BrowserContext, page: Page, nodeid: str, attempt: int, failed: bool,
+               tracing: bool) -> List[Path]:
+        """Stop the trace chunk and finalize the page's video; return the files that were kept."""
+        kept = []
+        stem = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', nodeid).strip('_')}-attempt{attempt}"
+
+        if tracing:
+            try:
+                if self.keeps(self.trace_mode, failed):
+                    self.output_dir.mkdir(parents=True, exist_ok=True)
+                    trace_path = self.output_dir / f"{stem}-trace.zip"
+                    context.tracing.stop_chunk(path=str(trace_path))
+                    kept += self._account(trace_path)
+                else:
+                    # Without a path the chunk is thrown away and never written to disk
+                    context.tracing.stop_chunk()
+                    self.stats["discarded"] += 1
+            except Exception as e:
+                log.warning(f"Saving trace of {nodeid} failed: {e}")
+
+        video = page.video
+        if video is not None:
+            try:
+                # The video file is complete only once its page is closed
+                page.close()
+                if self.records(self.video_mode, attempt) and self.keeps(self.video_mode, failed):
+                    self.output_dir.mkdir(parents=True, exist_ok=True)
+                    video_path = self.output_dir / f"{stem}-video.webm"
+                    video.save_as(str(video_path))
+                    kept += self._account(video_path)
+                else:
+                    self.stats["discarded"] += 1
+                video.delete()
+            except Exception as e:
+                log.warning(f"Saving video of {nodeid} failed: {e}")
+        return kept
+
+    def _account(self, path: Path) -> List[Path]:
+        size = path.stat().st_size
+        if self.max_bytes is not None and self.stats["bytes"] + size > self.max_bytes:
+            path.unlink()
+            self.stats["dropped"] += 1
+            log.warning(f"Dropped {path.name} ({size} bytes): artifact budget of {self.max_bytes} bytes used up")
+            return []
+        self.stats["bytes"] += size
+        self.stats["kept"] += 1
+        return [path]
+
+    def links_html(self, paths: List[Path]) -> str:
+        links = []
+        for path in paths:
+            href = Path(os.path.relpath(path, self.report_dir)).as_posix() if self.report_dir else path.as_uri()
+            label = "Trace (open with: playwright show-trace)" if path.suffix == ".zip" else "Video"
+            links.append(f'<a href="{href}" target="_blank">{label}</a>')
+        return f'<div>{" | ".join(links)}</div>'
@@ -0,0 +1,79 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from utils.file_lock import FileLock
+from utils.logger import customLogger
+
+log = customLogger()
+
+
+class AuthStateCache:
+    """Keeps one Playwright storage_state snapshot per (env, user) on disk and shares it across workers.
+
+    `validate(state)` decides whether a snapshot holds a logged-in session, so a failed login that
+    was saved anyway is never reused.
+    """
+
+    def __init__(self, root_dir, ttl_seconds: int = 1800, validate: Optional[Callable[[dict], bool]] = None):
+        self.root_dir = Path(root_dir)
+        self.ttl_seconds = ttl_seconds
+        self.validate = validate
+
+    def state_path(self, env: str, user: str) -> Path:
+        safe_user = re.sub(r"[^A-Za-z0-9_.@-]", "_", user)
+        return self.root_dir / env / f"{safe_user}.json"
+
+    def is_valid(self, path: Path) -> bool:
+        """Whether a cached snapshot can be reused: younger than the TTL (0 never reuses) and still logged in."""
+        try:
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return False
+        if self.ttl_seconds <= 0 or age > self.ttl_seconds:
+            return False
+        return self.holds_session(path)
+
+    def holds_session(self, path: Path) -> bool:
+        """Whether a snapshot has cookies, none of them expired, and passes validate (its age is not checked)."""
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        cookies = state.get("cookies", [])
+        if not cookies:
+            return False
+        now = time.time()
+        # expires == -1 marks a session cookie
+        if not all(cookie.get("expires", -1) < 0 or cookie["expires"] > now for cookie in cookies):
+            return False
+        return self.validate is None or self.validate(state)
+
+    def get(self, env: str, user: str, login: Callable[[Path], None]) -> Path:
+        """Return the snapshot for (env, user), logging in through `login(path)` when it is missing or stale."""
+        path = self.state_path(env, user)
+        if self.is_valid(path):
+            return path
+
+        with FileLock(path.with_suffix(".lock")):
+            # Another worker may have logged in while this one was waiting for the lock
+            if self.is_valid(path):
+                log.info(f"Reusing storage state saved by another worker: {path}")
+                return path
+
+            log.info(f"Logging in '{user}' on '{env}' to refresh storage state")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            login(tmp_path)
+            # A snapshot that was just written is checked for a session only, the TTL applies to reuse
+            if not self.holds_session(tmp_path):
+                os.remove(tmp_path)
+                raise RuntimeError(f"Login of '{user}' on '{env}' did not produce a logged-in session; "
+                                   f"storage state was not saved")
+            os.replace(tmp_path, path)
+        return path
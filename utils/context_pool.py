@@ -0,0 +1,150 @@
+import json
+from collections import deque
+from typing import Any, Dict, Set
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Browser, BrowserContext
+from utils.logger import customLogger
+
+log = customLogger()
+
+# Clears every kind of storage of the current origin; false when IndexedDB cannot be enumerated
+CLEAR_ORIGIN_STORAGE = """async () => {
+    try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+    if (self.caches) {
+        for (const key of await caches.keys()) { await caches.delete(key); }
+    }
+    if (!indexedDB.databases) { return false; }
+    for (const db of await indexedDB.databases()) {
+        await new Promise(resolve => {
+            const request = indexedDB.deleteDatabase(db.name);
+            request.onsuccess = request.onerror = request.onblocked = resolve;
+        });
+    }
+    return true;
+}"""
+
+
+class ContextPool:
+    """Hands out pre-warmed BrowserContexts and recycles them between tests."""
+
+    def __init__(self, browser: Browser, context_options: Dict[str, Any], size: int = 2,
+                 warmup: int = 1, verify_reset: bool = True):
+        self.browser = browser
+        self.context_options = context_options
+        self.size = size
+        self.verify_reset = verify_reset
+        self._idle = deque()
+        # Every origin each pooled context has navigated to, so storage can be cleared after its pages close
+        self._origins: Dict[BrowserContext, Set[str]] = {}
+        self.stats = {"created": 0, "reused": 0, "discarded": 0}
+
+        for _ in range(min(warmup, size)):
+            self._idle.append(self._new_context())
+        log.info(f"Context pool ready: size={size}, warm={len(self._idle)}")
+
+    def _new_context(self, **overrides) -> BrowserContext:
+        self.stats["created"] += 1
+        context = self.browser.new_context(**{**self.context_options, **overrides})
+        origins = self._origins[context] = set()
+        context.on("page", lambda page: page.on("framenavigated", lambda frame: self._track(origins, frame.url)))
+        return context
+
+    @staticmethod
+    def _track(origins: Set[str], url: str):
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https"):
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+
+    def acquire(self, strict: bool = False, storage_state=None, **overrides) -> BrowserContext:
+        """Return a clean context; strict isolation or custom options always get a fresh one."""
+        if storage_state is not None:
+            state = storage_state
+            if not isinstance(state, dict):
+                with open(state) as f:
+                    state = json.load(f)
+            # Cookie-only snapshots can be applied to a recycled context, local storage needs a fresh one
+            if strict or overrides or any(origin.get("localStorage") for origin in state.get("origins", [])):
+                overrides["storage_state"] = state
+            else:
+                context = self.acquire()
+                context.add_cookies(state.get("cookies", []))
+                return context
+
+        if strict or overrides or not self.size:
+            return self._new_context(**overrides)
+        if self._idle:
+            self.stats["reused"] += 1
+            return self._idle.popleft()
+        return self._new_context()
+
+    def release(self, context: BrowserContext, discard: bool = False):
+        """Reset the context and return it to the pool, closing it when it cannot be reused."""
+        if discard or len(self._idle) >= self.size or not self._reset(context):
+            self.stats["discarded"] += 1
+            self._close(context)
+            return
+        self._idle.append(context)
+
+    def _reset(self, context: BrowserContext) -> bool:
+        """Wipe cookies, storage, permissions, routes and pages; False when the context is not clean."""
+        try:
+            for page in context.pages:
+                page.close()
+            if not self._clear_origins(context):
+                log.warning("Context storage could not be fully cleared, falling back to a fresh context")
+                return False
+            context.clear_cookies()
+            context.clear_permissions()
+            context.set_extra_http_headers({})
+            context.set_offline(False)
+            context.unroute_all(behavior="ignoreErrors")
+
+            if self.verify_reset:
+                state = context.storage_state()
+                dirty_origins = [origin for origin in state.get("origins", []) if origin.get("localStorage")]
+                if state.get("cookies") or dirty_origins or context.pages:
+                    log.warning("Context reset verification failed, falling back to a fresh context")
+                    return False
+            return True
+        except Exception as e:
+            log.warning(f"Context reset failed, falling back to a fresh context: {e}")
+            return False
+
+    def _clear_origins(self, context: BrowserContext) -> bool:
+        """Clear local/session storage, IndexedDB and Cache Storage of every origin the context visited.
+
+        Each origin is opened on a blank stub page (no request reaches the server) in one throwaway tab.
+        """
+        origins = self._origins.setdefault(context, set())
+        # Origins a test left (or a storage_state snapshot brought in) may hold storage too
+        origins.update(origin["origin"] for origin in context.storage_state().get("origins", []))
+        if not origins:
+            return True
+
+        page = context.new_page()
+        try:
+            page.route("**/*", lambda route: route.fulfill(status=200, content_type="text/html", body="<html></html>"))
+            for origin in sorted(origins):
+                page.goto(f"{origin}/")
+                if not page.evaluate(CLEAR_ORIGIN_STORAGE):
+                    return False
+        finally:
+            page.close()
+            if page.video is not None:
+                page.video.delete()
+        origins.clear()
+        return True
+
+    def _close(self, context: BrowserContext):
+        self._origins.pop(context, None)
+        try:
+            context.close()
+        except Exception as e:
+            log.warning(f"Closing browser context failed: {e}")
+
+    def close(self):
+        """Close every idle context in the pool."""
+        while self._idle:
+            self._close(self._idle.popleft())
+        log.info(f"Context pool closed: {self.stats}")
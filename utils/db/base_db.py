@@ -1,27 +1,185 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union
+from contextlib import contextmanager
+from typing import List, Dict, Any, Union, Optional, Iterator
 from utils.logger import customLogger
+from .pool import ConnectionPool
 
 log = customLogger()
 
+# How a test's own database writes are undone: deleted afterwards, or rolled back to a savepoint
+ISOLATION_MODES = ("delete", "rollback")
+
+
+class UnsupportedOperationError(ValueError):
+    """A connector was asked for something its database backend cannot do"""
+
+
+# Savepoint wrapping each statement run inside a transaction; never nested, so one name is enough
+STATEMENT_SAVEPOINT = "db_statement"
+
 
 class BaseDB(ABC):
-    """Abstract base class for all database connectors"""
+    """Abstract base class for all database connectors
+
+    A connector checks a connection out of its pool when created and returns it on close(), so use
+    it as a context manager:
+
+        with DBFactory.get_db("mysql") as db:
+            db.execute_query("SELECT 1")
+    """
+
+    # Whether isolated() can wrap a test in a savepoint on this backend
+    supports_savepoints = False
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self._pool = pool
+        # Savepoint of the open isolated() block: writes are left uncommitted and rolled back when it exits
+        self._savepoint: Optional[str] = None
+        self.connection = pool.acquire() if pool is not None else self.connect()
+
+    @staticmethod
+    @abstractmethod
+    def connect():
+        """Open a new driver connection"""
+        pass
+
+    @staticmethod
+    def disconnect(connection):
+        """Close a driver connection"""
+        connection.close()
+
+    @staticmethod
+    def is_healthy(connection) -> bool:
+        """Whether an idle pooled connection can still be used"""
+        return True
+
+    @staticmethod
+    def reset_connection(connection):
+        """Bring a connection back to a clean state before it returns to the pool"""
+        pass
 
     @abstractmethod
     def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         """Execute a query and return results"""
         pass
 
+    def stream_query(self, query: str, params: tuple = None, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a query page by page instead of loading them all at once
+
+        Backends fetch page_size rows per round trip. Finish (or close) the iterator before running
+        another query on the same connector.
+        """
+        yield from self.execute_query(query, params)
+
     @abstractmethod
     def execute_non_query(self, query: str, params: tuple = None) -> int:
         """Execute a query that doesn't return results (INSERT/UPDATE/DELETE)"""
         pass
 
-    @abstractmethod
+    @property
+    def in_transaction(self) -> bool:
+        """True inside isolated()"""
+        return self._savepoint is not None
+
+    def _commit(self):
+        """Commit, unless an isolated() block will roll the work back instead"""
+        if not self.in_transaction:
+            self.connection.commit()
+
+    def _has_open_transaction(self) -> bool:
+        """Whether the driver has a transaction open that a failed statement must not roll back"""
+        return False
+
+    @contextmanager
+    def _statement(self):
+        """Run one statement (or one bulk operation) so that a failure undoes only its own work
+
+        Inside a transaction (an isolated() block, or one earlier queries left open) the statement gets a
+        savepoint of its own: released when it succeeds, rolled back to when it fails, which also clears
+        the error state PostgreSQL puts a transaction in. Otherwise a failure rolls the connection back.
+        """
+        if not (self.in_transaction or self._has_open_transaction()):
+            try:
+                yield
+            except Exception:
+                self.connection.rollback()
+                raise
+            return
+
+        self._execute_control(f"SAVEPOINT {STATEMENT_SAVEPOINT}")
+        try:
+            yield
+        except Exception:
+            self._execute_control(f"ROLLBACK TO SAVEPOINT {STATEMENT_SAVEPOINT}")
+            self._execute_control(f"RELEASE SAVEPOINT {STATEMENT_SAVEPOINT}")
+            raise
+        self._execute_control(f"RELEASE SAVEPOINT {STATEMENT_SAVEPOINT}")
+
+    @contextmanager
+    def isolated(self, name: str = "test_isolation"):
+        """Run the block inside a SAVEPOINT and roll everything it wrote back on exit
+
+        Only work done through this connector is undone; rows written by the application under test
+        through its own connections must still be cleaned up with deletes. A failed statement is rolled
+        back to its own savepoint, so the block's earlier writes are kept and the connection stays usable.
+        """
+        if not self.supports_savepoints:
+            raise UnsupportedOperationError(f"{type(self).__name__}: isolated() needs savepoints, which this "
+                                            f"database backend does not support; use --db-isolation delete")
+        if self.in_transaction:
+            raise RuntimeError("isolated() blocks cannot be nested")
+        # End whatever transaction earlier queries left open, so the block's transaction starts here
+        self.connection.rollback()
+        self._execute_control(f"SAVEPOINT {name}")
+        self._savepoint = name
+        try:
+            yield self
+        finally:
+            self._savepoint = None
+            self.connection.rollback()
+
+    def _execute_control(self, statement: str):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
     def close(self):
-        """Close the database connection"""
-        pass
+        """Return the connection to the pool (or close it when the connector is not pooled)"""
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        if self._pool is not None:
+            self._pool.release(connection)
+        else:
+            self.disconnect(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def bulk_insert(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert many rows (all with the same columns) through the backend's fastest bulk path"""
+        raise UnsupportedOperationError(f"{type(self).__name__}: bulk_insert into {table_name} is not supported "
+                                        f"by this database backend")
+
+    def delete_where(self, table_name: str, conditions: List[str], batch_size: int = 100) -> int:
+        """Delete the rows matching any of the conditions; backends override this with a bulk delete"""
+        for condition in conditions:
+            self.clean_test_data(table_name, condition)
+        return len(conditions)
+
+    @staticmethod
+    def _columns(table_name: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """The shared column list of rows to bulk insert"""
+        columns = list(rows[0])
+        for row in rows:
+            if set(row) != set(columns):
+                raise ValueError(f"Bulk insert into {table_name}: every row needs the columns {columns}, got {list(row)}")
+        return columns
 
     @abstractmethod
     def clean_test_data(self, table_name: str, where_clause:str):
@@ -32,4 +190,4 @@ class BaseDB(ABC):
             table_name: Name of the table/container to clean
             where_clause: Either a single record (dict) needed for deletion
         """
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,203 @@
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+from utils.logger import customLogger
+
+log = customLogger()
+
+CLEANUP_MODES = ("immediate", "deferred", "background")
+
+# column = 'literal' or column = number, the only conditions that can be folded into an IN list;
+# quotes inside literals are doubled (SQL) or backslash-escaped (Cosmos DB)
+_EQUALITY = re.compile(r"^\s*([\w.]+)\s*=\s*('(?:[^'\\]|''|\\.)*'|-?\d+(?:\.\d+)?)\s*$")
+
+
+def coalesce(registrations: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Group (table, condition) registrations per table, dropping duplicate conditions."""
+    grouped: Dict[str, Dict[str, None]] = OrderedDict()
+    for table_name, condition in registrations:
+        if table_name and condition:
+            grouped.setdefault(table_name, OrderedDict())[condition.strip()] = None
+    return {table_name: list(conditions) for table_name, conditions in grouped.items()}
+
+
+def batch_predicates(conditions: List[str], batch_size: int = 100) -> List[str]:
+    """WHERE predicates covering every condition, at most batch_size conditions each.
+
+    Equality conditions on the same column become one `column IN (...)`; everything else is OR-ed.
+    """
+    by_column: Dict[str, List[str]] = OrderedDict()
+    other = []
+    for condition in conditions:
+        match = _EQUALITY.match(condition)
+        if match:
+            by_column.setdefault(match.group(1), []).append(match.group(2))
+        else:
+            other.append(f"({condition})")
+
+    predicates = []
+    for column, values in by_column.items():
+        for start in range(0, len(values), batch_size):
+            predicates.append(f"{column} IN ({', '.join(values[start:start + batch_size])})")
+    for start in range(0, len(other), batch_size):
+        predicates.append(" OR ".join(other[start:start + batch_size]))
+    return predicates
+
+
+class CleanupEngine:
+    """Deletes registered test data in bulk: one delete_where() per table, tables in parallel.
+
+    Tables run concurrently on pooled connections. Tables that fail (e.g. a parent row whose
+    children were still being deleted) are retried one by one after the parallel pass; a table
+    that fails again is cleaned condition by condition, so errors point at the exact registrations.
+    """
+
+    def __init__(self, db_type: str, max_workers: int = 4, batch_size: int = 100):
+        self.db_type = db_type
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def run(self, registrations: Iterable[Tuple[str, str]], ordered: bool = False
+            ) -> Tuple[Dict[str, int], Dict[str, Dict[str, Exception]]]:
+        """Clean every registration; returns (deleted count per table, {table: {condition: error}}).
+
+        ordered cleans the tables one after another in the order they were first registered,
+        for callers that know the dependencies (e.g. children before their parents).
+        """
+        grouped = coalesce(registrations)
+        if not grouped:
+            return {}, {}
+
+        deleted, errors = {}, {}
+        if ordered or len(grouped) == 1 or self.max_workers <= 1:
+            for table_name, conditions in grouped.items():
+                self._collect(table_name, conditions, deleted, errors)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(grouped)),
+                                    thread_name_prefix="db-cleanup") as executor:
+                futures = {table_name: executor.submit(self._clean_table, table_name, conditions)
+                           for table_name, conditions in grouped.items()}
+            for table_name, future in futures.items():
+                try:
+                    deleted[table_name] = future.result()
+                except Exception as e:
+                    errors[table_name] = e
+
+            for table_name in list(errors):
+                del errors[table_name]
+                self._collect(table_name, grouped[table_name], deleted, errors)
+
+        failed = {}
+        for table_name, error in errors.items():
+            failed[table_name] = self._clean_each(table_name, grouped[table_name], error, deleted)
+            for condition, condition_error in failed[table_name].items():
+                log.error(f"Cleanup of {table_name} where {condition} failed: {condition_error}")
+        log.info(f"Cleanup deleted {sum(deleted.values())} record(s) from {len(deleted)} table(s): {deleted}")
+        return deleted, failed
+
+    def _collect(self, table_name, conditions, deleted, errors):
+        try:
+            deleted[table_name] = self._clean_table(table_name, conditions)
+        except Exception as e:
+            errors[table_name] = e
+
+    def _clean_each(self, table_name, conditions, error, deleted) -> Dict[str, Exception]:
+        """Delete a failed table's conditions one at a time; returns the error of each condition that failed."""
+        if len(conditions) == 1:
+            return {conditions[0]: error}
+        failed = {}
+        for condition in conditions:
+            try:
+                deleted[table_name] = deleted.get(table_name, 0) + self._clean_table(table_name, [condition])
+            except Exception as e:
+                failed[condition] = e
+        return failed
+
+    def _clean_table(self, table_name: str, conditions: List[str]) -> int:
+        # Imported here: the connectors import batch_predicates from this module
+        from .db_factory import DBFactory
+
+        with DBFactory.get_db(self.db_type) as db:
+            return db.delete_where(table_name, conditions, batch_size=self.batch_size)
+
+
+class CleanupWorker:
+    """Runs cleanup on a background thread so tests do not wait on database round trips.
+
+    Registrations go onto a bounded queue; submit() blocks while the queue is full, so a slow
+    database throttles the tests instead of piling up memory. The thread takes everything queued
+    at once and hands it to the engine, which coalesces it. close() flushes the queue.
+
+    A test's data is deleted while later tests already run, so the values in cleanup conditions
+    must be unique per test (e.g. include the worker id or a uuid): a later test that inserts
+    the same key could otherwise lose its row to an earlier test's pending cleanup.
+    """
+
+    _STOP = object()
+
+    def __init__(self, engine: CleanupEngine, max_queue: int = 1000, max_batch: int = 500):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.errors: List[Tuple[str, str, str, str]] = []  # (nodeid, table, condition, error)
+        self.stats = {"queued": 0, "deleted": 0, "blocked": 0}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, nodeid: str, registrations: Iterable[Tuple[str, str]]):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-cleanup-worker", daemon=True)
+                self._thread.start()
+        for table_name, condition in registrations:
+            entry = (nodeid, table_name, condition)
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                self.stats["blocked"] += 1
+                log.warning(f"Cleanup queue full ({self._queue.maxsize}), {nodeid} waits for the cleanup worker")
+                self._queue.put(entry)
+            self.stats["queued"] += 1
+
+    def _run(self):
+        while True:
+            entries, stop = [self._queue.get()], False
+            while len(entries) < self.max_batch:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._STOP in entries:
+                entries, stop = [entry for entry in entries if entry is not self._STOP], True
+            if entries:
+                self._clean(entries)
+            if stop:
+                return
+
+    def _clean(self, entries):
+        try:
+            deleted, errors = self.engine.run((table_name, condition) for _, table_name, condition in entries)
+        except Exception as e:
+            deleted, errors = {}, {}
+            for _, table_name, condition in entries:
+                errors.setdefault(table_name, {})[condition.strip()] = e
+        self.stats["deleted"] += sum(deleted.values())
+        for nodeid, table_name, condition in entries:
+            error = errors.get(table_name, {}).get(condition.strip())
+            if error is not None:
+                self.errors.append((nodeid, table_name, condition, str(error)))
+
+    def close(self, timeout: float = 300) -> bool:
+        """Wait until everything queued is cleaned; False when the worker did not finish in time."""
+        if self._thread is None:
+            return True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.error(f"Cleanup worker still busy after {timeout}s, ~{self._queue.qsize()} registration(s) not cleaned")
+            return False
+        log.info(f"Cleanup worker finished: {self.stats}")
+        return True
@@ -1,35 +1,233 @@
 from azure.cosmos import CosmosClient
+from azure.cosmos import partition_key as cosmos_partition_key
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.partition_key import NonePartitionKeyValue
 from .base_db import BaseDB
+from .cleanup import batch_predicates
 import os
-from typing import List, Dict, Any
+import re
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Union
 from utils.logger import customLogger
 
 log = customLogger()
 
+# Transactional batches are limited to 100 operations, all on one logical partition
+COSMOS_BATCH_LIMIT = 100
+# Upserts in flight at once when bulk loading; the client shares one HTTP connection pool across threads
+UPSERT_CONCURRENCY = 16
+# Partition key of items whose key property is JSON null; azure-cosmos without it reads None the same way
+NULL_PARTITION_KEY = getattr(cosmos_partition_key, "NullPartitionKeyValue", None)
+
+# SELECT ... FROM <container> [[AS] alias] WHERE <filter> [ORDER BY | GROUP BY | OFFSET ...]
+_QUERY_SHAPE = re.compile(r"^\s*SELECT\b.*?\bFROM\s+(\w+)(?:\s+(?:AS\s+)?(?!WHERE\b|IN\b)(\w+))?\s+WHERE\b(.*?)"
+                          r"(?:\b(?:ORDER\s+BY|GROUP\s+BY|OFFSET)\b.*)?$", re.IGNORECASE | re.DOTALL)
+
+
+class _RequestCharge:
+    """response_hook summing the request units of every response it is called for"""
 
-class CosmosDB(BaseDB):
     def __init__(self):
-        self.client = CosmosClient(
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, headers, *_):
+        charge = float((headers or {}).get("x-ms-request-charge", 0))
+        # Bulk upserts call the hook from several threads
+        with self._lock:
+            self.total += charge
+
+
+class CosmosDB(BaseDB):
+    # Container clients per CosmosClient, and partition key paths per (account, database, container),
+    # shared by every connector so container metadata is read once per process
+    _containers = weakref.WeakKeyDictionary()
+    _partition_key_paths = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, pool=None):
+        super().__init__(pool)
+        # The pooled "connection" is a CosmosClient, which keeps its own HTTP connection pool
+        self.client = self.connection
+        self.database_name = os.getenv("COSMOS_DB_NAME")
+        self.database = self.client.get_database_client(self.database_name)
+        self.continuation_token = None
+        # Request units and latency of the last call, and summed over every call of this connector
+        self.last_metrics = None
+        self.metrics = {"calls": 0, "request_charge": 0.0, "latency_ms": 0.0}
+
+    @staticmethod
+    def connect():
+        return CosmosClient(
             os.getenv("COSMOS_DB_HOST"),
             credential=os.getenv("COSMOS_DB_KEY")
         )
-        self.database = self.client.get_database_client(os.getenv("COSMOS_DB_NAME"))
+
+    @staticmethod
+    def disconnect(connection):
+        # Cosmos client doesn't require explicit closing
+        pass
 
     def _get_container(self, container_name: str):
-        """Return container client dynamically"""
-        return self.database.get_container_client(container_name)
+        """Return the (cached) container client"""
+        with CosmosDB._cache_lock:
+            containers = CosmosDB._containers.setdefault(self.client, {})
+            container = containers.get((self.database_name, container_name))
+            if container is None:
+                container = self.database.get_container_client(container_name)
+                containers[(self.database_name, container_name)] = container
+            return container
+
+    def partition_key_path(self, container_name: str) -> str:
+        """The container's partition key path (e.g. '/tenantId'), read once per process"""
+        key = (os.getenv("COSMOS_DB_HOST"), self.database_name, container_name)
+        path = CosmosDB._partition_key_paths.get(key)
+        if path is None:
+            path = self._get_container(container_name).read()["partitionKey"]["paths"][0]
+            CosmosDB._partition_key_paths[key] = path
+        return path
+
+    def _record(self, operation: str, container_name: str, elapsed: float, request_charge: float):
+        """Record request units and latency (seconds spent waiting on Cosmos) of a finished call"""
+        self.last_metrics = {
+            "operation": operation,
+            "container": container_name,
+            "request_charge": request_charge,
+            "latency_ms": round(elapsed * 1000, 2),
+        }
+        self.metrics["calls"] += 1
+        self.metrics["request_charge"] += request_charge
+        self.metrics["latency_ms"] += self.last_metrics["latency_ms"]
+        log.debug("Cosmos %s on %s: %.2f RU in %.1f ms", operation, container_name, request_charge,
+                  self.last_metrics["latency_ms"])
+
+    @contextmanager
+    def _measure(self, operation: str, container_name: str):
+        """Time the block and sum the request units of every response whose response_hook it hands out"""
+        charge = _RequestCharge()
+        started = time.perf_counter()
+        try:
+            yield charge
+        finally:
+            self._record(operation, container_name, time.perf_counter() - started, charge.total)
+
+    def _single_partition(self, container_name: str, query: str, params) -> Optional[Any]:
+        """The partition key value a query's WHERE clause restricts it to, if it has an equality on it
+
+        Only plain `SELECT ... FROM c WHERE ...` queries are inspected; joins and subqueries (whose
+        filters may not be on the queried items) need an explicit partition_key.
+        """
+        if re.search(r"\bJOIN\b|\(\s*SELECT\b", query, re.IGNORECASE):
+            return None
+        shape = _QUERY_SHAPE.match(query)
+        if not shape:
+            return None
+        alias, where = shape.group(2) or shape.group(1), shape.group(3)
+        # Only a plain conjunction is safe to route; OR/NOT may reach other partitions
+        if re.search(r"\b(OR|NOT)\b", where, re.IGNORECASE):
+            return None
+        path = self.partition_key_path(container_name)
+        column = rf"(?<![\w.\]]){re.escape(alias)}" + "".join(
+            rf"(?:\.{re.escape(part)}|\[\s*[\"']{re.escape(part)}[\"']\s*\])" for part in path.strip("/").split("/"))
+        match = re.search(column + r"\s*=\s*(@\w+|'(?:[^'\\]|\\.)*'|-?\d+(?:\.\d+)?)", where)
+        if not match:
+            return None
+        value = match.group(1)
+        if value.startswith("@"):
+            for parameter in self._parameters(params) or []:
+                if parameter["name"] == value:
+                    return parameter["value"]
+            return None
+        if value.startswith("'"):
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        return float(value) if "." in value else int(value)
+
+    def _query_pages(self, operation: str, container_name: str, query: str, params, partition_key=None,
+                     page_size: int = None, continuation_token: str = None):
+        """Run a query (single-partition when the partition key is known) and yield it page by page"""
+        container = self._get_container(container_name)
+        if partition_key is None:
+            partition_key = self._single_partition(container_name, query, params)
+        options = {"partition_key": partition_key} if partition_key is not None else \
+            {"enable_cross_partition_query": True}
+        if page_size:
+            options["max_item_count"] = page_size
+
+        # The hook sees every response, including the several a cross-partition page can take
+        charge, elapsed = _RequestCharge(), 0.0
+        pages = container.query_items(query=query, parameters=self._parameters(params), response_hook=charge,
+                                      **options).by_page(continuation_token)
+        try:
+            while True:
+                # Only time the fetches, not the caller's work between pages of a stream
+                started = time.perf_counter()
+                try:
+                    items = list(next(pages))
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                self.continuation_token = pages.continuation_token
+                yield items
+        finally:
+            self._record(operation, container_name, elapsed, charge.total)
+
+    @staticmethod
+    def _parameters(params: Union[dict, list, None]) -> Optional[List[Dict[str, Any]]]:
+        """{"@id": 1} (or {"id": 1}) -> [{"name": "@id", "value": 1}]; a list is passed through as is"""
+        if not params:
+            return None
+        if isinstance(params, dict):
+            return [{"name": name if name.startswith("@") else f"@{name}", "value": value}
+                    for name, value in params.items()]
+        return list(params)
 
-    def execute_query(self, query: str, params: tuple = None, container_name: str = None) -> list:
+    def execute_query(self, query: str, params: Union[dict, list] = None, container_name: str = None,
+                      partition_key: Any = None) -> list:
+        """Run a query; it is routed to one partition when partition_key is given or the query filters on it"""
         if not container_name:
             raise ValueError("Container name is required for CosmosDB query")
 
-        container = self._get_container(container_name)
-        items = list(container.query_items(
-            query=query,
-            enable_cross_partition_query=True
-        ))
+        items = []
+        for page in self._query_pages("query", container_name, query, params, partition_key):
+            items.extend(page)
         return items
 
+    def stream_query(self, query: str, params: Union[dict, list] = None, page_size: int = 1000,
+                     container_name: str = None, continuation_token: str = None,
+                     partition_key: Any = None) -> Iterator[Dict[str, Any]]:
+        """Yield items page by page, following the continuation token of each page
+
+        self.continuation_token holds the token of the next page, so a stopped stream can be resumed.
+        """
+        if not container_name:
+            raise ValueError("Container name is required for CosmosDB query")
+
+        for page in self._query_pages("stream_query", container_name, query, params, partition_key,
+                                      page_size=page_size, continuation_token=continuation_token):
+            yield from page
+
+    def read_item(self, container_name: str, item_id: str, partition_key: Any = None) -> Optional[Dict[str, Any]]:
+        """Point read of one item by id and partition key (the cheapest Cosmos read); None when missing"""
+        if partition_key is None:
+            if self.partition_key_path(container_name) != "/id":
+                raise ValueError(f"Container {container_name} is not partitioned by id: pass partition_key")
+            partition_key = item_id
+
+        container = self._get_container(container_name)
+        with self._measure("read_item", container_name) as charge:
+            try:
+                return container.read_item(item=item_id, partition_key=partition_key, response_hook=charge)
+            except CosmosResourceNotFoundError as e:
+                # The hook is not called for errors, but a 404 is still charged
+                charge(getattr(e, "headers", None))
+                return None
+
     def execute_non_query(self, query: str = None, params: dict = None, container_name: str = None) -> int:
         """
         For Cosmos DB, we ignore query and expect params to be a document (dict).
@@ -41,12 +239,21 @@ class CosmosDB(BaseDB):
             raise ValueError("CosmosDB non-query expects 'params' as a dict (document to upsert)")
 
         container = self._get_container(container_name)
-        container.upsert_item(params)
+        with self._measure("upsert", container_name) as charge:
+            container.upsert_item(params, response_hook=charge)
         return 1
 
-    def close(self):
-        # Cosmos client doesn't require explicit closing
-        pass
+    def bulk_insert(self, container_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Upsert documents concurrently"""
+        if not rows:
+            return 0
+        container = self._get_container(container_name)
+        with self._measure("bulk_insert", container_name) as charge, \
+                ThreadPoolExecutor(max_workers=min(UPSERT_CONCURRENCY, len(rows)),
+                                   thread_name_prefix="cosmos-upsert") as executor:
+            # list() re-raises the first failed upsert
+            list(executor.map(lambda row: container.upsert_item(row, response_hook=charge), rows))
+        return len(rows)
 
     def clean_test_data(self, container_name: str, where_clause: str):
         try:
@@ -54,30 +261,59 @@ class CosmosDB(BaseDB):
                 log.warning("Container name or WHERE clause missing. No action taken.")
                 return
 
-            container = self._get_container(container_name)
+            self.delete_where(container_name, [where_clause])
 
-            query = f"SELECT * FROM c WHERE {where_clause}"
-            items_to_delete = list(container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-            ))
+        except Exception as e:
+            log.error(f"Error deleting record(s) from {container_name}: {e}")
 
-            if not items_to_delete:
-                log.info(f"No items found in {container_name} for condition: {where_clause}")
-                return
+    def delete_where(self, container_name: str, conditions: List[str], batch_size: int = 100) -> int:
+        """Delete every item matching any condition, in transactional batches grouped by partition key"""
+        container = self._get_container(container_name)
+        key_path = self.partition_key_path(container_name)
 
-            deleted_count = 0
-            for item in items_to_delete:
-                try:
-                    # Adjust partition key if different from 'id'
-                    container.delete_item(item['id'], partition_key=item['id'])
-                    deleted_count += 1
-                except Exception as e:
-                    log.error(f"Error deleting item {item.get('id')} from {container_name}: {e}")
+        by_partition = defaultdict(set)
+        for predicate in batch_predicates(conditions, batch_size):
+            query = f"SELECT c.id, c{self._key_selector(key_path)} AS pk FROM c WHERE {predicate}"
+            for page in self._query_pages("cleanup_query", container_name, query, None):
+                for item in page:
+                    by_partition[self._item_partition_key(item)].add(item["id"])
 
-            log.info(f"Deleted {deleted_count} item(s) from {container_name} where {where_clause}")
+        deleted_count = 0
+        if by_partition:
+            with self._measure("delete", container_name) as charge:
+                deleted_count = self._delete_items(container, by_partition, charge)
 
-        except Exception as e:
-            log.error(f"Error deleting record(s) from {container_name}: {e}")
-        finally:
-            self.close()
+        log.info(f"Deleted {deleted_count} item(s) from {container_name} across {len(by_partition)} "
+                 f"partition(s) for {len(conditions)} condition(s)")
+        return deleted_count
+
+    @staticmethod
+    def _item_partition_key(item: Dict[str, Any]) -> Any:
+        """Partition key of a cleanup query result; the projection leaves 'pk' out when the item has no key"""
+        if "pk" not in item:
+            # Passing None would address no partition at all, not the one of items without the property
+            return NonePartitionKeyValue
+        return NULL_PARTITION_KEY if item["pk"] is None else item["pk"]
+
+    @staticmethod
+    def _delete_items(container, by_partition: Dict[Any, set], charge: _RequestCharge) -> int:
+        deleted_count = 0
+        for partition_key, ids in by_partition.items():
+            ids = sorted(ids)
+            if not hasattr(container, "execute_item_batch"):
+                # azure-cosmos < 4.5 has no transactional batch
+                for item_id in ids:
+                    container.delete_item(item_id, partition_key=partition_key, response_hook=charge)
+                deleted_count += len(ids)
+                continue
+            for start in range(0, len(ids), COSMOS_BATCH_LIMIT):
+                chunk = ids[start:start + COSMOS_BATCH_LIMIT]
+                container.execute_item_batch([("delete", (item_id,)) for item_id in chunk],
+                                             partition_key=partition_key, response_hook=charge)
+                deleted_count += len(chunk)
+        return deleted_count
+
+    @staticmethod
+    def _key_selector(key_path: str) -> str:
+        """'/tenant/id' -> '["tenant"]["id"]', usable after the item alias in a query"""
+        return "".join(f'["{part}"]' for part in key_path.strip("/").split("/"))
@@ -1,19 +1,55 @@
 from .cosmos_db import CosmosDB
 from .mysql_db import MySQLDB
 from .postgresql_db import PostgreSQLDB
+from .pool import ConnectionPool
 import os
+import threading
 
 
 class DBFactory:
+    _connectors = {
+        "cosmos": CosmosDB,
+        "mysql": MySQLDB,
+        "postgresql": PostgreSQLDB,
+    }
+    # One pool per (db type, env), shared by every connector handed out in this process
+    _pools = {}
+    _lock = threading.Lock()
+
     @staticmethod
-    def get_db(db_type: str):
-        """Factory method to get database instance"""
+    def get_db(db_type: str, pooled: bool = True):
+        """Factory method to get database instance (close it, or use it as a context manager, to return its connection)"""
+
+        connector = DBFactory._connectors.get(db_type.lower())
+        if connector is None:
+            raise ValueError(f"Unsupported database type: {db_type}")
+        if not pooled:
+            return connector()
+        return connector(pool=DBFactory._get_pool(db_type.lower(), connector))
 
-        if db_type.lower() == "cosmos":
-            return CosmosDB()
-        elif db_type.lower() == "mysql":
-            return MySQLDB()
-        elif db_type.lower() == "postgresql":
-            return PostgreSQLDB()
-        else:
-            raise ValueError(f"Unsupported database type: {db_type}")
\ No newline at end of file
+    @staticmethod
+    def _get_pool(db_type: str, connector) -> ConnectionPool:
+        key = (db_type, os.getenv("ENV"))
+        with DBFactory._lock:
+            pool = DBFactory._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    connector.connect,
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+                    idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+                    health_check=connector.is_healthy,
+                    reset=connector.reset_connection,
+                    disconnect=connector.disconnect,
+                    name=f"{db_type}/{key[1]}",
+                )
+                DBFactory._pools[key] = pool
+            return pool
+
+    @staticmethod
+    def close_all():
+        """Drain every pool; call once at session end"""
+        with DBFactory._lock:
+            pools = list(DBFactory._pools.values())
+            DBFactory._pools.clear()
+        for pool in pools:
+            pool.drain()
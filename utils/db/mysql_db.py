@@ -1,36 +1,94 @@
 import mysql.connector
 from mysql.connector import Error
 from .base_db import BaseDB
+from .cleanup import batch_predicates
 import os
-from typing import List, Dict, Union
+from typing import Any, Dict, Iterator, List, Union
 from utils.logger import customLogger
 log = customLogger()
 
+# executemany() turns an INSERT into multi-row INSERT statements; rows per executemany() call
+INSERT_CHUNK_SIZE = 1000
+
 
 class MySQLDB(BaseDB):
-    def __init__(self):
-        self.connection = mysql.connector.connect(
+    supports_savepoints = True
+
+    def __init__(self, pool=None):
+        super().__init__(pool)
+        self.cursor = self.connection.cursor(dictionary=True)
+
+    @staticmethod
+    def connect():
+        return mysql.connector.connect(
             host=os.getenv("MYSQL_HOST"),
             database=os.getenv("MYSQL_DB"),
             user=os.getenv("MYSQL_USER"),
             password=os.getenv("MYSQL_PASSWORD"),
             port=os.getenv("MYSQL_PORT"),
         )
-        self.cursor = self.connection.cursor(dictionary=True)
+
+    @staticmethod
+    def is_healthy(connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    @staticmethod
+    def reset_connection(connection):
+        connection.rollback()
+
+    def _has_open_transaction(self) -> bool:
+        return self.connection.in_transaction
 
     def execute_query(self, query: str, params: tuple = None) -> list:
-        self.cursor.execute(query, params or ())
-        return self.cursor.fetchall()
+        with self._statement():
+            self.cursor.execute(query, params or ())
+            return self.cursor.fetchall()
+
+    def stream_query(self, query: str, params: tuple = None, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield rows from an unbuffered cursor, page_size rows at a time"""
+        cursor = self.connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # The connection cannot run another statement until an unbuffered result is read to the end
+            if self.connection.is_connected() and self.connection.unread_result:
+                while cursor.fetchmany(page_size):
+                    pass
+            cursor.close()
 
     def execute_non_query(self, query: str, params: tuple = None) -> int:
-        self.cursor.execute(query, params or ())
-        self.connection.commit()
+        with self._statement():
+            self.cursor.execute(query, params or ())
+        self._commit()
         return self.cursor.rowcount
 
+    def bulk_insert(self, table_name: str, rows: List[Dict]) -> int:
+        """Insert rows with executemany (sent as multi-row INSERTs) in one transaction"""
+        if not rows:
+            return 0
+        columns = self._columns(table_name, rows)
+        query = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        with self._statement():
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                self.cursor.executemany(query, [tuple(row[column] for column in columns)
+                                                for row in rows[start:start + INSERT_CHUNK_SIZE]])
+        self._commit()
+        return len(rows)
+
     def close(self):
-        if self.connection.is_connected():
+        if self.connection is not None and self.connection.is_connected():
             self.cursor.close()
-            self.connection.close()
+        super().close()
 
     def clean_test_data(self, table_name: str, where_clause: str):
         try:
@@ -45,5 +103,14 @@ class MySQLDB(BaseDB):
 
         except Exception as e:
             log.error(f"Error deleting record from {table_name}: {e}")
-        finally:
-            self.close()
+
+    def delete_where(self, table_name: str, conditions: List[str], batch_size: int = 100) -> int:
+        """Delete rows matching any condition with batched IN/OR predicates, all in one transaction"""
+        deleted_count = 0
+        with self._statement():
+            for predicate in batch_predicates(conditions, batch_size):
+                self.cursor.execute(f"DELETE FROM {table_name} WHERE {predicate}")
+                deleted_count += self.cursor.rowcount
+        self._commit()
+        log.info(f"Deleted {deleted_count} row(s) from {table_name} for {len(conditions)} condition(s)")
+        return deleted_count
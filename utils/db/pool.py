@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+from utils.logger import customLogger
+
+log = customLogger()
+
+
+class ConnectionPool:
+    """Thread-safe, size-bounded pool of raw driver connections.
+
+    Idle connections are reused most-recently-released first. A connection idle for longer than
+    idle_timeout is closed instead of reused; one idle for longer than check_after is health
+    checked before it is handed out. When max_size connections are checked out, acquire() waits
+    for a release.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 4, idle_timeout: float = 300,
+                 health_check: Optional[Callable[[Any], bool]] = None, reset: Optional[Callable[[Any], None]] = None,
+                 disconnect: Optional[Callable[[Any], None]] = None, check_after: float = 30, name: str = "db"):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.reset = reset
+        self.disconnect = disconnect
+        self.check_after = check_after
+        self.name = name
+        self._idle = deque()  # (connection, released at)
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "evicted": 0, "unhealthy": 0}
+
+    def acquire(self, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool '{self.name}' is closed")
+                connection = self._take_idle()
+                if connection is not None:
+                    self._in_use += 1
+                    self.stats["reused"] += 1
+                    return connection
+                if self._in_use + len(self._idle) < self.max_size:
+                    # Reserve the slot, then connect outside the lock so other threads are not blocked
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No connection free in pool '{self.name}' after {timeout}s "
+                                       f"(max_size={self.max_size})")
+                self._condition.wait(remaining)
+
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.stats["created"] += 1
+        return connection
+
+    def _take_idle(self):
+        """Pop a reusable idle connection, closing expired or broken ones on the way (lock held)."""
+        while self._idle:
+            connection, released_at = self._idle.pop()
+            idle_for = time.monotonic() - released_at
+            if idle_for > self.idle_timeout:
+                self.stats["evicted"] += 1
+                self._disconnect(connection)
+                continue
+            if idle_for > self.check_after and self.health_check and not self.health_check(connection):
+                self.stats["unhealthy"] += 1
+                self._disconnect(connection)
+                continue
+            return connection
+        return None
+
+    def release(self, connection, discard: bool = False):
+        """Return a checked-out connection; discarded (or, after drain(), every) connection is closed."""
+        if not discard and self.reset:
+            try:
+                self.reset(connection)
+            except Exception as e:
+                log.warning(f"Resetting pooled connection of '{self.name}' failed, discarding it: {e}")
+                discard = True
+        with self._condition:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._disconnect(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def evict_idle(self):
+        """Close connections idle for longer than idle_timeout."""
+        with self._condition:
+            now = time.monotonic()
+            keep = deque(entry for entry in self._idle if now - entry[1] <= self.idle_timeout)
+            for connection, released_at in self._idle:
+                if now - released_at > self.idle_timeout:
+                    self.stats["evicted"] += 1
+                    self._disconnect(connection)
+            self._idle = keep
+
+    def drain(self):
+        """Close every idle connection and refuse new checkouts; checked-out ones close on release."""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._disconnect(self._idle.pop()[0])
+            self._condition.notify_all()
+        log.info(f"Connection pool '{self.name}' drained: {self.stats}")
+
+    def _disconnect(self, connection):
+        if self.disconnect is None:
+            return
+        try:
+            self.disconnect(connection)
+        except Exception as e:
+            log.warning(f"Closing pooled connection of '{self.name}' failed: {e}")
@@ -1,14 +1,28 @@
+import csv
+import io
+import json
 import psycopg2
+import psycopg2.extensions
 from .base_db import BaseDB
+from .cleanup import batch_predicates
 import os
+import uuid
+from typing import Any, Dict, Iterator, List
 from utils.logger import customLogger
 
 log = customLogger()
 
 
 class PostgreSQLDB(BaseDB):
-    def __init__(self):
-        self.connection = psycopg2.connect(
+    supports_savepoints = True
+
+    def __init__(self, pool=None):
+        super().__init__(pool)
+        self.cursor = self.connection.cursor()
+
+    @staticmethod
+    def connect():
+        return psycopg2.connect(
             host=os.getenv("POSTGRES_HOST"),
             database=os.getenv("POSTGRES_DB"),
             user=os.getenv("POSTGRES_USER"),
@@ -17,22 +31,92 @@ class PostgreSQLDB(BaseDB):
 
         )
 
-        self.cursor = self.connection.cursor()
+    @staticmethod
+    def is_healthy(connection) -> bool:
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def reset_connection(connection):
+        # Ends any open (or failed) transaction so the next user starts clean
+        connection.rollback()
 
     def execute_query(self, query: str, params: tuple = None) -> list:
-        self.cursor.execute(query, params or ())
+        self._execute(query, params)
         columns = [desc[0] for desc in self.cursor.description]
         return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
 
+    def stream_query(self, query: str, params: tuple = None, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield rows from a server-side (named) cursor, page_size rows per round trip"""
+        idle = self.connection.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        try:
+            with self.connection.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = page_size
+                cursor.execute(query, params or ())
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(page_size)
+                    if not rows:
+                        break
+                    if columns is None:
+                        # A named cursor only has a description once rows have been fetched
+                        columns = [desc[0] for desc in cursor.description]
+                    for row in rows:
+                        yield dict(zip(columns, row))
+        finally:
+            # The named cursor opened a transaction; end it unless the caller already had one open
+            if idle and not self.connection.closed:
+                self.connection.rollback()
+
     def execute_non_query(self, query: str, params: tuple = None) -> int:
-        self.cursor.execute(query, params or ())
-        self.connection.commit()
+        self._execute(query, params)
+        self._commit()
         return self.cursor.rowcount
 
+    def _has_open_transaction(self) -> bool:
+        return self.connection.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    def _execute(self, query: str, params: tuple = None):
+        # A failed statement aborts the whole transaction in PostgreSQL; _statement() rolls back to just before it
+        with self._statement():
+            self.cursor.execute(query, params or ())
+
+    def bulk_insert(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Load rows with a single COPY ... FROM STDIN, the fastest way into PostgreSQL"""
+        if not rows:
+            return 0
+        columns = self._columns(table_name, rows)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([self._copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        with self._statement():
+            self.cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        self._commit()
+        return len(rows)
+
+    @staticmethod
+    def _copy_value(value):
+        # \N marks NULL, so an empty string still loads as ''
+        if value is None:
+            return "\\N"
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
     def close(self):
-        if not self.connection.closed:
+        if self.connection is not None and not self.connection.closed:
             self.cursor.close()
-            self.connection.close()
+        super().close()
 
     def clean_test_data(self, table_name: str, where_clause: str):
         try:
@@ -42,13 +126,19 @@ class PostgreSQLDB(BaseDB):
 
             query = f"DELETE FROM {table_name} WHERE {where_clause}"
 
-            print(query)
-            print("@###@@@@@@@@@@@###################@@@@@@@@@@@@@@@@@@@")
-
-            # deleted_count = self.execute_non_query(query)
-            # log.info(f"Deleted {deleted_count} row(s) from {table_name} where {where_clause}")
+            deleted_count = self.execute_non_query(query)
+            log.info(f"Deleted {deleted_count} row(s) from {table_name} where {where_clause}")
 
         except Exception as e:
             log.error(f"Error deleting record from {table_name}: {e}")
-        finally:
-            self.close()
+
+    def delete_where(self, table_name: str, conditions: List[str], batch_size: int = 100) -> int:
+        """Delete rows matching any condition with batched IN/OR predicates, all in one transaction"""
+        deleted_count = 0
+        with self._statement():
+            for predicate in batch_predicates(conditions, batch_size):
+                self.cursor.execute(f"DELETE FROM {table_name} WHERE {predicate}")
+                deleted_count += self.cursor.rowcount
+        self._commit()
+        log.info(f"Deleted {deleted_count} row(s) from {table_name} for {len(conditions)} condition(s)")
+        return deleted_count
@@ -0,0 +1,103 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from utils.logger import customLogger
+from utils.parallel import get_worker_id
+from .cleanup import CleanupEngine
+from .db_factory import DBFactory
+
+log = customLogger()
+
+SEEDS_DIR = Path(__file__).resolve().parent.parent.parent / "testdata" / "seeds"
+
+_TOKEN = re.compile(r"\$\{(\w+)\}")
+
+
+def _substitute(value, tokens: Dict[str, str]):
+    if isinstance(value, str):
+        return _TOKEN.sub(lambda match: tokens.get(match.group(1), match.group(0)), value)
+    if isinstance(value, list):
+        return [_substitute(item, tokens) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, tokens) for key, item in value.items()}
+    return value
+
+
+def _literal(value, cosmos: bool = False) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if cosmos:
+        # Cosmos SQL escapes quotes with a backslash instead of doubling them
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def load_seed_set(name: str, seeds_dir: Path = SEEDS_DIR, tokens: Dict[str, str] = None) -> Dict[str, Dict[str, Any]]:
+    """Read testdata/seeds/<name>.json with its ${...} tokens replaced.
+
+    A seed set maps each table (or Cosmos container) to the column identifying its rows and the
+    rows themselves, in load order (parents first):
+
+        {"users": {"key": "id", "rows": [{"id": "u-${worker}-1", "name": "Ann"}]}}
+
+    ${worker} is replaced with the xdist worker id (gw0, ... or "master"), so parallel workers seed
+    rows of their own.
+    """
+    path = Path(seeds_dir) / (name if name.endswith(".json") else f"{name}.json")
+    with path.open(encoding="utf-8") as f:
+        seed_set = json.load(f)
+
+    tokens = {"worker": get_worker_id(), **(tokens or {})}
+    tables = {}
+    for table_name, spec in seed_set.items():
+        if "key" not in spec or not isinstance(spec.get("rows"), list):
+            raise ValueError(f"Seed set {path.name}: table '{table_name}' needs a 'key' column and a 'rows' list")
+        rows = _substitute(spec["rows"], tokens)
+        missing = [row for row in rows if spec["key"] not in row]
+        if missing:
+            raise ValueError(f"Seed set {path.name}: {len(missing)} row(s) of '{table_name}' have no '{spec['key']}'")
+        tables[table_name] = {"key": spec["key"], "rows": rows}
+    return tables
+
+
+class Seeder:
+    """Loads seed sets through the fastest bulk path of a backend and remembers what to clean up.
+
+    Each seed set is loaded at most once per Seeder (one per test session); cleanup() deletes
+    every seeded row again in bulk, table by table in reverse load order.
+    """
+
+    def __init__(self, db_type: str, seeds_dir: Path = SEEDS_DIR):
+        self.db_type = db_type.lower()
+        self.seeds_dir = Path(seeds_dir)
+        self._loaded: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._registrations: List[Tuple[str, str]] = []
+
+    def seed(self, name: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Load a seed set (once) and return its rows per table."""
+        if name not in self._loaded:
+            tables = load_seed_set(name, self.seeds_dir)
+            with DBFactory.get_db(self.db_type) as db:
+                for table_name, spec in tables.items():
+                    # Register before loading, so a partially loaded table is still cleaned up
+                    self._registrations.extend((table_name, self._condition(spec["key"], row[spec["key"]]))
+                                               for row in spec["rows"])
+                    count = db.bulk_insert(table_name, spec["rows"])
+                    log.info(f"Seeded {count} row(s) into {table_name} from seed set '{name}'")
+            self._loaded[name] = tables
+        return {table_name: spec["rows"] for table_name, spec in self._loaded[name].items()}
+
+    def _condition(self, key: str, value) -> str:
+        if self.db_type == "cosmos":
+            return f"c.{key} = {_literal(value, cosmos=True)}"
+        return f"{key} = {_literal(value)}"
+
+    def cleanup(self):
+        """Delete every seeded row; returns (deleted count per table, {table: {condition: error}})."""
+        # Tables are loaded parents first, so deleting in reverse load order never hits a foreign key
+        registrations, self._registrations = self._registrations, []
+        self._loaded.clear()
+        return CleanupEngine(self.db_type).run(reversed(registrations), ordered=True)
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class FileLock:
+    """Cross-process lock backed by an exclusively created lock file (works on Windows and Linux).
+
+    The holder touches the lock file every stale_after / 3 seconds, so a lock file that has not been
+    touched for stale_after seconds belongs to a crashed process and is broken by the next waiter.
+    """
+
+    def __init__(self, path, timeout: float = 120, stale_after: float = 15, poll_interval: float = 0.2):
+        if stale_after >= timeout:
+            raise ValueError(f"stale_after ({stale_after}s) must be shorter than timeout ({timeout}s)")
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._heartbeat = None
+        self._released = threading.Event()
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                self._start_heartbeat()
+                return self
+            except FileExistsError:
+                self._remove_if_stale()
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out after {self.timeout}s waiting for lock: {self.path}")
+                time.sleep(self.poll_interval)
+
+    def _remove_if_stale(self):
+        """Break a lock left behind by a crashed process."""
+        try:
+            if time.time() - self.path.stat().st_mtime > self.stale_after:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _start_heartbeat(self):
+        self._released.clear()
+        self._heartbeat = threading.Thread(target=self._touch, name=f"lock-heartbeat-{self.path.name}", daemon=True)
+        self._heartbeat.start()
+
+    def _touch(self):
+        while not self._released.wait(self.stale_after / 3):
+            try:
+                os.utime(self.path)
+            except OSError:
+                return
+
+    def release(self):
+        if self._fd is None:
+            return
+        self._released.set()
+        self._heartbeat.join()
+        os.close(self._fd)
+        self._fd = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -1,4 +1,5 @@
 import json
+import sys
 from pathlib import Path
 from utils import logger
 
@@ -6,8 +7,14 @@ from utils import logger
 
 log = logger.customLogger()
 
+# Source file of the reading module -> testdata files it read (inputs of incremental fingerprints)
+testdata_reads = {}
+
 def read_file(folder_name, file_name):
     path = get_file_with_json_extension(folder_name, file_name)
+    caller_file = sys._getframe(1).f_globals.get("__file__")
+    if caller_file:
+        testdata_reads.setdefault(str(Path(caller_file).resolve()), set()).add(str(path.resolve()))
     try:
         with path.open(mode='r') as f:
             data = json.load(f)
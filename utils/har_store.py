@@ -0,0 +1,96 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from playwright.sync_api import BrowserContext
+from utils.logger import customLogger
+
+log = customLogger()
+
+NETWORK_MODES = ("live", "record", "replay")
+
+
+def shared_record_keys(keys: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """HAR keys claimed by more than one test, from (nodeid, key) pairs.
+
+    Every test records its context into the key's HAR on close, so tests sharing a key in record
+    mode would overwrite each other's archive.
+    """
+    nodeids: Dict[str, List[str]] = {}
+    for nodeid, key in keys:
+        nodeids.setdefault(key, []).append(nodeid)
+    return {key: ids for key, ids in nodeids.items() if len(ids) > 1}
+
+
+class HarStore:
+    """Records per-test (or per marker name) HAR files and replays them with route_from_har.
+
+    With har_format="har" response bodies are stored next to the HAR files as <sha1>.<ext>
+    attachments, so identical bodies are kept once for the whole store. har_format="zip"
+    writes one compressed, self-contained archive per key instead.
+    """
+
+    def __init__(self, root_dir, har_format: str = "har", not_found: str = "abort"):
+        self.root_dir = Path(root_dir)
+        self.har_format = har_format
+        self.not_found = not_found
+
+    def har_path(self, key: str) -> Path:
+        safe_key = re.sub(r"[^A-Za-z0-9_.-]+", "_", key).strip("_")
+        return self.root_dir / f"{safe_key}.{self.har_format}"
+
+    def record_options(self, key: str) -> Dict[str, Any]:
+        """new_context() options that record the context's traffic into the key's HAR on close."""
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        return {
+            "record_har_path": str(self.har_path(key)),
+            "record_har_content": "attach",
+            "record_har_mode": "minimal",
+        }
+
+    def replay(self, context: BrowserContext, key: str) -> bool:
+        """Serve the context from the key's HAR; False when nothing was recorded for it."""
+        har_path = self.har_path(key)
+        if not har_path.exists():
+            return False
+        context.route_from_har(str(har_path), not_found=self.not_found)
+        return True
+
+    def compact(self):
+        """Minify HAR files, drop repeated requests and delete attachments no HAR references any more."""
+        if self.har_format != "har" or not self.root_dir.exists():
+            return
+
+        referenced = set()
+        for har_path in self.root_dir.glob("*.har"):
+            try:
+                with open(har_path, encoding="utf-8") as f:
+                    har = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning(f"Skipping unreadable HAR {har_path}: {e}")
+                continue
+
+            # Keep the first response per (method, url, body): route_from_har replays the first match
+            entries = {}
+            for entry in har["log"].get("entries", []):
+                request = entry["request"]
+                post_data = request.get("postData", {}).get("text", "")
+                entries.setdefault((request["method"], request["url"], post_data), entry)
+            har["log"]["entries"] = list(entries.values())
+
+            for entry in har["log"]["entries"]:
+                for part in (entry["response"].get("content", {}), entry["request"].get("postData", {})):
+                    if part.get("_file"):
+                        referenced.add(part["_file"])
+
+            with open(har_path, "w", encoding="utf-8") as f:
+                json.dump(har, f, separators=(",", ":"))
+
+        removed = 0
+        for attachment in self.root_dir.iterdir():
+            # Attachments are named <sha1>.<ext> by Playwright
+            if re.fullmatch(r"[0-9a-f]{40}(\.\w+)?", attachment.name) and attachment.name not in referenced:
+                attachment.unlink()
+                removed += 1
+        log.info(f"Compacted HAR store {self.root_dir}: {len(referenced)} shared bodies, {removed} orphans removed")
@@ -0,0 +1,110 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pages.base_page import BasePage
+from utils.file_reader import testdata_reads
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class IncrementalRun:
+    """Skips tests whose inputs are unchanged since they last passed.
+
+    A test's inputs are its module, the page object modules and element files it used, the
+    testdata files those modules read, and a context dict (env, base URL, ...). They are only
+    known once the test has run, so each pass stores the list of input files with their content
+    digests; the next run re-hashes exactly those files. A stored pass is ignored when it was
+    recorded for another target build or is older than max_age_hours.
+    """
+
+    def __init__(self, env: str, context: Dict[str, Optional[str]], previous: Dict[str, dict],
+                 build_id: Optional[str] = None, max_age_hours: float = 24, shared_files: Iterable[str] = ()):
+        self.env = env
+        self.context = context
+        # Inputs of every test, e.g. the env file
+        self.shared_files = tuple(shared_files)
+        self.previous = previous
+        self.build_id = build_id
+        self.max_age_hours = max_age_hours
+        # node id -> (fingerprint, inputs json, build id, recorded at), or None to forget a failed test
+        self.pending: Dict[str, Optional[tuple]] = {}
+        self._digests: Dict[str, Optional[str]] = {}
+
+    def decide(self, nodeid: str) -> Tuple[bool, str]:
+        """Return (skip, reason) for a collected test."""
+        entry = self.previous.get(nodeid)
+        if entry is None:
+            return False, "run: no previous pass"
+        if entry["build_id"] != self.build_id:
+            return False, f"run: target build changed ({entry['build_id']} -> {self.build_id})"
+        age_hours = (time.time() - entry["recorded_at"]) / 3600
+        if age_hours > self.max_age_hours:
+            return False, f"run: last pass {age_hours:.0f}h old (max {self.max_age_hours:g}h)"
+
+        inputs = json.loads(entry["inputs"])
+        for key, value in inputs["context"].items():
+            if self.context.get(key) != value:
+                return False, f"run: {key} changed"
+        for path, digest in inputs["files"].items():
+            if self._digest(path) != digest:
+                return False, f"run: {path} changed"
+        passed_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["recorded_at"]))
+        return True, f"skipped: {len(inputs['files'])} inputs unchanged since pass at {passed_at}"
+
+    def remember(self, nodeid: str, files: Iterable[str]):
+        """Store the fingerprint of a test that passed."""
+        paths = sorted({*files, *self.shared_files})
+        inputs = {"context": self.context, "files": {path: self._digest(path) for path in paths}}
+        encoded = json.dumps(inputs, sort_keys=True)
+        fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        self.pending[nodeid] = (fingerprint, encoded, self.build_id, time.time())
+
+    def forget(self, nodeid: str):
+        """Drop the fingerprint of a test that failed, so the next run does not skip it."""
+        self.pending[nodeid] = None
+
+    def _digest(self, path: str) -> Optional[str]:
+        if path not in self._digests:
+            try:
+                self._digests[path] = hashlib.sha256((PROJECT_ROOT / path).read_bytes()).hexdigest()
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+
+def inputs_of(item) -> List[str]:
+    """Project-relative input files of a test: its module, page objects, element files and testdata.
+
+    Call it while the test's fixtures are still set up (e.g. from the call phase report).
+    """
+    sources = {Path(str(item.fspath)).resolve()}
+    element_files = set()
+    for value in (item.funcargs or {}).values():
+        if not isinstance(value, BasePage):
+            continue
+        for cls in type(value).__mro__:
+            if cls is object:
+                continue
+            source = inspect.getsourcefile(cls)
+            if source:
+                sources.add(Path(source).resolve())
+        if value.element_file is not None:
+            element_files.add(Path(value.element_file).resolve())
+
+    files = sources | element_files
+    for source in sources:
+        files.update(Path(path) for path in testdata_reads.get(str(source), ()))
+    return [_relative(path) for path in files if _is_project_file(path)]
+
+
+def _is_project_file(path: Path) -> bool:
+    return PROJECT_ROOT in path.parents
+
+
+def _relative(path: Path) -> str:
+    return Path(os.path.relpath(path, PROJECT_ROOT)).as_posix()
@@ -0,0 +1,143 @@
+import functools
+import inspect
+import threading
+import time
+from collections import defaultdict
+from html import escape
+from typing import Callable, Dict, List
+
+# Methods whose time counts as waiting for actionability when they run inside another step
+WAIT_METHODS = ("_await_actionable", "wait_for_element_visible", "wait_for_element_clickable",
+                "wait_for_network_idle")
+
+
+class StepRecorder:
+    """Times every public page object method (actions, verify_*, waits) as one step of the running test.
+
+    Nothing is wrapped until instrument() is called, so a disabled recorder costs nothing. Methods
+    called from inside another step are not recorded separately; time spent in WAIT_METHODS is
+    added to the enclosing step's wait time instead.
+    """
+
+    def __init__(self):
+        self.steps: List[dict] = []
+        self._originals: Dict[type, Dict[str, Callable]] = {}
+        self._local = threading.local()
+        self._test_start = time.perf_counter()
+
+    def instrument(self, cls: type, wait_methods=WAIT_METHODS):
+        originals = self._originals.setdefault(cls, {})
+        for name, member in list(vars(cls).items()):
+            # Plain functions only: static/class methods such as set_actionability_mode are not steps
+            if not inspect.isfunction(member) or (name.startswith("_") and name not in wait_methods):
+                continue
+            originals[name] = member
+            setattr(cls, name, self._wrap(cls.__name__, name, member, name in wait_methods))
+
+    def uninstrument(self):
+        for cls, originals in self._originals.items():
+            for name, member in originals.items():
+                setattr(cls, name, member)
+        self._originals.clear()
+
+    def reset(self):
+        self.steps = []
+        self._test_start = time.perf_counter()
+
+    def take(self) -> List[dict]:
+        """Return the steps recorded since the last reset and start a new list."""
+        steps, self.steps = self.steps, []
+        return steps
+
+    def _wrap(self, owner: str, name: str, func: Callable, is_wait: bool) -> Callable:
+        recorder = self
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stack = recorder._stack()
+            frame = {"wait": 0.0}
+            stack.append(frame)
+            start = time.perf_counter()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                wait = elapsed if is_wait else frame["wait"]
+                if stack:
+                    stack[-1]["wait"] += wait
+                else:
+                    page = type(args[0]).__name__ if args else owner
+                    element_key = args[1] if len(args) > 1 and isinstance(args[1], str) else None
+                    recorder.steps.append({
+                        "page": page,
+                        "action": name.lstrip("_"),
+                        "element_key": element_key,
+                        "start": round(start - recorder._test_start, 4),
+                        "duration": round(elapsed, 4),
+                        "wait": round(wait, 4),
+                        "outcome": "failed" if error is not None else "passed",
+                        "error": type(error).__name__ if error is not None else None,
+                    })
+
+        return timed
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+step_recorder = StepRecorder()
+
+
+def timeline_html(steps: List[dict]) -> str:
+    """HTML table of a test's steps with a bar per step positioned on the test's time axis."""
+    if not steps:
+        return ""
+    end = max(step["start"] + step["duration"] for step in steps) or 1
+    rows = []
+    for step in steps:
+        left = 100 * step["start"] / end
+        width = max(100 * step["duration"] / end, 0.3)
+        wait_width = 100 * step["wait"] / step["duration"] if step["duration"] else 0
+        color = "#d9534f" if step["outcome"] == "failed" else "#4a90d9"
+        rows.append(
+            f'<tr><td>{step["start"]:.3f}s</td><td>{escape(step["page"])}.{escape(step["action"])}</td>'
+            f'<td>{escape(step["element_key"] or "")}</td><td>{step["duration"] * 1000:.0f} ms</td>'
+            f'<td>{step["wait"] * 1000:.0f} ms</td><td>{step["outcome"]}</td>'
+            f'<td style="width:300px"><div style="margin-left:{left:.1f}%;width:{width:.1f}%;height:10px;'
+            f'background:{color}"><div style="width:{wait_width:.0f}%;height:10px;background:#f0ad4e"></div>'
+            f'</div></td></tr>'
+        )
+    return ('<table class="step-timeline"><tr><th>Start</th><th>Step</th><th>Element</th><th>Duration</th>'
+            '<th>Wait</th><th>Outcome</th><th>Timeline (wait in orange)</th></tr>' + "".join(rows) + "</table>")
+
+
+def summarize(tests: Dict[str, List[dict]], limit: int = 10) -> List[str]:
+    """Terminal lines for the slowest single steps and the element keys with the most total time."""
+    steps = [dict(step, nodeid=nodeid) for nodeid, test_steps in tests.items() for step in test_steps]
+    if not steps:
+        return []
+
+    lines = ["slowest steps:"]
+    for step in sorted(steps, key=lambda s: s["duration"], reverse=True)[:limit]:
+        lines.append(f"  {step['duration']:8.3f}s (wait {step['wait']:.3f}s)  {step['page']}.{step['action']}"
+                     f"({step['element_key'] or ''})  {step['nodeid']}")
+
+    by_key: Dict[str, list] = defaultdict(lambda: [0, 0.0, 0.0])
+    for step in steps:
+        if step["element_key"]:
+            totals = by_key[f"{step['page']}:{step['element_key']}"]
+            totals[0] += 1
+            totals[1] += step["duration"]
+            totals[2] += step["wait"]
+    lines.append("slowest element keys (total time):")
+    for key, (count, duration, wait) in sorted(by_key.items(), key=lambda e: e[1][1], reverse=True)[:limit]:
+        lines.append(f"  {duration:8.3f}s over {count} steps (wait {wait:.3f}s)  {key}")
+    return lines
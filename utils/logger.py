@@ -1,35 +1,163 @@
+import atexit
+import copy
+import gzip
+import json
 import logging
-
+import logging.handlers
 import os
-import inspect
-import logging
+import queue
 import shutil
-from datetime import datetime
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from utils.parallel import get_run_id, get_worker_id, worker_dir
+
+# Every customLogger() is a child of this logger, which owns the single queue handler
+FRAMEWORK_LOGGER = "framework"
+TEXT_FORMAT = '%(asctime)s -(%(filename)5s:%(lineno)2s)- [%(levelname)4s] %(message)s'
+DATE_FORMAT = '%d_%m_%Y %I:%M:%S %p'
+
+_listener = None
+_configure_lock = threading.Lock()
+
 
 def customLogger(logLevel=logging.INFO):
-    # Create the directory for logs if it doesn't exist
-    log_dir = "Logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    # Gets the name of the class / method from where this method is called
-    stack = inspect.stack()
-    loggerName = stack[1][3]
-    moduleName = stack[1][1]
-    logger = logging.getLogger(loggerName)
-    # By default, log all messages
+    """Return the logger of the calling module; records are written to the run's log files on a background thread."""
+    # sys._getframe is a pointer walk, unlike inspect.stack() which reads the source of every frame
+    module_name = sys._getframe(1).f_globals.get("__name__", "__main__")
+    logger = logging.getLogger(f"{FRAMEWORK_LOGGER}.{module_name}")
     logger.setLevel(logLevel)
+    if _listener is None:
+        configure_logging()
+    return logger
+
+
+def configure_logging(log_dir="Logs", level=logging.INFO, json_lines: bool = False, max_bytes: int = 10 * 1024 * 1024,
+                      backup_count: int = 5, retention_days: Optional[float] = None):
+    """(Re)configure the framework log files: one per run and worker, rotated at max_bytes, gzipped.
+
+    Call it again (e.g. from pytest_configure) to apply command line options. Files older than
+    retention_days are deleted only when retention_days is given, so the implicit configuration
+    of the first customLogger() never prunes with settings the user did not choose.
+    """
+    global _listener
+    with _configure_lock:
+        _stop_listener()
+
+        root_dir = Path(log_dir)
+        if retention_days is not None:
+            _prune(root_dir, retention_days)
+        run_dir = worker_dir(root_dir)
+        file_stem = run_dir / f"run_{get_run_id()}"
+
+        handlers = [_rotating_handler(f"{file_stem}.log", logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT),
+                                      max_bytes, backup_count)]
+        if json_lines:
+            handlers.append(_rotating_handler(f"{file_stem}.jsonl", JsonLinesFormatter(), max_bytes, backup_count))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(_TestContextFilter())
+
+        framework_logger = logging.getLogger(FRAMEWORK_LOGGER)
+        framework_logger.setLevel(level)
+        for handler in list(framework_logger.handlers):
+            framework_logger.removeHandler(handler)
+        framework_logger.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    """Write every queued record and close the log files."""
+    with _configure_lock:
+        _stop_listener()
+
+
+def _stop_listener():
+    # Closing matters on reconfiguration too: an open file blocks its rotation on Windows and leaks the fd
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with only the message merged; timestamps and layout are formatted on the listener thread."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _TestContextFilter(logging.Filter):
+    """Stamps each record with the worker and the running test, read on the thread that logged it."""
+
+    def filter(self, record):
+        current_test = os.environ.get("PYTEST_CURRENT_TEST")
+        record.nodeid = current_test.rsplit(" (", 1)[0] if current_test else None
+        record.worker = get_worker_id()
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "nodeid": getattr(record, "nodeid", None),
+            "worker": getattr(record, "worker", None),
+            "run_id": get_run_id(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _rotating_handler(path, formatter, max_bytes, backup_count):
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                   encoding="UTF-8", delay=True)
+    handler.setFormatter(formatter)
+    handler.namer = lambda name: f"{name}.gz"
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
 
-    # Check if the logger already has handlers
-    if not logger.handlers:
-        current_time = datetime.strftime(datetime.now(), '%d_%m_%Y_%I_%M_%S%p')
-        log_file = os.path.join(log_dir, f"Log_{current_time}.log")
-        fileHandler = logging.FileHandler(log_file, mode='a',encoding = "UTF-8")
-        fileHandler.setLevel(logLevel)
+# Only files this module writes; anything else under log_dir (e.g. tracked Log_*.log files) is left alone
+PRUNE_PATTERNS = ("run_*.log*", "run_*.jsonl*")
 
-        #formatter = logging.Formatter('%(asctime)s - %(module)s - %(name)s - %(levelname)s: %(message)s', datefmt='%d_%m_%Y %I:%M:%S %p')
-        formatter = logging.Formatter('%(asctime)s -(%(filename)5s:%(lineno)2s)- [%(levelname)4s] %(message)s', datefmt='%d_%m_%Y %I:%M:%S %p')
-        fileHandler.setFormatter(formatter)
-        logger.addHandler(fileHandler)
 
-    return logger
\ No newline at end of file
+def _prune(root_dir: Path, retention_days: float):
+    if not retention_days or not root_dir.exists():
+        return
+    cutoff = time.time() - retention_days * 86400
+    for log_file in (path for pattern in PRUNE_PATTERNS for path in root_dir.rglob(pattern)):
+        try:
+            if log_file.is_file() and log_file.stat().st_mtime < cutoff:
+                log_file.unlink()
+        except OSError:
+            # Another worker pruned it first
+            pass
@@ -0,0 +1,154 @@
+import base64
+from fnmatch import fnmatch
+from typing import Dict, Iterable
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Route
+from utils.logger import customLogger
+
+log = customLogger()
+
+# Third-party analytics/telemetry hosts that no UI assertion depends on
+ANALYTICS_HOSTS = (
+    "*google-analytics.com",
+    "*googletagmanager.com",
+    "*doubleclick.net",
+    "*hotjar.com",
+    "*segment.io",
+    "*nr-data.net",
+    "*newrelic.com",
+    "*clarity.ms",
+)
+
+# abort_*: the request fails; stub_*: the request gets an empty 200 response so page scripts keep running
+NETWORK_PROFILES: Dict[str, Dict[str, tuple]] = {
+    "full": {},
+    "lean": {
+        "abort_types": ("media", "font"),
+        "stub_types": ("image",),
+        "stub_hosts": ANALYTICS_HOSTS,
+    },
+    "minimal": {
+        "abort_types": ("media", "font", "image", "texttrack", "manifest", "eventsource"),
+        "stub_hosts": ANALYTICS_HOSTS,
+    },
+}
+
+_TRANSPARENT_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+_STUB_BODIES = {
+    "image": ("image/gif", _TRANSPARENT_GIF),
+    "script": ("application/javascript", b""),
+    "stylesheet": ("text/css", b""),
+}
+
+
+# Typical transfer size per resource type (rough HTTP Archive medians), used to estimate the bytes a
+# blocked request saved when neither that URL nor its resource type has been downloaded in this run
+TYPICAL_SIZES: Dict[str, int] = {
+    "image": 25_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 20_000,
+    "stylesheet": 10_000,
+    "texttrack": 5_000,
+    "manifest": 1_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+}
+
+
+class NetworkShaper:
+    """Installs context.route rules that abort or stub resources a test does not need."""
+
+    # URL -> body size seen when the resource was served, and resource type -> [total bytes, responses],
+    # shared across tests to estimate the bytes saved when a resource is blocked
+    known_sizes: Dict[str, int] = {}
+    type_sizes: Dict[str, list] = {}
+
+    def __init__(self, profile: str, allowlist: Iterable[str] = ()):
+        if profile not in NETWORK_PROFILES:
+            raise ValueError(f"Unsupported network profile: {profile}")
+        self.profile = profile
+        self.rules = NETWORK_PROFILES[profile]
+        self.allowlist = tuple(allowlist)
+        self.context = None
+        self._stubbed_requests = set()
+        self.stats = {"blocked": 0, "stubbed": 0, "served": 0, "bytes_served": 0, "bytes_saved": 0}
+
+    @property
+    def active(self) -> bool:
+        return any(self.rules.values())
+
+    def install(self, context: BrowserContext):
+        if not self.active:
+            return
+        self.context = context
+        context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    def uninstall(self):
+        if self.context is None:
+            return
+        try:
+            self.context.unroute("**/*", self._handle)
+            self.context.remove_listener("response", self._on_response)
+        except Exception as e:
+            log.warning(f"Removing network profile routes failed: {e}")
+        self.context = None
+        self._stubbed_requests.clear()
+
+    def _handle(self, route: Route):
+        request = route.request
+        url = request.url
+        host = urlsplit(url).hostname or ""
+        resource_type = request.resource_type
+
+        # fallback() (not continue_()) lets other handlers such as HAR replay still serve the request
+        if any(fnmatch(host, pattern) or fnmatch(url, pattern) for pattern in self.allowlist):
+            route.fallback()
+            return
+
+        if resource_type in self.rules.get("stub_types", ()) or self._host_matches(host, "stub_hosts"):
+            content_type, body = _STUB_BODIES.get(resource_type, ("text/plain", b""))
+            self._count_saved("stubbed", url, resource_type)
+            self._stubbed_requests.add(id(request))
+            route.fulfill(status=200, content_type=content_type, body=body)
+        elif resource_type in self.rules.get("abort_types", ()) or self._host_matches(host, "abort_hosts"):
+            self._count_saved("blocked", url, resource_type)
+            route.abort("blockedbyclient")
+        else:
+            route.fallback()
+
+    def _host_matches(self, host: str, rule: str) -> bool:
+        return any(fnmatch(host, pattern) for pattern in self.rules.get(rule, ()))
+
+    def _count_saved(self, counter: str, url: str, resource_type: str):
+        self.stats[counter] += 1
+        self.stats["bytes_saved"] += self.estimate_size(url, resource_type)
+
+    @classmethod
+    def estimate_size(cls, url: str, resource_type: str) -> int:
+        """Size of this URL when it was served before, else the average (or typical) size of its type."""
+        if url in cls.known_sizes:
+            return cls.known_sizes[url]
+        total, count = cls.type_sizes.get(resource_type, (0, 0))
+        return total // count if count else TYPICAL_SIZES.get(resource_type, 0)
+
+    def _on_response(self, response):
+        # Stubbed responses also fire 'response' events but were never downloaded
+        if id(response.request) in self._stubbed_requests:
+            return
+        size = int(response.headers.get("content-length") or 0)
+        self.stats["served"] += 1
+        self.stats["bytes_served"] += size
+        if size:
+            NetworkShaper.known_sizes[response.url] = size
+            totals = NetworkShaper.type_sizes.setdefault(response.request.resource_type, [0, 0])
+            totals[0] += size
+            totals[1] += 1
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"profile={self.profile} blocked={stats['blocked']} stubbed={stats['stubbed']} "
+                f"served={stats['served']} bytes_served={stats['bytes_served']} "
+                f"bytes_saved~={stats['bytes_saved']}")
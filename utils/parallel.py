@@ -0,0 +1,39 @@
+import os
+import uuid
+from pathlib import Path
+
+
+def get_worker_id() -> str:
+    """Return the pytest-xdist worker id (gw0, gw1, ...) or 'master' when running serially."""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def get_worker_count() -> int:
+    """Return the number of parallel workers in this run (1 when running serially)."""
+    return int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+
+
+def is_parallel_worker() -> bool:
+    """Return True when the current process is a pytest-xdist worker."""
+    return "PYTEST_XDIST_WORKER" in os.environ
+
+
+def is_xdist_controller(config) -> bool:
+    """Return True in the pytest-xdist process that distributes tests to workers (and runs none itself)."""
+    return config.pluginmanager.has_plugin("dsession")
+
+
+def get_run_id() -> str:
+    """Return the id of this test run, shared by the xdist controller and every worker it spawns."""
+    # Set in the first process that asks; workers inherit it through the environment
+    return os.environ.setdefault("FRAMEWORK_RUN_ID", uuid.uuid4().hex[:12])
+
+
+def worker_dir(base_dir, create: bool = True) -> Path:
+    """Return (and create) a per-worker sub directory of base_dir, or base_dir itself when serial."""
+    path = Path(base_dir)
+    if is_parallel_worker():
+        path = path / get_worker_id()
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,49 @@
+from typing import Iterable, Optional, Union
+
+import pytest
+
+ExceptionFilter = Iterable[Union[str, type]]
+
+
+class RetryPolicy:
+    """Decides whether a failed test attempt is retried immediately.
+
+    The policy comes from --retries and can be overridden per test with
+    @pytest.mark.flaky(max_attempts=3, only_on=[TimeoutError], except_on=["AssertionError"]).
+    Exception filters accept classes or class names.
+    """
+
+    def __init__(self, max_attempts: int = 1, only_on: ExceptionFilter = (), except_on: ExceptionFilter = ()):
+        self.max_attempts = max_attempts
+        self.only_on = tuple(only_on)
+        self.except_on = tuple(except_on)
+
+    @classmethod
+    def for_item(cls, item: pytest.Item, default_retries: int) -> "RetryPolicy":
+        marker = item.get_closest_marker("flaky")
+        if marker is None:
+            return cls(max_attempts=default_retries + 1)
+        return cls(
+            max_attempts=marker.kwargs.get("max_attempts", max(default_retries, 1) + 1),
+            only_on=marker.kwargs.get("only_on", ()),
+            except_on=marker.kwargs.get("except_on", ()),
+        )
+
+    def should_retry(self, attempt: int, excinfo: Optional[pytest.ExceptionInfo]) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if excinfo is None:
+            return not self.only_on
+        if self.only_on and not _matches(excinfo, self.only_on):
+            return False
+        return not (self.except_on and _matches(excinfo, self.except_on))
+
+
+def _matches(excinfo: pytest.ExceptionInfo, filters: tuple) -> bool:
+    for exc_filter in filters:
+        if isinstance(exc_filter, str):
+            if any(cls.__name__ == exc_filter for cls in excinfo.type.__mro__):
+                return True
+        elif excinfo.errisinstance(exc_filter):
+            return True
+    return False
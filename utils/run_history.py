@@ -0,0 +1,335 @@
+"""Persistent per-test outcome history, stored in a local SQLite database.
+
+Query it from the command line:
+
+    python -m utils.run_history flaky --threshold 0.1
+    python -m utils.run_history slow --limit 20 --env qa
+    python -m utils.run_history show testscases/facebook/test_login.py::test_login
+    python -m utils.run_history prune --days 90
+"""
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / ".test_history.db"
+DEFAULT_WINDOW_DAYS = 30
+# Runs per test that decide whether it is flaky: older instability stops counting once it is this far back
+DEFAULT_FLAKY_RUNS = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    env TEXT,
+    browser TEXT,
+    cloud TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    setup_duration REAL NOT NULL,
+    call_duration REAL NOT NULL,
+    teardown_duration REAL NOT NULL,
+    total_duration REAL NOT NULL,
+    worker TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    nodeid TEXT NOT NULL,
+    env TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    build_id TEXT,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (nodeid, env)
+);
+CREATE INDEX IF NOT EXISTS idx_results_nodeid ON results(nodeid, finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_finished ON results(finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+"""
+
+
+class HistoryRecorder:
+    """Folds the setup/call/teardown reports of every attempt into one result row per test."""
+
+    def __init__(self):
+        self._results: Dict[str, dict] = {}
+
+    def add(self, report):
+        result = self._results.setdefault(report.nodeid, {
+            "outcome": "passed", "attempts": 1, "setup": 0.0, "call": 0.0, "teardown": 0.0, "total": 0.0,
+            "finished_at": 0.0,
+        })
+        attempts = getattr(report, "retry_count", 0) + 1
+        if attempts > result["attempts"]:
+            # A new attempt starts: phase durations describe the last attempt, total covers all of them
+            result.update(attempts=attempts, setup=0.0, call=0.0, teardown=0.0, outcome="passed")
+        result[report.when] = report.duration
+        result["total"] += report.duration
+        result["finished_at"] = time.time()
+
+        outcome = _outcome(report)
+        # A teardown error must not hide an earlier setup error or test failure
+        if outcome and not (report.when == "teardown" and result["outcome"] != "passed"):
+            result["outcome"] = outcome
+
+    def rows(self) -> List[dict]:
+        return [dict(result, nodeid=nodeid) for nodeid, result in self._results.items()]
+
+
+def _outcome(report) -> Optional[str]:
+    xfail = hasattr(report, "wasxfail")
+    if report.outcome == "rerun":
+        return "rerun"
+    if report.when == "call":
+        if report.passed:
+            return "xpassed" if xfail else "passed"
+        if report.skipped:
+            return "xfailed" if xfail else "skipped"
+        return "failed"
+    if report.failed:
+        return "error"
+    if report.skipped:
+        return "xfailed" if xfail else "skipped"
+    return None
+
+
+class HistoryStore:
+    """SQLite-backed store of test results across runs.
+
+    The database runs in WAL mode, so readers never block and concurrent writers (xdist workers,
+    parallel shards) wait on the busy timeout instead of failing. Each writer inserts all of its
+    rows in one transaction.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, timeout: float = 30):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def record(self, run_id: str, results: Iterable[dict], env: str = None, browser: str = None,
+               cloud: str = None, worker: str = None, started_at: float = None):
+        rows = [
+            (run_id, r["nodeid"], r["outcome"], r["attempts"], r["setup"], r["call"], r["teardown"],
+             r["total"], worker, r["finished_at"])
+            for r in results
+        ]
+        if not rows:
+            return
+        connection = self.connection
+        # IMMEDIATE takes the write lock up front, so a busy database is retried instead of deadlocking
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started_at, env, browser, cloud) VALUES (?, ?, ?, ?, ?)",
+                (run_id, started_at or time.time(), env, browser, cloud),
+            )
+            connection.executemany(
+                "INSERT INTO results (run_id, nodeid, outcome, attempts, setup_duration, call_duration, "
+                "teardown_duration, total_duration, worker, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def fingerprints(self, env: str) -> Dict[str, sqlite3.Row]:
+        """Input fingerprint of the last passing run of every test in env."""
+        rows = self.connection.execute(
+            "SELECT nodeid, fingerprint, inputs, build_id, recorded_at FROM fingerprints WHERE env = ?", (env,)
+        )
+        return {row["nodeid"]: row for row in rows}
+
+    def save_fingerprints(self, env: str, entries: Dict[str, Optional[tuple]]):
+        """Store (fingerprint, inputs, build_id, recorded_at) per node id; None forgets the test's fingerprint."""
+        if not entries:
+            return
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO fingerprints (nodeid, env, fingerprint, inputs, build_id, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(nodeid, env, *entry) for nodeid, entry in entries.items() if entry is not None],
+            )
+            connection.executemany(
+                "DELETE FROM fingerprints WHERE nodeid = ? AND env = ?",
+                [(nodeid, env) for nodeid, entry in entries.items() if entry is None],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def flaky_tests(self, threshold: float = 0.1, min_runs: int = 3, days: float = DEFAULT_WINDOW_DAYS,
+                    env: str = None, browser: str = None, last_runs: int = DEFAULT_FLAKY_RUNS) -> List[sqlite3.Row]:
+        """Tests that passed at least once but needed a retry or failed in at least threshold of their runs.
+
+        Only each test's last_runs runs within the window count, so a test that has been stable
+        since (retried or not) stops being reported. Tests that never passed are broken rather
+        than flaky and are left out.
+        """
+        where, params = self._window(days, env, browser)
+        return self.connection.execute(
+            f"""WITH recent AS (
+                    SELECT r.nodeid, r.outcome, r.attempts,
+                           ROW_NUMBER() OVER (PARTITION BY r.nodeid ORDER BY r.finished_at DESC) AS age
+                    FROM results r JOIN runs USING (run_id)
+                    WHERE {where}
+                )
+                SELECT nodeid, COUNT(*) AS runs,
+                       SUM(outcome IN ('failed', 'error') OR attempts > 1) AS unstable,
+                       ROUND(CAST(SUM(outcome IN ('failed', 'error') OR attempts > 1) AS REAL) / COUNT(*), 3)
+                           AS flaky_rate
+                FROM recent
+                WHERE age <= ?
+                GROUP BY nodeid
+                HAVING runs >= ? AND SUM(outcome = 'passed') > 0 AND flaky_rate > 0 AND flaky_rate >= ?
+                ORDER BY flaky_rate DESC, runs DESC""",
+            params + [last_runs, min_runs, threshold],
+        ).fetchall()
+
+    def slowest_tests(self, limit: int = 20, days: float = DEFAULT_WINDOW_DAYS, env: str = None,
+                      browser: str = None) -> List[sqlite3.Row]:
+        where, params = self._window(days, env, browser)
+        return self.connection.execute(
+            f"""SELECT r.nodeid, COUNT(*) AS runs,
+                       ROUND(AVG(r.setup_duration + r.call_duration + r.teardown_duration), 3) AS avg_duration,
+                       ROUND(MAX(r.setup_duration + r.call_duration + r.teardown_duration), 3) AS max_duration,
+                       ROUND(AVG(r.setup_duration), 3) AS avg_setup,
+                       ROUND(AVG(r.call_duration), 3) AS avg_call,
+                       ROUND(AVG(r.teardown_duration), 3) AS avg_teardown
+                FROM results r JOIN runs USING (run_id)
+                WHERE {where}
+                GROUP BY r.nodeid
+                ORDER BY avg_duration DESC
+                LIMIT ?""",
+            params + [limit],
+        ).fetchall()
+
+    def average_durations(self, days: float = DEFAULT_WINDOW_DAYS) -> Dict[str, float]:
+        """Average wall time per test, retries included, over the window."""
+        where, params = self._window(days, None, None)
+        rows = self.connection.execute(
+            f"""SELECT r.nodeid, AVG(r.total_duration) FROM results r JOIN runs USING (run_id)
+                WHERE {where} GROUP BY r.nodeid""",
+            params,
+        )
+        return {nodeid: duration for nodeid, duration in rows}
+
+    def recent_runs(self, nodeid: str, limit: int = 20) -> List[sqlite3.Row]:
+        return self.connection.execute(
+            """SELECT datetime(r.finished_at, 'unixepoch', 'localtime') AS finished, r.outcome, r.attempts,
+                      ROUND(r.setup_duration, 3) AS setup, ROUND(r.call_duration, 3) AS call,
+                      ROUND(r.teardown_duration, 3) AS teardown, runs.env, runs.browser, runs.cloud, r.worker
+               FROM results r JOIN runs USING (run_id)
+               WHERE r.nodeid = ?
+               ORDER BY r.finished_at DESC
+               LIMIT ?""",
+            (nodeid, limit),
+        ).fetchall()
+
+    def prune(self, days: float) -> int:
+        """Delete results (and runs left without results) older than days; returns the number of results removed."""
+        cutoff = time.time() - days * 86400
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            removed = connection.execute("DELETE FROM results WHERE finished_at < ?", (cutoff,)).rowcount
+            connection.execute("DELETE FROM runs WHERE run_id NOT IN (SELECT DISTINCT run_id FROM results)")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("VACUUM")
+        return removed
+
+    @staticmethod
+    def _window(days, env, browser):
+        clauses = ["r.finished_at >= ?", "r.outcome NOT IN ('skipped', 'xfailed')"]
+        params = [time.time() - days * 86400]
+        if env:
+            clauses.append("runs.env = ?")
+            params.append(env)
+        if browser:
+            clauses.append("runs.browser = ?")
+            params.append(browser)
+        return " AND ".join(clauses), params
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _print_rows(rows: List[sqlite3.Row]):
+    if not rows:
+        print("No matching history")
+        return
+    columns = rows[0].keys()
+    widths = [max(len(str(column)), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(str(column).ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.run_history", description="Query the test history")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="History database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    flaky = commands.add_parser("flaky", help="Tests that needed retries or failed intermittently")
+    flaky.add_argument("--threshold", type=float, default=0.1)
+    flaky.add_argument("--min-runs", type=int, default=3)
+    flaky.add_argument("--last-runs", type=int, default=DEFAULT_FLAKY_RUNS, help="Recent runs per test to judge")
+
+    slow = commands.add_parser("slow", help="Slowest tests by average duration")
+    slow.add_argument("--limit", type=int, default=20)
+
+    for command in (flaky, slow):
+        command.add_argument("--days", type=float, default=DEFAULT_WINDOW_DAYS)
+        command.add_argument("--env")
+        command.add_argument("--browser")
+
+    show = commands.add_parser("show", help="Latest runs of one test")
+    show.add_argument("nodeid")
+    show.add_argument("--limit", type=int, default=20)
+
+    prune = commands.add_parser("prune", help="Delete history older than --days")
+    prune.add_argument("--days", type=float, default=90)
+
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+    try:
+        if args.command == "flaky":
+            _print_rows(store.flaky_tests(args.threshold, args.min_runs, args.days, args.env, args.browser,
+                                          args.last_runs))
+        elif args.command == "slow":
+            _print_rows(store.slowest_tests(args.limit, args.days, args.env, args.browser))
+        elif args.command == "show":
+            _print_rows(store.recent_runs(args.nodeid, args.limit))
+        elif args.command == "prune":
+            print(f"Removed {store.prune(args.days)} results")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
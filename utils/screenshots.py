@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from playwright.sync_api import Page
+from utils.logger import customLogger
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: needed for WebP output and thumbnails only
+    Image = None
+
+log = customLogger()
+
+SCREENSHOT_FORMATS = ("png", "jpeg", "webp")
+EMBED_MODES = ("inline", "thumbnail", "link")
+
+
+class ScreenshotPipeline:
+    """Captures failure screenshots in memory and writes them to disk on a background thread.
+
+    Files are named by content hash, so identical screenshots (e.g. the same error page on
+    every retry) are stored once. Depending on embed, the HTML report gets the full image
+    inline, an inline thumbnail (rendered by the writer thread too) linking to the full image,
+    or just the link.
+    """
+
+    def __init__(self, output_dir, report_dir=None, image_format: str = "jpeg", quality: int = 80,
+                 full_page: bool = False, embed: str = "thumbnail", thumbnail_width: int = 400):
+        if image_format == "webp" and Image is None:
+            log.warning("WebP screenshots need Pillow, falling back to JPEG")
+            image_format = "jpeg"
+        if embed == "thumbnail" and Image is None:
+            log.warning("Screenshot thumbnails need Pillow, linking full-size screenshots instead")
+            embed = "link"
+
+        self.output_dir = Path(output_dir)
+        self.report_dir = Path(report_dir) if report_dir else None
+        self.image_format = image_format
+        self.quality = quality
+        self.full_page = full_page
+        self.embed = embed
+        self.thumbnail_width = thumbnail_width
+        self._written = set()
+        self._thumbnails = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-writer")
+
+    def capture(self, page: Page) -> Optional[str]:
+        """Take a screenshot of page and return the HTML snippet for the report."""
+        capture_type = "png" if self.image_format == "png" else "jpeg"
+        data = page.screenshot(
+            type=capture_type,
+            quality=None if capture_type == "png" else self.quality,
+            full_page=self.full_page,
+        )
+
+        digest = hashlib.sha1(data).hexdigest()
+        extension = {"jpeg": "jpg"}.get(self.image_format, self.image_format)
+        file_path = self.output_dir / f"{digest}.{extension}"
+        thumbnail = None
+        if self.embed == "thumbnail" and digest not in self._thumbnails:
+            # Rendered off the test thread, ahead of the queued writes
+            thumbnail = self._executor.submit(self._thumbnail, data)
+        if digest not in self._written:
+            self._written.add(digest)
+            self._executor.submit(self._write, data, file_path)
+
+        href = self._href(file_path)
+        if self.embed == "inline":
+            encoded = base64.b64encode(data).decode("utf-8")
+            return (f'<div><img src="data:image/{capture_type};base64,{encoded}" '
+                    f'style="width:400px;height:auto;" onclick="window.open(this.src)" align="right"/></div>')
+        if self.embed == "thumbnail":
+            # Inlined, so a --self-contained-html report still shows it; only the full image is a file
+            if thumbnail is not None:
+                try:
+                    self._thumbnails[digest] = base64.b64encode(thumbnail.result()).decode("utf-8")
+                except Exception as e:
+                    log.error(f"Rendering screenshot thumbnail failed: {e}")
+                    return f'<div><a href="{href}" target="_blank">Screenshot</a></div>'
+            return (f'<div><a href="{href}" target="_blank"><img src="data:image/jpeg;base64,{self._thumbnails[digest]}" '
+                    f'style="width:{self.thumbnail_width}px;height:auto;" align="right"/></a></div>')
+        return f'<div><a href="{href}" target="_blank">Screenshot</a></div>'
+
+    def _href(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.report_dir)).as_posix() if self.report_dir else path.as_uri()
+
+    def _thumbnail(self, data: bytes) -> bytes:
+        image = Image.open(io.BytesIO(data)).convert("RGB")
+        image.thumbnail((self.thumbnail_width, self.thumbnail_width * 4))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=60)
+        return buffer.getvalue()
+
+    def _write(self, data: bytes, file_path: Path):
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.image_format == "webp":
+                Image.open(io.BytesIO(data)).save(file_path, format="WEBP", quality=self.quality)
+            else:
+                file_path.write_bytes(data)
+        except Exception as e:
+            log.error(f"Writing screenshot {file_path} failed: {e}")
+
+    def close(self):
+        """Flush every pending write; call once at session end."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import heapq
+import json
+import statistics
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.file_lock import FileLock
+from utils.logger import customLogger
+
+log = customLogger()
+
+# Estimated duration (seconds) of a test without history when no test has any history either
+DEFAULT_TEST_DURATION = 5.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse --shard INDEX/COUNT (1-based), e.g. 2/4."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--shard must look like INDEX/COUNT, got '{value}'")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"--shard index must be between 1 and COUNT, got '{value}'")
+    return index, count
+
+
+def plan_fingerprint(nodeids: Sequence[str], count: int) -> str:
+    """Digest of the collected tests and the shard count a plan splits.
+
+    Durations are left out on purpose: every node reads them from its own history, so they differ
+    between nodes that must still agree on one plan.
+    """
+    payload = {"count": count, "tests": sorted(set(nodeids))}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def hash_shard(nodeid: str, count: int) -> int:
+    """Stable shard (0-based) for a test, the same on every machine and Python version."""
+    return zlib.crc32(nodeid.encode("utf-8")) % count
+
+
+class ShardPlan:
+    """Assignment of test node ids to shards, balanced on historical durations.
+
+    Tests with history are placed longest first on the shard with the least estimated work
+    (LPT bin packing). Tests without history are placed by hash of their node id and counted
+    at the median known duration, so the packing balances around them.
+    """
+
+    def __init__(self, count: int, shards: List[List[str]], estimates: List[float], fingerprint: str = None):
+        self.count = count
+        self.shards = shards
+        self.estimates = estimates
+        self.fingerprint = fingerprint
+        self._shard_of = {nodeid: index for index, nodeids in enumerate(shards) for nodeid in nodeids}
+
+    @classmethod
+    def build(cls, nodeids: Sequence[str], count: int, durations: Dict[str, float]) -> "ShardPlan":
+        known = {nodeid: durations[nodeid] for nodeid in nodeids if nodeid in durations}
+        fallback = statistics.median(known.values()) if known else DEFAULT_TEST_DURATION
+
+        shards = [[] for _ in range(count)]
+        estimates = [0.0] * count
+        for nodeid in sorted(set(nodeids) - known.keys()):
+            index = hash_shard(nodeid, count)
+            shards[index].append(nodeid)
+            estimates[index] += fallback
+
+        # (estimated load, shard index) heap; the index breaks ties so every node builds the same plan
+        heap = [(load, index) for index, load in enumerate(estimates)]
+        heapq.heapify(heap)
+        for nodeid, duration in sorted(known.items(), key=lambda entry: (-entry[1], entry[0])):
+            load, index = heapq.heappop(heap)
+            shards[index].append(nodeid)
+            heapq.heappush(heap, (load + duration, index))
+        for load, index in heap:
+            estimates[index] = load
+        return cls(count, shards, estimates, plan_fingerprint(nodeids, count))
+
+    def shard_of(self, nodeid: str) -> int:
+        """0-based shard of a test; tests the plan has never seen fall back to the hash."""
+        index = self._shard_of.get(nodeid)
+        return hash_shard(nodeid, self.count) if index is None else index
+
+    def imbalance(self) -> float:
+        """Spread between the busiest and the idlest shard, relative to the busiest one."""
+        busiest = max(self.estimates)
+        return (busiest - min(self.estimates)) / busiest if busiest else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "fingerprint": self.fingerprint,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "estimates": [round(estimate, 3) for estimate in self.estimates],
+            "shards": self.shards,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShardPlan":
+        return cls(data["count"], data["shards"], data["estimates"], data.get("fingerprint"))
+
+
+def load_or_build_plan(plan_path: Optional[Path], nodeids: Sequence[str], count: int,
+                       durations: Dict[str, float], rebuild: bool = False) -> ShardPlan:
+    """Reuse the plan file so every CI node agrees on the split, creating it on first use.
+
+    A plan built for other tests is never replaced silently, since another node may already have
+    run its shard of it: it raises ValueError unless rebuild is set.
+    """
+    if plan_path is None:
+        return ShardPlan.build(nodeids, count, durations)
+
+    plan_path = Path(plan_path)
+    # Parallel workers of one node may race to create the plan; the first one writes it, the rest read it
+    with FileLock(plan_path.with_name(plan_path.name + ".lock")):
+        if plan_path.exists():
+            with open(plan_path, encoding="utf-8") as f:
+                plan = ShardPlan.from_dict(json.load(f))
+            if plan.fingerprint == plan_fingerprint(nodeids, count):
+                return plan
+            if not rebuild:
+                if plan.count != count:
+                    raise ValueError(f"Shard plan {plan_path} splits into {plan.count} shards, not {count}")
+                raise ValueError(f"Shard plan {plan_path} was built for other tests; pass --rebuild-shard-plan "
+                                 f"(once, before the nodes start) or use a new plan file")
+            log.info(f"Rebuilding shard plan {plan_path} for the collected tests")
+
+        plan = ShardPlan.build(nodeids, count, durations)
+        plan_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = plan_path.with_name(plan_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(plan.to_dict(), f, indent=2)
+        tmp_path.replace(plan_path)
+        log.info(f"Wrote shard plan {plan_path}: estimated {plan.estimates}")
+        return plan
@@ -1,5 +1,25 @@
-from playwright.sync_api import Page, expect
-from typing import Optional
+import itertools
+import os
+import sys
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Pattern, Union
+
+from playwright.sync_api import Page, expect, TimeoutError as PlaywrightTimeoutError
+
+UrlMatcher = Union[str, Pattern, Callable[[str], bool]]
+# A condition is called with the milliseconds left before the shared deadline and
+# must raise (for example a Playwright TimeoutError) while it is not satisfied
+Condition = Callable[[float], Any]
+
+_mutation_ids = itertools.count()
+
+
+class FixedSleepWarning(UserWarning):
+    """Emitted when time.sleep() is used while a page fixture is active."""
+
 
 class WaitStrategies:
     @staticmethod
@@ -12,4 +32,141 @@ class WaitStrategies:
 
     @staticmethod
     def for_element_count(page: Page, locator: str, count: int, timeout: float = 30000):
-        expect(page.locator(locator)).to_have_count(count, timeout=timeout)
\ No newline at end of file
+        expect(page.locator(locator)).to_have_count(count, timeout=timeout)
+
+    @staticmethod
+    def for_response(page: Page, url: UrlMatcher, action: Optional[Callable[[], Any]] = None,
+                     status: Optional[int] = None, timeout: float = 30000):
+        """Wait for a response whose URL matches (optionally triggered by action) and return it."""
+        def predicate(response):
+            if status is not None and response.status != status:
+                return False
+            return _url_matches(url, response.url)
+
+        with page.expect_response(predicate, timeout=timeout) as response_info:
+            if action:
+                action()
+        return response_info.value
+
+    @staticmethod
+    def for_request(page: Page, url: UrlMatcher, action: Optional[Callable[[], Any]] = None,
+                    method: Optional[str] = None, timeout: float = 30000):
+        """Wait for a request whose URL matches (optionally triggered by action) and return it."""
+        def predicate(request):
+            if method and request.method.upper() != method.upper():
+                return False
+            return _url_matches(url, request.url)
+
+        with page.expect_request(predicate, timeout=timeout) as request_info:
+            if action:
+                action()
+        return request_info.value
+
+    @staticmethod
+    def for_navigation(page: Page, action: Optional[Callable[[], Any]] = None, url: Optional[UrlMatcher] = None,
+                       wait_until: str = "load", timeout: float = 30000):
+        """Wait until the page navigates (to url when given) after running action."""
+        if action is None:
+            page.wait_for_url(url or "**", wait_until=wait_until, timeout=timeout)
+            return
+        start_url = page.url
+        action()
+        if url is None:
+            page.wait_for_url(lambda current: current != start_url, wait_until=wait_until, timeout=timeout)
+        else:
+            page.wait_for_url(url, wait_until=wait_until, timeout=timeout)
+
+    @staticmethod
+    def for_dom_mutation(page: Page, selector: str = "body", action: Optional[Callable[[], Any]] = None,
+                         subtree: bool = True, attributes: bool = False, timeout: float = 30000):
+        """Wait for the first DOM mutation under selector, typically caused by action."""
+        flag = f"__pwMutation{next(_mutation_ids)}"
+        page.evaluate(
+            """([selector, flag, subtree, attributes]) => {
+                const target = document.querySelector(selector);
+                if (!target) throw new Error(`No element matches ${selector}`);
+                window[flag] = false;
+                const observer = new MutationObserver(() => { window[flag] = true; observer.disconnect(); });
+                observer.observe(target, { childList: true, characterData: true, subtree, attributes });
+            }""",
+            [selector, flag, subtree, attributes],
+        )
+        if action:
+            action()
+        try:
+            page.wait_for_function(f"() => window['{flag}'] === true", timeout=timeout)
+        finally:
+            page.evaluate(f"() => delete window['{flag}']")
+
+    @staticmethod
+    def for_js_predicate(page: Page, expression: str, arg: Any = None, polling: Union[str, float] = "raf",
+                         timeout: float = 30000):
+        """Wait until a JS expression/function evaluates truthy in the page and return its value."""
+        return page.wait_for_function(expression, arg=arg, polling=polling, timeout=timeout).json_value()
+
+    @staticmethod
+    def for_all(*conditions: Condition, timeout: float = 30000):
+        """Wait for every condition in order, all sharing one deadline; returns their results."""
+        deadline = time.monotonic() + timeout / 1000
+        results = []
+        for condition in conditions:
+            remaining = _remaining_ms(deadline)
+            if remaining <= 0:
+                raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded while waiting for all conditions")
+            results.append(condition(remaining))
+        return results
+
+    @staticmethod
+    def for_any(*conditions: Condition, timeout: float = 30000, slice_ms: float = 250):
+        """Poll the conditions round-robin until one is satisfied; returns (index, result)."""
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            for index, condition in enumerate(conditions):
+                remaining = _remaining_ms(deadline)
+                if remaining <= 0:
+                    raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded while waiting for any condition")
+                try:
+                    return index, condition(min(slice_ms, remaining))
+                except (PlaywrightTimeoutError, AssertionError):
+                    continue
+
+
+def _remaining_ms(deadline: float) -> float:
+    return (deadline - time.monotonic()) * 1000
+
+
+def _url_matches(matcher: UrlMatcher, url: str) -> bool:
+    if callable(matcher):
+        return matcher(url)
+    if isinstance(matcher, str):
+        return matcher in url
+    return matcher.search(url) is not None
+
+
+def _is_test_module(frame) -> bool:
+    name = os.path.basename(frame.f_code.co_filename)
+    return name.startswith("test_") or name.endswith("_test.py")
+
+
+@contextmanager
+def warn_on_fixed_sleep():
+    """Patch time.sleep so fixed sleeps in test modules emit a FixedSleepWarning while the block is active."""
+    original_sleep = time.sleep
+
+    def _sleep(seconds):
+        # Only sleeps written in test modules are flagged; framework code (lock polling, background
+        # threads) sleeps legitimately
+        if threading.current_thread() is not threading.main_thread() or not _is_test_module(sys._getframe(1)):
+            return original_sleep(seconds)
+        warnings.warn(
+            f"time.sleep({seconds}) while a page is active; use a WaitStrategies event wait instead",
+            FixedSleepWarning,
+            stacklevel=2,
+        )
+        original_sleep(seconds)
+
+    time.sleep = _sleep
+    try:
+        yield
+    finally:
+        time.sleep = original_sleep